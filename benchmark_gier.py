@@ -0,0 +1,50 @@
+"""
+Benchmark przepustowości gier w trybie headless (jeden rdzeń).
+
+Użycie:
+    python benchmark_gier.py --gry 2000
+    python benchmark_gier.py --gry 200 --porownaj   # także klasyczny tryb GRA dla porównania
+"""
+import random
+import time
+
+import numpy as np
+
+from silnik import GRA
+
+
+def zmierz(liczba_gier, seed=0, benchmark_time=None, **opcje_gry):
+    """
+    Rozgrywa liczba_gier gier random_bot vs random_bot.
+
+    Returns:
+        (gry_na_minute, wyniki) - wyniki: liczba remisów, wygranych bota 1 i bota 2
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    wyniki = [0, 0, 0]
+    start = time.perf_counter()
+    for _ in range(liczba_gier):
+        gra = GRA("random_bot", "random_bot", **opcje_gry)
+        wyniki[gra.start(benchmark_time=benchmark_time)] += 1
+    czas = time.perf_counter() - start
+    return liczba_gier / czas * 60, wyniki
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark gier headless")
+    parser.add_argument("--gry", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", default="bity", choices=["tablica", "bity"])
+    parser.add_argument("--porownaj", action="store_true",
+                        help="zmierz też klasyczny tryb (wątki, plansza dtype=object, bez benchmarku na grę)")
+    args = parser.parse_args()
+
+    na_minute, wyniki = zmierz(args.gry, args.seed, headless=True, backend=args.backend)
+    print(f"headless ({args.backend}): {na_minute:,.0f} gier/min  (remisy/bot1/bot2: {wyniki})")
+
+    if args.porownaj:
+        na_minute, wyniki = zmierz(args.gry, args.seed, benchmark_time=1.0)
+        print(f"klasyczny:        {na_minute:,.0f} gier/min  (remisy/bot1/bot2: {wyniki})")
@@ -0,0 +1,260 @@
+"""
+Bot referencyjny: negamax z cięciami alfa-beta i iteracyjnym pogłębianiem.
+
+- przeszukiwanie na maskach bitowych (silnik_bity), wielobicie jako jeden ruch
+- tablica transpozycji o stałym rozmiarze (klucze Zobrista z modułu zobrist)
+- kolejność ruchów: najlepszy ruch z tablicy transpozycji, potem heurystyka historii
+- czas: benchmark_time ustawiany przez GRA.start; kolejna iteracja zaczyna się
+  tylko wtedy, gdy zostało dość czasu, a przeszukiwanie jest przerywane przed
+  limitem - bot nie zużywa time_flags; bez skończonego limitu (np. headless)
+  używa kalibracja.benchmark_time, a ruch nigdy nie trwa dłużej niż MAKS_CZAS_RUCHU
+
+Statystyki ostatniego ruchu: bot.ostatni (głębokość, węzły, czas, węzły/s).
+
+Pomiar wydajności (stała głębokość na pozycjach z perft.POZYCJE):
+    python boty/alfabeta_bot.py --glebokosc 10
+"""
+import math
+import os
+import sys
+import time
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kalibracja
+import zobrist
+from silnik_bity import obroc, pelne_ruchy_z_bitow, plansza_na_bity, wykonaj_ruch_bity
+
+WYGRANA = 100000
+PIONEK = 100
+KROL = 160
+
+# Pola (bity) w kolejnych rzędach - premia za zaawansowanie pionków
+RZEDY = [sum(1 << s for s in range(4 * r, 4 * r + 4)) for r in range(8)]
+
+DOKLADNA, DOLNA, GORNA = 0, 1, 2
+
+# Twardy limit czasu ruchu w sekundach - nieskończony limit nie może zawiesić gry
+MAKS_CZAS_RUCHU = 10.0
+
+
+class _KoniecCzasu(Exception):
+    pass
+
+
+def _do_tt(wynik, ply):
+    """Wynik wygranej/przegranej liczony od korzenia -> liczony od węzła (do tablicy transpozycji)."""
+    if wynik > WYGRANA // 2:
+        return wynik + ply
+    if wynik < -WYGRANA // 2:
+        return wynik - ply
+    return wynik
+
+
+def _z_tt(wynik, ply):
+    """Wynik z tablicy transpozycji (liczony od węzła) -> liczony od korzenia przy danym ply."""
+    if wynik > WYGRANA // 2:
+        return wynik - ply
+    if wynik < -WYGRANA // 2:
+        return wynik + ply
+    return wynik
+
+
+def _po_ruchu(wlasne, przeciwne, krole, ruch):
+    """Pozycja po ruchu (ciągu skoków), z perspektywy przeciwnika."""
+    for i in range(len(ruch) - 1):
+        wlasne, przeciwne, krole = wykonaj_ruch_bity(wlasne, przeciwne, krole, ruch[i:i + 2])
+    return obroc(przeciwne), obroc(wlasne), obroc(krole)
+
+
+def ocena(wlasne, przeciwne, krole):
+    """Ocena pozycji z perspektywy gracza na ruchu: materiał i zaawansowanie pionków."""
+    pionki = wlasne & ~krole
+    pionki_p = przeciwne & ~krole
+    wynik = (PIONEK * (pionki.bit_count() - pionki_p.bit_count())
+             + KROL * ((wlasne & krole).bit_count() - (przeciwne & krole).bit_count()))
+    # Pionki gracza idą do rzędu 0, przeciwnika do rzędu 7
+    for r in range(1, 7):
+        wynik += (7 - r) * (pionki & RZEDY[r]).bit_count() - r * (pionki_p & RZEDY[r]).bit_count()
+    return wynik
+
+
+class bot():
+    def __init__(self, max_glebokosc=64, rozmiar_tt=1 << 18, zapas=0.6, sprawdzaj_co=512):
+        """
+        Args:
+            max_glebokosc: maksymalna głębokość iteracyjnego pogłębiania
+            rozmiar_tt: liczba wpisów tablicy transpozycji (potęga 2)
+            zapas: część benchmark_time, po której przeszukiwanie jest przerywane
+            sprawdzaj_co: co ile węzłów sprawdzany jest czas
+        """
+        self.benchmark_time = None  # ustawiane przez GRA.start
+        self.max_glebokosc = max_glebokosc
+        self.zapas = zapas
+        self.sprawdzaj_co = sprawdzaj_co
+        self.maska_tt = rozmiar_tt - 1
+        self.tt = [None] * rozmiar_tt
+        self.historia = {}
+        self.ostatni = None
+        self.statystyki = []  # (glebokosc, wezly, czas) każdego ruchu
+
+    def nowa_gra(self):
+        """Reset przed kolejną grą (instancja z puli ciepłych botów - zob. silnik.zaladuj_bota)."""
+        self.tt = [None] * (self.maska_tt + 1)
+        self.historia = {}
+        self.ostatni = None
+        self.statystyki = []
+
+    def _limit(self):
+        limit = self.benchmark_time
+        if limit is None or not math.isfinite(limit):
+            limit = kalibracja.benchmark_time()
+        return min(limit * self.zapas, MAKS_CZAS_RUCHU)
+
+    def move(self, plansza, ruchy):
+        '''
+        Metoda która wybiera ruch
+
+        Argumenty:
+            plansza: aktualna plansza (z perspektywy gracza)
+            ruchy: lista legalnych ruchów
+        Zwraca:
+            wybrany_ruch: jeden z legalnych ruchów
+        '''
+        start = time.perf_counter()
+        pozycja = plansza_na_bity(plansza)
+
+        # Ruchy z listy silnika jako pełne ciągi (w środku wielobicia tylko kontynuacje tego pionka)
+        dozwolone = {tuple(map(tuple, ruch)) for ruch in ruchy}
+        korzen = [r for r in pelne_ruchy_z_bitow(*pozycja) if r in dozwolone or r[:2] in dozwolone]
+        if len(korzen) <= 1:
+            najlepszy = korzen[0] if korzen else ruchy[0]
+            return najlepszy if najlepszy in dozwolone else najlepszy[:2]
+
+        limit = self._limit()
+        self.koniec = start + limit
+        self.wezly = 0
+        najlepszy, glebokosc = korzen[0], 0
+        for g in range(1, self.max_glebokosc + 1):
+            try:
+                wynik, ruch = self._korzen(pozycja, korzen, g)
+            except _KoniecCzasu:
+                break
+            najlepszy, glebokosc = ruch, g
+            # Kolejna iteracja trwa zwykle kilka razy dłużej - nie zaczynaj jej bez szans na koniec
+            uplynelo = time.perf_counter() - start
+            if abs(wynik) > WYGRANA // 2 or start + 3 * uplynelo > self.koniec:
+                break
+
+        czas = time.perf_counter() - start
+        self.ostatni = {'glebokosc': glebokosc, 'wezly': self.wezly, 'czas': czas,
+                        'nps': self.wezly / czas if czas > 0 else 0.0}
+        self.statystyki.append((glebokosc, self.wezly, czas))
+        return najlepszy if najlepszy in dozwolone else najlepszy[:2]
+
+    def _korzen(self, pozycja, ruchy, glebokosc):
+        wpis = self.tt[zobrist.klucz_bitow(*pozycja) & self.maska_tt]
+        ruchy = self._uporzadkuj(ruchy, wpis[4] if wpis is not None else None)
+        alfa, beta = -WYGRANA - 1, WYGRANA + 1
+        najlepszy = ruchy[0]
+        for ruch in ruchy:
+            wynik = -self._negamax(_po_ruchu(*pozycja, ruch), glebokosc - 1, -beta, -alfa, 1)
+            if wynik > alfa:
+                alfa, najlepszy = wynik, ruch
+        self._zapisz_tt(zobrist.klucz_bitow(*pozycja), glebokosc, alfa, DOKLADNA, najlepszy, 0)
+        return alfa, najlepszy
+
+    def _uporzadkuj(self, ruchy, ruch_tt):
+        ruchy = sorted(ruchy, key=lambda r: -self.historia.get(r, 0))
+        if ruch_tt in ruchy:
+            ruchy.remove(ruch_tt)
+            ruchy.insert(0, ruch_tt)
+        return ruchy
+
+    def _zapisz_tt(self, klucz, glebokosc, wynik, flaga, ruch, ply):
+        i = klucz & self.maska_tt
+        wpis = self.tt[i]
+        # Zastępowanie: inna pozycja albo płytszy wpis tej samej
+        if wpis is None or wpis[0] != klucz or wpis[1] <= glebokosc:
+            # Odległość do wygranej liczona od węzła - transpozycja może wystąpić na innym ply
+            self.tt[i] = (klucz, glebokosc, _do_tt(wynik, ply), flaga, ruch)
+
+    def _negamax(self, pozycja, glebokosc, alfa, beta, ply):
+        self.wezly += 1
+        if self.wezly % self.sprawdzaj_co == 0 and time.perf_counter() > self.koniec:
+            raise _KoniecCzasu
+
+        wlasne, przeciwne, krole = pozycja
+        ruchy = pelne_ruchy_z_bitow(wlasne, przeciwne, krole)
+        if not ruchy:
+            return -WYGRANA + ply
+        if glebokosc <= 0:
+            # Bicia są obowiązkowe - nie oceniaj pozycji w trakcie wymiany
+            if len(ruchy[0]) > 2 or abs(ruchy[0][1][0] - ruchy[0][0][0]) == 2:
+                glebokosc = 1
+            else:
+                return ocena(wlasne, przeciwne, krole)
+
+        klucz = zobrist.klucz_bitow(wlasne, przeciwne, krole)
+        wpis = self.tt[klucz & self.maska_tt]
+        ruch_tt = None
+        if wpis is not None and wpis[0] == klucz:
+            ruch_tt = wpis[4]
+            if wpis[1] >= glebokosc:
+                wynik, flaga = _z_tt(wpis[2], ply), wpis[3]
+                if flaga == DOKLADNA:
+                    return wynik
+                if flaga == DOLNA:
+                    alfa = max(alfa, wynik)
+                else:
+                    beta = min(beta, wynik)
+                if alfa >= beta:
+                    return wynik
+
+        alfa_start = alfa
+        najlepszy_wynik, najlepszy = -WYGRANA - 1, None
+        for ruch in self._uporzadkuj(ruchy, ruch_tt) if len(ruchy) > 1 else ruchy:
+            wynik = -self._negamax(_po_ruchu(wlasne, przeciwne, krole, ruch), glebokosc - 1, -beta, -alfa, ply + 1)
+            if wynik > najlepszy_wynik:
+                najlepszy_wynik, najlepszy = wynik, ruch
+            if wynik > alfa:
+                alfa = wynik
+            if alfa >= beta:
+                self.historia[ruch] = self.historia.get(ruch, 0) + glebokosc * glebokosc
+                break
+
+        if najlepszy_wynik <= alfa_start:
+            flaga = GORNA
+        elif najlepszy_wynik >= beta:
+            flaga = DOLNA
+        else:
+            flaga = DOKLADNA
+        self._zapisz_tt(klucz, glebokosc, najlepszy_wynik, flaga, najlepszy, ply)
+        return najlepszy_wynik
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import perft
+
+    parser = argparse.ArgumentParser(description="Wydajność bota alfa-beta na pozycjach z perft.POZYCJE")
+    parser.add_argument("--glebokosc", type=int, default=10, help="stała głębokość przeszukiwania")
+    args = parser.parse_args()
+
+    wezly = czas = 0
+    for nazwa, napis in perft.POZYCJE.items():
+        b = bot(max_glebokosc=args.glebokosc)
+        b.benchmark_time = math.inf
+        plansza = perft.plansza_z_napisu(napis)
+        b.move(plansza, pelne_ruchy_z_bitow(*plansza_na_bity(plansza)))
+        s = b.ostatni
+        if s is None:
+            print(f"{nazwa:<12} jeden legalny ruch")
+            continue
+        wezly += s['wezly']
+        czas += s['czas']
+        print(f"{nazwa:<12} głębokość {s['glebokosc']}: {s['wezly']:>8} węzłów, {s['czas']:.2f}s, "
+              f"{s['nps']:,.0f} węzłów/s")
+    print(f"Razem: {wezly} węzłów, {czas:.2f}s, {wezly / czas:,.0f} węzłów/s")
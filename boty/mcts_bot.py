@@ -0,0 +1,302 @@
+"""
+Bot MCTS (UCT) z równoległością w korzeniu.
+
+Każdy proces roboczy buduje własne drzewo z innym ziarnem, a przed końcem
+czasu odsyła liczby odwiedzin i wygranych ruchów z korzenia; bot sumuje je
+i wybiera ruch z największą liczbą odwiedzin. Procesy są uruchamiane raz,
+przy tworzeniu bota, i żyją przez całą grę.
+
+Domyślnie procesów jest tyle, ile rdzeni, ale tylko w procesie głównym. Bot
+tworzony w procesie potomnym (np. w puli turnieju, meczu czy generowania danych,
+gdzie każdy proces roboczy już zajmuje rdzeń i trzyma ciepłe instancje) szuka
+w swoim procesie - inaczej N procesów puli uruchomiłoby rzędu N^2 procesów
+MCTS. Uruchamiający może to zmienić zmienną środowiskową WARCABY_PROCESY_MCTS
+(liczba procesów na instancję bota, 0 - w procesie bota).
+
+Playouty używają generatora ruchów i update z GRA (backend "bity",
+plansza kompaktowa), z wielobiciem jako jednym ruchem i zasadą 20 ruchów.
+
+Gdy procesów nie da się uruchomić (np. bot działa w trybie izolacja, którego
+proces nie może mieć procesów potomnych, albo system nie wspiera fork),
+przeszukiwanie działa w procesie bota.
+
+Skalowanie (playouty/s dla 1..N procesów):
+    python boty/mcts_bot.py --procesy 4 --czas 1.0
+"""
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kalibracja
+from silnik import GRA, plansza_kompaktowa
+
+MAKS_DLUGOSC_PLAYOUTU = 200   # półruchy; dłuższy playout to remis
+LIMIT_RUCHOW = 20             # ruchy bez bicia/promocji do remisu (jak w GRA.start)
+NARZUT = 0.05                 # sekundy zostawiane na komunikację z procesami
+ZMIENNA_PROCESOW = "WARCABY_PROCESY_MCTS"
+
+_silnik = None
+
+
+def _gra():
+    global _silnik
+    if _silnik is None:
+        _silnik = GRA(None, None, backend="bity", kompaktowa=True)
+    return _silnik
+
+
+def _wykonaj(gra, plansza, ruch):
+    """Plansza po ruchu, z perspektywy przeciwnika, i czy licznik 20 ruchów się zeruje."""
+    pionki = int(np.count_nonzero(plansza == 1))
+    nowa, bylo_bicie, _ = gra.update(plansza, ruch)
+    zeruje = bylo_bicie or int(np.count_nonzero(nowa == 1)) < pionki
+    return gra.zamien_perspektywe(nowa), zeruje
+
+
+def _playout(gra, plansza, licznik, los):
+    """Losowa gra do końca. Zwraca wynik dla gracza na ruchu: 1, 0.5 lub 0."""
+    znak = 1
+    for _ in range(MAKS_DLUGOSC_PLAYOUTU):
+        ruchy = gra.znajdz_pelne_ruchy(plansza)
+        if not ruchy:
+            return 0.0 if znak == 1 else 1.0
+        plansza, zeruje = _wykonaj(gra, plansza, ruchy[los.randrange(len(ruchy))])
+        licznik = 0 if zeruje else licznik + 1
+        if licznik >= LIMIT_RUCHOW:
+            return 0.5
+        znak = -znak
+    return 0.5
+
+
+class _Wezel:
+    __slots__ = ("plansza", "licznik", "ruchy", "dzieci", "wizyty", "wygrane", "koniec")
+
+    def __init__(self, gra, plansza, licznik, ruchy=None):
+        self.plansza = plansza
+        self.licznik = licznik
+        self.ruchy = gra.znajdz_pelne_ruchy(plansza) if ruchy is None else list(ruchy)
+        self.dzieci = {}
+        self.wizyty = 0
+        self.wygrane = 0.0   # z perspektywy gracza, który wykonał ruch do tego węzła
+        self.koniec = None   # wynik, jeśli pozycja kończy grę (dla gracza na ruchu)
+        if not self.ruchy:
+            self.koniec = 0.0
+        elif licznik >= LIMIT_RUCHOW:
+            self.koniec = 0.5
+
+
+def _szukaj(plansza, ruchy, czas, seed, stala_ucb):
+    """
+    MCTS od pozycji plansza przez czas sekund.
+
+    Returns:
+        (statystyki, playouty) - statystyki: lista (wizyty, wygrane) dla kolejnych ruchów z ruchy
+    """
+    gra = _gra()
+    los = random.Random(seed)
+    koniec = time.perf_counter() + czas
+    korzen = _Wezel(gra, plansza, 0, ruchy)
+    playouty = 0
+
+    while time.perf_counter() < koniec:
+        wezel = korzen
+        sciezka = [wezel]
+
+        # Selekcja i rozwinięcie
+        while wezel.koniec is None:
+            nierozwiniete = [r for r in wezel.ruchy if r not in wezel.dzieci]
+            if nierozwiniete:
+                ruch = nierozwiniete[los.randrange(len(nierozwiniete))]
+                nowa, zeruje = _wykonaj(gra, wezel.plansza, ruch)
+                dziecko = _Wezel(gra, nowa, 0 if zeruje else wezel.licznik + 1)
+                wezel.dzieci[ruch] = dziecko
+                sciezka.append(dziecko)
+                wezel = dziecko
+                break
+            log_wizyt = math.log(wezel.wizyty)
+            wezel = max(wezel.dzieci.values(),
+                        key=lambda d: d.wygrane / d.wizyty + stala_ucb * math.sqrt(log_wizyt / d.wizyty))
+            sciezka.append(wezel)
+
+        # Symulacja: wynik dla gracza na ruchu w ostatnim węźle
+        if wezel.koniec is not None:
+            wynik = wezel.koniec
+        else:
+            wynik = _playout(gra, wezel.plansza, wezel.licznik, los)
+
+        # Propagacja: węzeł przechowuje wygrane gracza, który do niego doprowadził
+        for w in reversed(sciezka):
+            w.wizyty += 1
+            w.wygrane += 1.0 - wynik
+            wynik = 1.0 - wynik
+        playouty += 1
+
+    statystyki = []
+    for ruch in korzen.ruchy:
+        dziecko = korzen.dzieci.get(ruch)
+        statystyki.append((dziecko.wizyty, dziecko.wygrane) if dziecko else (0, 0.0))
+    return statystyki, playouty
+
+
+def domyslne_procesy():
+    """Liczba procesów roboczych bota: z WARCABY_PROCESY_MCTS, liczba rdzeni w procesie głównym, 0 w potomnym."""
+    wartosc = os.environ.get(ZMIENNA_PROCESOW)
+    if wartosc:
+        return max(int(wartosc), 0)
+    if multiprocessing.parent_process() is not None:
+        return 0
+    return os.cpu_count() or 1
+
+
+def _petla_procesu(polaczenie):
+    """Proces roboczy: czeka na zadania (numer, plansza, ruchy, czas, seed, stała UCB) i odsyła wynik."""
+    while True:
+        try:
+            zadanie = polaczenie.recv()
+        except EOFError:
+            break
+        if zadanie is None:
+            break
+        numer, *argumenty = zadanie
+        polaczenie.send((numer, _szukaj(*argumenty)))
+
+
+class bot():
+    def __init__(self, procesy=None, stala_ucb=1.4, zapas=0.6):
+        """
+        Args:
+            procesy: liczba procesów roboczych (0 - w procesie bota; domyślnie domyslne_procesy())
+            stala_ucb: stała eksploracji UCT
+            zapas: część benchmark_time przeznaczona na przeszukiwanie
+        """
+        self.benchmark_time = None  # ustawiane przez GRA.start
+        self.stala_ucb = stala_ucb
+        self.zapas = zapas
+        self.los = random.Random()
+        self.ostatni = None
+        self.statystyki = []  # (playouty, czas) każdego ruchu
+        self.procesy = []
+        self.numer_zadania = 0
+        self._uruchom(domyslne_procesy() if procesy is None else procesy)
+
+    def _uruchom(self, liczba):
+        try:
+            kontekst = multiprocessing.get_context("fork")
+        except ValueError:
+            return
+        try:
+            for _ in range(liczba):
+                polaczenie, polaczenie_procesu = kontekst.Pipe()
+                proces = kontekst.Process(target=_petla_procesu, args=(polaczenie_procesu,), daemon=True)
+                proces.start()
+                polaczenie_procesu.close()
+                self.procesy.append((proces, polaczenie))
+        except (AssertionError, OSError):
+            # Proces demona (izolacja) nie może mieć procesów potomnych
+            self.zamknij()
+
+    def zamknij(self):
+        """Kończy procesy robocze."""
+        for proces, polaczenie in self.procesy:
+            try:
+                polaczenie.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            proces.join(timeout=1.0)
+            if proces.is_alive():
+                proces.kill()
+            polaczenie.close()
+        self.procesy = []
+
+    def __del__(self):
+        self.zamknij()
+
+    def nowa_gra(self):
+        """Reset przed kolejną grą - procesy robocze zostają (zob. silnik.zaladuj_bota)."""
+        self.ostatni = None
+        self.statystyki = []
+
+    def _limit(self):
+        limit = self.benchmark_time
+        if limit is None or not math.isfinite(limit):
+            limit = kalibracja.benchmark_time()
+        return limit * self.zapas
+
+    def move(self, plansza, ruchy):
+        '''
+        Metoda która wybiera ruch
+
+        Argumenty:
+            plansza: aktualna plansza (z perspektywy gracza)
+            ruchy: lista legalnych ruchów
+        Zwraca:
+            wybrany_ruch: jeden z legalnych ruchów
+        '''
+        start = time.perf_counter()
+        plansza = plansza_kompaktowa(plansza)
+
+        # Ruchy z listy silnika jako pełne ciągi (w środku wielobicia tylko kontynuacje tego pionka)
+        dozwolone = {tuple(map(tuple, ruch)) for ruch in ruchy}
+        korzen = [r for r in _gra().znajdz_pelne_ruchy(plansza) if r in dozwolone or r[:2] in dozwolone]
+        if len(korzen) <= 1:
+            najlepszy = korzen[0] if korzen else ruchy[0]
+            return najlepszy if najlepszy in dozwolone else najlepszy[:2]
+
+        czas = max(self._limit() - NARZUT, 0.001)
+        wizyty = np.zeros(len(korzen))
+        playouty = 0
+        if self.procesy:
+            self.numer_zadania += 1
+            for proces, polaczenie in self.procesy:
+                polaczenie.send((self.numer_zadania, plansza, korzen, czas, self.los.getrandbits(63), self.stala_ucb))
+            for proces, polaczenie in self.procesy:
+                # Proces, który nie zdąży, jest pomijany; spóźnione wyniki z poprzednich ruchów są odrzucane
+                while polaczenie.poll(max(start + czas + NARZUT - time.perf_counter(), 0.0)):
+                    numer, (statystyki, n) = polaczenie.recv()
+                    if numer == self.numer_zadania:
+                        wizyty += [w for w, _ in statystyki]
+                        playouty += n
+                        break
+        else:
+            statystyki, playouty = _szukaj(plansza, korzen, czas, self.los.getrandbits(63), self.stala_ucb)
+            wizyty += [w for w, _ in statystyki]
+
+        najlepszy = korzen[int(np.argmax(wizyty))]
+        czas = time.perf_counter() - start
+        self.ostatni = {'playouty': playouty, 'czas': czas, 'playouty_na_s': playouty / czas,
+                        'procesy': len(self.procesy) or 1}
+        self.statystyki.append((playouty, czas))
+        return najlepszy if najlepszy in dozwolone else najlepszy[:2]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Skalowanie bota MCTS z liczbą procesów")
+    parser.add_argument("--procesy", type=int, default=os.cpu_count(), help="sprawdź 1..N procesów")
+    parser.add_argument("--czas", type=float, default=1.0, help="czas na ruch w sekundach")
+    parser.add_argument("--ruchy", type=int, default=3, help="liczba mierzonych ruchów")
+    args = parser.parse_args()
+
+    gra = GRA(None, None, kompaktowa=True)
+    ruchy = gra.znajdz_legalne_ruchy(gra.plansza)
+    bazowe = None
+    for n in range(1, args.procesy + 1):
+        b = bot(procesy=n, zapas=1.0)
+        b.benchmark_time = args.czas
+        for _ in range(args.ruchy):
+            b.move(gra.plansza, ruchy)
+        b.zamknij()
+        playouty = sum(p for p, _ in b.statystyki)
+        czas = sum(c for _, c in b.statystyki)
+        na_s = playouty / czas
+        bazowe = bazowe or na_s
+        print(f"{n:>2} proc.: {na_s:>10,.0f} playoutów/s (x{na_s / bazowe:.2f})")
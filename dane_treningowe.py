@@ -0,0 +1,317 @@
+"""
+Zbiór pozycji z gier do trenowania funkcji oceny.
+
+Gry rozgrywane są równolegle w puli procesów (jak w turniej.py), z binarnym
+zapisem (zapis_gry), a każda pozycja z zapisu trafia do shardów - plików .npy
+o stałej liczbie rekordów, zapisywanych przez np.memmap. Jeden rekord to
+jeden skok (wielobicie to kilka rekordów, także w trybie pelne_bicia):
+
+- plansza: 32 ciemne pola (int8, kolejność silnik_bity.POLA) z perspektywy gracza na ruchu
+- strona: gracz na ruchu (1 lub 2)
+- maska: legalne skoki (256 bitów, np.packbits) - indeks jak w indeks_ruchu
+- ruch: indeks wybranego skoku
+- wynik: wynik gry dla gracza na ruchu (1 wygrana, 0 remis, -1 przegrana)
+- gra: numer gry
+
+Postęp zapisywany jest w manifest.json (podmienianym atomowo): po przerwaniu
+to samo polecenie dokończy zbiór, pomijając gotowe gry.
+
+Użycie:
+    python dane_treningowe.py dane/ --gry 10000 --bot1 alfabeta_bot --bot2 random_bot
+    zbior = Zbior("dane/")
+    for partia in zbior.partie(4096):      # shardy czytane przez memmap, bez wczytywania całości
+        ...
+"""
+import json
+import os
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+import kalibracja
+import zapis_gry
+from silnik import GRA, plansza_kompaktowa, rozgrzej_boty
+from silnik_bity import BIT_POLA, POLA
+
+REKORD = np.dtype([
+    ("plansza", np.int8, (32,)),
+    ("strona", np.int8),
+    ("maska", np.uint8, (32,)),
+    ("ruch", np.int16),
+    ("wynik", np.int8),
+    ("gra", np.int32),
+])
+ROZMIAR_SHARDU = 1 << 16      # rekordów na shard
+LICZBA_RUCHOW = 256           # 32 pola x 4 kierunki x (ruch, bicie)
+MANIFEST = "manifest.json"
+KIERUNKI = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+
+def indeks_ruchu(ruch):
+    """Skok ((r0, c0), (r1, c1)) -> indeks 0..255: pole * 8 + kierunek * 2 + bicie."""
+    (r0, c0), (r1, c1) = ruch[0], ruch[1]
+    odleglosc = abs(r1 - r0)
+    kierunek = KIERUNKI.index(((r1 - r0) // odleglosc, (c1 - c0) // odleglosc))
+    return BIT_POLA[(r0, c0)] * 8 + kierunek * 2 + (odleglosc == 2)
+
+
+def ruch_z_indeksu(indeks):
+    """Odwrotność indeks_ruchu."""
+    pole, reszta = divmod(int(indeks), 8)
+    kierunek, bicie = divmod(reszta, 2)
+    (r0, c0), (dr, dc) = POLA[pole], KIERUNKI[kierunek]
+    krok = 2 if bicie else 1
+    return (r0, c0), (r0 + krok * dr, c0 + krok * dc)
+
+
+def plansza_z_rekordu(rekord):
+    """Plansza 8x8 int8 (jak plansza kompaktowa) z perspektywy gracza na ruchu."""
+    plansza = np.full((8, 8), -1, dtype=np.int8)
+    for s, pole in enumerate(POLA):
+        plansza[pole] = rekord["plansza"][s]
+    return plansza
+
+
+def rekordy_gry(zapis, numer_gry):
+    """Rekordy wszystkich skoków z wczytanego zapisu gry (zapis_gry.ZapisanaGra)."""
+    silnik = GRA(None, None, backend="bity", kompaktowa=True)
+    plansza = plansza_kompaktowa(zapis.plansza_startowa)
+    rekordy = np.zeros(len(zapis.ruchy), dtype=REKORD)
+    strona = 1
+    kontynuacja = None   # pole pionka w trakcie wielobicia
+    for i, (ruch, _, _, koniec_tury) in enumerate(zapis.ruchy):
+        if kontynuacja is not None:
+            legalne = silnik._znajdz_bicia(plansza, *kontynuacja, plansza[kontynuacja])
+        else:
+            legalne = silnik.znajdz_legalne_ruchy(plansza)
+        maska = np.zeros(LICZBA_RUCHOW, dtype=bool)
+        maska[[indeks_ruchu(r) for r in legalne]] = True
+
+        rekord = rekordy[i]
+        rekord["plansza"] = plansza.ravel()[[r * 8 + c for r, c in POLA]]
+        rekord["strona"] = strona
+        rekord["maska"] = np.packbits(maska)
+        rekord["ruch"] = indeks_ruchu(ruch)
+        rekord["wynik"] = 0 if zapis.wynik == 0 else (1 if zapis.wynik == strona else -1)
+        rekord["gra"] = numer_gry
+
+        plansza, _, koniec = silnik.update(plansza, ruch)
+        if koniec_tury:
+            plansza = silnik.zamien_perspektywe(plansza)
+            strona = 3 - strona
+            kontynuacja = None
+        else:
+            kontynuacja = koniec
+    return rekordy
+
+
+def _rozegraj_gre(numer, bot1, bot2, seed, benchmark_time, opcje_gry):
+    """Jedna gra w procesie roboczym; zwraca jej rekordy."""
+    with tempfile.TemporaryDirectory() as folder:
+        sciezka = os.path.join(folder, f"gra_{numer}{zapis_gry.ROZSZERZENIE}")
+        gra = GRA(bot1, bot2, seed=seed, zapis=sciezka, **opcje_gry)
+        gra.start(benchmark_time=benchmark_time)
+        return numer, rekordy_gry(zapis_gry.wczytaj(sciezka), numer)
+
+
+class _Pisarz:
+    """Dopisuje rekordy do kolejnych shardów i prowadzi manifest."""
+
+    def __init__(self, folder, manifest):
+        self.folder = folder
+        self.manifest = manifest
+        self.shard = None
+
+    def _sciezka(self, numer):
+        return os.path.join(self.folder, f"shard_{numer:05d}.npy")
+
+    def _otworz(self):
+        shardy = self.manifest["shardy"]
+        if shardy and shardy[-1]["rekordy"] < self.manifest["rozmiar_shardu"]:
+            # Dokończ ostatni shard - rekordy za licznikiem z manifestu są nadpisywane
+            self.shard = np.lib.format.open_memmap(self._sciezka(len(shardy) - 1), mode="r+")
+        else:
+            shardy.append({"plik": os.path.basename(self._sciezka(len(shardy))), "rekordy": 0})
+            self.shard = np.lib.format.open_memmap(self._sciezka(len(shardy) - 1), mode="w+", dtype=REKORD,
+                                                   shape=(self.manifest["rozmiar_shardu"],))
+
+    def dopisz(self, rekordy):
+        while len(rekordy):
+            if self.shard is None:
+                self._otworz()
+            wpis = self.manifest["shardy"][-1]
+            n = min(len(rekordy), len(self.shard) - wpis["rekordy"])
+            self.shard[wpis["rekordy"]:wpis["rekordy"] + n] = rekordy[:n]
+            wpis["rekordy"] += n
+            rekordy = rekordy[n:]
+            if wpis["rekordy"] == len(self.shard):
+                self.shard.flush()
+                self.shard = None
+
+    def zapisz_manifest(self):
+        """Najpierw dane na dysk, potem manifest (os.replace - atomowo)."""
+        if self.shard is not None:
+            self.shard.flush()
+        tymczasowy = os.path.join(self.folder, MANIFEST + ".tmp")
+        with open(tymczasowy, "w") as plik:
+            json.dump(self.manifest, plik)
+        os.replace(tymczasowy, os.path.join(self.folder, MANIFEST))
+
+
+def generuj(folder, gry, bot1="random_bot", bot2="random_bot", procesy=None, seed=0,
+            opcje_gry=None, rozmiar_shardu=ROZMIAR_SHARDU, zapisuj_co=50, pokaz=False):
+    """
+    Rozgrywa gry i dopisuje ich pozycje do shardów w folderze (wznawia przerwany zbiór).
+
+    Args:
+        folder: folder zbioru (tworzony, jeśli nie istnieje)
+        gry: łączna liczba gier w zbiorze (wraz z już rozegranymi)
+        bot1, bot2: nazwy botów z folderu boty; kolory zmieniają się co grę
+        procesy: liczba procesów (domyślnie os.cpu_count())
+        seed: ziarno zbioru - gra i ma ziarno seed * 2**32 + i
+        opcje_gry: dodatkowe argumenty dla GRA (domyślnie headless=True)
+        rozmiar_shardu: liczba rekordów w shardzie
+        zapisuj_co: co ile gier zapisywany jest manifest
+
+    Limit czasu (kalibracja.benchmark_time) jest ustalany raz, przed startem puli, i jest
+    skończony również w trybie headless.
+
+    Returns:
+        manifest (słownik)
+    """
+    opcje_gry = {"headless": True} if opcje_gry is None else opcje_gry
+    os.makedirs(folder, exist_ok=True)
+    ustawienia = {"bot1": bot1, "bot2": bot2, "seed": seed, "opcje_gry": opcje_gry,
+                  "rozmiar_shardu": rozmiar_shardu}
+    sciezka_manifestu = os.path.join(folder, MANIFEST)
+    if os.path.exists(sciezka_manifestu):
+        with open(sciezka_manifestu) as plik:
+            manifest = json.load(plik)
+        rozne = [k for k, v in ustawienia.items() if manifest[k] != v]
+        if rozne:
+            raise ValueError(f"Zbiór w {folder} ma inne ustawienia: {', '.join(rozne)}")
+    else:
+        manifest = dict(ustawienia, gotowe=[], shardy=[])
+
+    gotowe = set(manifest["gotowe"])
+    do_rozegrania = [i for i in range(gry) if i not in gotowe]
+    if not do_rozegrania:
+        return manifest
+    # Zawsze skończony limit - także w trybie headless, w którym GRA domyślnie nie ma limitu
+    benchmark_time = kalibracja.benchmark_time(zegar=opcje_gry.get("zegar", "sciana"))
+
+    pisarz = _Pisarz(folder, manifest)
+    od_zapisu = 0
+    with ProcessPoolExecutor(max_workers=procesy or os.cpu_count(), initializer=rozgrzej_boty,
+                             initargs=([bot1, bot2],)) as pula:
+        kolejka = iter(do_rozegrania)
+        w_toku = set()
+
+        def zglos():
+            numer = next(kolejka, None)
+            if numer is not None:
+                gracze = (bot1, bot2) if numer % 2 == 0 else (bot2, bot1)
+                w_toku.add(pula.submit(_rozegraj_gre, numer, *gracze, seed * 2**32 + numer,
+                                       benchmark_time, opcje_gry))
+
+        # Ograniczona liczba zadań w toku - wyniki nie gromadzą się w pamięci
+        for _ in range(2 * (procesy or os.cpu_count())):
+            zglos()
+        while w_toku:
+            gotowe_zadania, w_toku = wait(w_toku, return_when=FIRST_COMPLETED)
+            for zadanie in gotowe_zadania:
+                numer, rekordy = zadanie.result()
+                pisarz.dopisz(rekordy)
+                manifest["gotowe"].append(numer)
+                od_zapisu += 1
+                if od_zapisu >= zapisuj_co:
+                    pisarz.zapisz_manifest()
+                    od_zapisu = 0
+                    if pokaz:
+                        print(f"\rGry: {len(manifest['gotowe'])}/{gry}, rekordy: {liczba_rekordow(manifest)}",
+                              end="", flush=True)
+                zglos()
+    pisarz.zapisz_manifest()
+    if pokaz:
+        print(f"\rGry: {len(manifest['gotowe'])}/{gry}, rekordy: {liczba_rekordow(manifest)}")
+    return manifest
+
+
+def liczba_rekordow(manifest):
+    return sum(wpis["rekordy"] for wpis in manifest["shardy"])
+
+
+class Zbior:
+    """Odczyt zbioru: shardy otwierane przez memmap, tylko zapisane (wg manifestu) rekordy."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        with open(os.path.join(folder, MANIFEST)) as plik:
+            self.manifest = json.load(plik)
+        self.rozmiary = [wpis["rekordy"] for wpis in self.manifest["shardy"]]
+        self._shardy = {}
+
+    def __len__(self):
+        return sum(self.rozmiary)
+
+    def shard(self, numer):
+        """Rekordy shardu jako memmap tylko do odczytu."""
+        if numer not in self._shardy:
+            plik = os.path.join(self.folder, self.manifest["shardy"][numer]["plik"])
+            self._shardy[numer] = np.load(plik, mmap_mode="r")[:self.rozmiary[numer]]
+        return self._shardy[numer]
+
+    def __getitem__(self, indeks):
+        if indeks < 0:
+            indeks += len(self)
+        for numer, rozmiar in enumerate(self.rozmiary):
+            if indeks < rozmiar:
+                return self.shard(numer)[indeks]
+            indeks -= rozmiar
+        raise IndexError("indeks poza zbiorem")
+
+    def partie(self, rozmiar, tasuj=False, seed=None):
+        """
+        Kolejne partie rekordów (kopie w pamięci, po rozmiar rekordów - ostatnia w shardzie krótsza).
+
+        Args:
+            tasuj: losowa kolejność shardów i rekordów w obrębie shardu
+        """
+        los = np.random.default_rng(seed)
+        numery = list(range(len(self.rozmiary)))
+        if tasuj:
+            los.shuffle(numery)
+        for numer in numery:
+            shard = self.shard(numer)
+            kolejnosc = los.permutation(len(shard)) if tasuj else None
+            for start in range(0, len(shard), rozmiar):
+                if kolejnosc is None:
+                    yield np.array(shard[start:start + rozmiar])
+                else:
+                    partia = shard[np.sort(kolejnosc[start:start + rozmiar])]
+                    yield partia[los.permutation(len(partia))]
+
+    @staticmethod
+    def maska(rekordy):
+        """Maski legalnych ruchów jako tablica bool (N, 256)."""
+        return np.unpackbits(rekordy["maska"], axis=-1).astype(bool)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Zbiór pozycji z gier botów (shardy .npy)")
+    parser.add_argument("folder")
+    parser.add_argument("--gry", type=int, default=1000, help="łączna liczba gier w zbiorze")
+    parser.add_argument("--bot1", default="random_bot")
+    parser.add_argument("--bot2", default="random_bot")
+    parser.add_argument("--procesy", type=int, default=None, help="liczba procesów (domyślnie liczba rdzeni)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", default="bity", choices=["tablica", "bity"])
+    parser.add_argument("--rozmiar-shardu", type=int, default=ROZMIAR_SHARDU)
+    args = parser.parse_args()
+
+    manifest = generuj(args.folder, args.gry, args.bot1, args.bot2, args.procesy, args.seed,
+                       {"headless": True, "backend": args.backend}, args.rozmiar_shardu, pokaz=True)
+    print(f"Shardy: {len(manifest['shardy'])}, rekordy: {liczba_rekordow(manifest)}")
@@ -0,0 +1,77 @@
+"""
+Asynchroniczny dziennik gry (plik debug) z poziomami szczegółowości.
+
+Pętla gry tylko wkłada do kolejki szablon i argumenty wpisu; formatowanie
+i zapis na dysk odbywają się w osobnym wątku. Kolejka ma ograniczony rozmiar -
+gdy wątek zapisu nie nadąża, gra czeka na miejsce w kolejce (poza czasem bota),
+więc wpisy nie giną, a pamięć nie rośnie bez końca.
+
+Poziomy (każdy zawiera poprzednie):
+    WYNIK      - nagłówek gry, limit czasu, wynik
+    RUCHY      - ruchy, czasy, statusy, błędy i timeouty botów
+    SZCZEGOLY  - dostępne ruchy, liczniki, zamiana perspektywy, klucze pozycji
+
+Użycie:
+    gra = GRA("bot1", "bot2", debug=True, debug_poziom=dziennik.RUCHY)
+"""
+import queue
+import threading
+
+WYNIK = 1
+RUCHY = 2
+SZCZEGOLY = 3
+
+POZIOMY = {"wynik": WYNIK, "ruchy": RUCHY, "szczegoly": SZCZEGOLY}
+
+ROZMIAR_KOLEJKI = 4096  # wpisów
+
+
+class Dziennik:
+    """Plik dziennika zapisywany w tle."""
+
+    def __init__(self, sciezka, poziom=SZCZEGOLY, rozmiar_kolejki=ROZMIAR_KOLEJKI):
+        """
+        Args:
+            sciezka: plik dziennika (nadpisywany)
+            poziom: WYNIK, RUCHY lub SZCZEGOLY - wpisy o wyższym poziomie są pomijane
+            rozmiar_kolejki: maksymalna liczba wpisów czekających na zapis
+        """
+        if poziom not in POZIOMY.values():
+            raise ValueError(f"Nieznany poziom dziennika: {poziom}")
+        self.sciezka = sciezka
+        self.poziom = poziom
+        self._plik = open(sciezka, "w", encoding="utf-8")
+        self._kolejka = queue.Queue(maxsize=rozmiar_kolejki)
+        self._watek = threading.Thread(target=self._petla_zapisu, name="dziennik", daemon=True)
+        self._watek.start()
+
+    def zapisz(self, poziom, szablon, *argumenty):
+        """
+        Dodaje wpis do kolejki; tekst to szablon.format(*argumenty), liczony w wątku zapisu.
+
+        Listy (np. ruchy przekazywane potem botowi, który może je zmienić) są kopiowane
+        przy dodaniu wpisu; pozostałe argumenty nie mogą być później zmieniane.
+        """
+        if poziom <= self.poziom:
+            argumenty = tuple(list(a) if isinstance(a, list) else a for a in argumenty)
+            self._kolejka.put((szablon, argumenty))
+
+    def _petla_zapisu(self):
+        while True:
+            wpis = self._kolejka.get()
+            if wpis is None:
+                break
+            szablon, argumenty = wpis
+            self._plik.write(szablon.format(*argumenty) if argumenty else szablon)
+        self._plik.close()
+
+    @property
+    def zamkniety(self):
+        return not self._watek.is_alive()
+
+    def zamknij(self):
+        """Zapisuje wszystkie oczekujące wpisy i zamyka plik."""
+        if self.zamkniety:
+            return
+        self._kolejka.put(None)
+        self._watek.join()
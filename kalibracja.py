@@ -0,0 +1,151 @@
+"""
+Kalibracja limitu czasu na ruch (benchmark_time).
+
+W porównaniu z pojedynczym pomiarem time.time() (dawny silnik.time_benchmark):
+- pomiar przez perf_counter (lub zegar CPU), w wielu paczkach, z medianą
+  zamiast jednego pomiaru - chwilowe obciążenie maszyny nie przesuwa wyniku
+- wynik jest zapamiętywany w procesie i w pliku (osobno dla każdej maszyny)
+  przez konfigurowalny czas, więc nie trzeba go liczyć przed każdą grą
+- można mierzyć czas ściany albo czas CPU (wątku lub procesu); czas CPU
+  nie rośnie, gdy inne procesy zajmują maszynę
+
+Użycie:
+    python kalibracja.py                 # odczyt z cache lub pomiar
+    python kalibracja.py --odswiez       # wymuszony nowy pomiar
+    python kalibracja.py --zegar cpu_watku
+"""
+import json
+import os
+import platform
+import statistics
+import time
+
+import numpy as np
+
+# Zegary do pomiaru czasu bota i benchmarku
+ZEGARY = {
+    "sciana": time.perf_counter,
+    "cpu_watku": time.thread_time,
+    "cpu_procesu": time.process_time,
+}
+
+# Przy zegarach CPU twardy limit ściany to LIMIT_SCIANY_CPU x limit maksymalny
+LIMIT_SCIANY_CPU = 4.0
+
+DOMYSLNA_WAZNOSC = 3600.0  # sekundy
+PLIK_CACHE = os.environ.get(
+    "WARCABY_KALIBRACJA",
+    os.path.join(os.path.expanduser("~"), ".cache", "warcaby_kalibracja.json"),
+)
+
+_pamiec = {}  # klucz -> (czas_pomiaru, benchmark_time)
+
+
+def odcisk_maszyny():
+    """Identyfikator maszyny i środowiska, dla którego ważny jest pomiar."""
+    return "|".join([
+        platform.node(), platform.machine(), platform.processor(), str(os.cpu_count()),
+        platform.python_implementation(), platform.python_version(), np.__version__,
+    ])
+
+
+def zmierz(iterations=(64, 3), paczki=32, zegar="sciana"):
+    """
+    Mierzy czas iterations[0] ** iterations[1] wywołań np.sum na macierzy 8x8.
+
+    Wywołania dzielone są na paczki mierzone osobno; wynik to mediana
+    czasu paczki przeskalowana do pełnej liczby wywołań.
+
+    Returns:
+        (benchmark_time, czasy_paczek)
+    """
+    teraz = ZEGARY[zegar]
+    matrix = np.random.default_rng(0).integers(0, 5, size=(8, 8), dtype=np.int8)
+    itt = iterations[0] ** iterations[1]
+    rozmiar = max(1, itt // paczki)
+
+    # Rozgrzewka
+    for _ in range(min(rozmiar, 1000)):
+        np.sum(matrix)
+
+    czasy = []
+    for _ in range(paczki):
+        start = teraz()
+        for _ in range(rozmiar):
+            np.sum(matrix)
+        czasy.append(teraz() - start)
+
+    return statistics.median(czasy) * itt / rozmiar, czasy
+
+
+def _wczytaj_cache(plik):
+    try:
+        with open(plik, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _zapisz_cache(plik, dane):
+    try:
+        os.makedirs(os.path.dirname(plik) or ".", exist_ok=True)
+        tymczasowy = f"{plik}.{os.getpid()}.tmp"
+        with open(tymczasowy, "w", encoding="utf-8") as f:
+            json.dump(dane, f, indent=1)
+        os.replace(tymczasowy, plik)
+    except OSError:
+        pass  # brak cache na dysku nie blokuje gry
+
+
+def benchmark_time(zegar="sciana", waznosc=DOMYSLNA_WAZNOSC, plik=PLIK_CACHE, iterations=(64, 3)):
+    """
+    Skalibrowany limit czasu na ruch, z cache w procesie i w pliku.
+
+    Args:
+        zegar: "sciana", "cpu_watku" lub "cpu_procesu"
+        waznosc: jak długo (w sekundach) pomiar jest ważny; 0 - zawsze mierz od nowa
+        plik: plik cache (None - tylko cache w procesie)
+        iterations: jak w zmierz
+
+    Returns:
+        benchmark_time w sekundach
+    """
+    if zegar not in ZEGARY:
+        raise ValueError(f"Nieznany zegar: {zegar}")
+    klucz = f"{odcisk_maszyny()}|{zegar}|{iterations[0]}^{iterations[1]}"
+    teraz = time.time()
+
+    if klucz in _pamiec and teraz - _pamiec[klucz][0] < waznosc:
+        return _pamiec[klucz][1]
+
+    if plik is not None:
+        wpis = _wczytaj_cache(plik).get(klucz)
+        if wpis is not None and teraz - wpis["czas"] < waznosc:
+            _pamiec[klucz] = (wpis["czas"], wpis["benchmark_time"])
+            return wpis["benchmark_time"]
+
+    wynik, _ = zmierz(iterations, zegar=zegar)
+    _pamiec[klucz] = (teraz, wynik)
+    if plik is not None:
+        dane = _wczytaj_cache(plik)
+        dane[klucz] = {"czas": teraz, "benchmark_time": wynik}
+        _zapisz_cache(plik, dane)
+    return wynik
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Kalibracja limitu czasu na ruch")
+    parser.add_argument("--zegar", default="sciana", choices=sorted(ZEGARY))
+    parser.add_argument("--odswiez", action="store_true", help="wymuś nowy pomiar")
+    parser.add_argument("--proby", type=int, default=0, help="dodatkowo wykonaj N pełnych pomiarów i pokaż rozrzut")
+    args = parser.parse_args()
+
+    wynik = benchmark_time(args.zegar, waznosc=0 if args.odswiez else DOMYSLNA_WAZNOSC)
+    print(f"benchmark_time ({args.zegar}): {wynik:.6f}s  [cache: {PLIK_CACHE}]")
+
+    if args.proby:
+        pomiary = [zmierz(zegar=args.zegar)[0] for _ in range(args.proby)]
+        print(f"{args.proby} pomiarów: min {min(pomiary):.6f}s, mediana {statistics.median(pomiary):.6f}s, "
+              f"max {max(pomiary):.6f}s")
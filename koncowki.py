@@ -0,0 +1,414 @@
+"""
+Tablice końcówek: wynik i odległość dla każdej pozycji z małą liczbą figur.
+
+Tablice liczone są w przód po budżecie ruchów bez bicia/promocji (zasada
+20 ruchów), na silniku bitowym (silnik_bity):
+- V_r(pozycja) - wartość, gdy do remisu zostało r ruchów bez bicia/promocji
+- bicie i promocja zerują licznik, więc prowadzą do V_20 pozycji z mniejszej
+  liczby figur lub z mniejszą liczbą pionków, policzonej wcześniej
+- zwykły ruch prowadzi do V_(r-1) pozycji z tą samą liczbą figur; V_0 = remis
+Zapisywane są wszystkie warstwy V_1..V_20. Sonda dostaje licznik ruchów bez
+bicia/promocji i po zwykłym ruchu czyta V_(r-1), a po biciu lub promocji V_20,
+więc wygrywająca linia mieści się w budżecie, który naprawdę został. Odległość
+do wygranej maleje z każdym półruchem, więc optymalna linia nie powtarza
+pozycji i 3-krotne powtórzenie nie zmienia wyników.
+
+Pozycje są z perspektywy gracza na ruchu (jak plansza bota). Dla każdego
+składu (pionki i króle gracza, pionki i króle przeciwnika) tablica jest
+indeksowana rangami kombinacji pól każdej grupy figur.
+
+Plik (little-endian): nagłówek "<4sBBBI" (b"WTBK", wersja, max_figur,
+liczba warstw, liczba składów), katalog "<BBBBQQB" (skład, offset, liczba
+pozycji, bajty na wartość) i dane - dla każdego składu warstwy V_1..V_20
+kolejno. Wartość 0 = remis, w przeciwnym razie odległość + 1 w półruchach;
+nieparzysta odległość to wygrana gracza na ruchu.
+
+Użycie:
+    python koncowki.py --figury 3                 # buduje koncowki.wtb
+    tablica = koncowki.otworz()                   # w bocie, np. w __init__
+    ruch = tablica.najlepszy_ruch(plansza, ruchy, ruchy_bez_bicia)  # None poza tablicą
+
+    python koncowki.py --sprawdz 300              # self-play z losowych pozycji i liczników
+"""
+import itertools
+import math
+import os
+import struct
+import time
+
+import numpy as np
+
+from silnik_bity import (BIT_POLA, PELNA, _bicia_z_bitow, obroc, pelne_ruchy_z_bitow, plansza_na_bity,
+                         wykonaj_ruch_bity)
+
+MAGIA = b"WTBK"
+WERSJA = 2
+NAGLOWEK = struct.Struct("<4sBBBI")
+WPIS_KATALOGU = struct.Struct("<BBBBQQB")
+WYROWNANIE = 8
+
+DOMYSLNY_PLIK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "koncowki.wtb")
+LIMIT_RUCHOW = 20  # ruchy bez bicia/promocji do remisu (jak w GRA.start)
+
+# Wynik w trakcie liczenia: wygrana w d półruchach = BAZA - d, przegrana = -(BAZA - d), remis = 0
+BAZA = 1 << 20
+
+_C = [[math.comb(n, k) for k in range(33)] for n in range(33)]
+
+
+def _ranga(maska):
+    """Ranga kombinacji pól maski (system kombinatoryczny)."""
+    ranga = 0
+    i = 1
+    while maska:
+        najnizszy = maska & -maska
+        ranga += _C[najnizszy.bit_length() - 1][i]
+        maska ^= najnizszy
+        i += 1
+    return ranga
+
+
+def sklad(wlasne, przeciwne, krole):
+    """(pionki gracza, króle gracza, pionki przeciwnika, króle przeciwnika)."""
+    return ((wlasne & ~krole).bit_count(), (wlasne & krole).bit_count(),
+            (przeciwne & ~krole).bit_count(), (przeciwne & krole).bit_count())
+
+
+def rozmiar_skladu(s):
+    return _C[32][s[0]] * _C[32][s[1]] * _C[32][s[2]] * _C[32][s[3]]
+
+
+def indeks(wlasne, przeciwne, krole):
+    """Indeks pozycji w tablicy jej składu."""
+    i = 0
+    for grupa in (wlasne & ~krole, wlasne & krole, przeciwne & ~krole, przeciwne & krole):
+        i = i * _C[32][grupa.bit_count()] + _ranga(grupa)
+    return i
+
+
+def _lustro(s):
+    return s[2], s[3], s[0], s[1]
+
+
+def _po_ruchu(wlasne, przeciwne, krole, ruch):
+    """Pozycja po ruchu (ciągu skoków), już z perspektywy przeciwnika, i czy licznik się zeruje."""
+    pionki_przed = (wlasne & ~krole).bit_count()
+    for i in range(len(ruch) - 1):
+        wlasne, przeciwne, krole = wykonaj_ruch_bity(wlasne, przeciwne, krole, ruch[i:i + 2])
+    zeruje = abs(ruch[1][0] - ruch[0][0]) == 2 or (wlasne & ~krole).bit_count() < pionki_przed
+    return (obroc(przeciwne), obroc(wlasne), obroc(krole)), zeruje
+
+
+def _wynik_poprzednika(w):
+    """Wynik z perspektywy gracza, który wykonał ruch do pozycji o wyniku w."""
+    return -w + np.sign(w)
+
+
+def sklady(max_figur):
+    """Składy z co najmniej jedną figurą po każdej stronie, w kolejności liczenia."""
+    wynik = []
+    for n in range(2, max_figur + 1):
+        for s in itertools.product(range(n + 1), repeat=4):
+            if sum(s) == n and s[0] + s[1] > 0 and s[2] + s[3] > 0:
+                wynik.append(s)
+    # Bicie zmniejsza liczbę figur, promocja liczbę pionków - takie składy są liczone wcześniej
+    return sorted(wynik, key=lambda s: (sum(s), s[0] + s[2], s))
+
+
+def _pozycje(s):
+    """Wszystkie poprawne pozycje składu jako (wlasne, przeciwne, krole)."""
+    def maski(n, dozwolone):
+        return [sum(1 << p for p in pola) for pola in itertools.combinations(dozwolone, n)]
+
+    pionki = maski(s[0], range(4, 32))           # pionek gracza nie stoi w rzędzie promocji
+    krole = maski(s[1], range(32))
+    pionki_p = maski(s[2], range(0, 28))
+    krole_p = maski(s[3], range(32))
+    for a in pionki:
+        for b in krole:
+            if a & b:
+                continue
+            for c in pionki_p:
+                if (a | b) & c:
+                    continue
+                for d in krole_p:
+                    if (a | b | c) & d:
+                        continue
+                    yield a | b, c | d, b | d
+
+
+def _wartosc_zerujacego(tablice, pozycja):
+    """V_20 pozycji po biciu lub promocji, z perspektywy gracza na ruchu w tej pozycji."""
+    wlasne, przeciwne, krole = pozycja
+    if not wlasne:
+        return -BAZA  # brak figur - przegrana
+    return int(tablice[sklad(*pozycja)][LIMIT_RUCHOW - 1][indeks(*pozycja)])
+
+
+def _policz_grupe(grupa, tablice):
+    """Liczy V_1..V_20 dla składu i jego lustra (zwykłe ruchy przechodzą między nimi)."""
+    przesuniecia = {}
+    razem = 0
+    for s in grupa:
+        przesuniecia[s] = razem
+        razem += rozmiar_skladu(s)
+
+    # Następniki w formacie CSR: zwykły ruch -> indeks w grupie, bicie/promocja -> stały wynik
+    numery, poczatki, cele, stale, zerujace = [], [], [], [], []
+    for s in grupa:
+        for pozycja in _pozycje(s):
+            numery.append(przesuniecia[s] + indeks(*pozycja))
+            poczatki.append(len(cele))
+            for ruch in pelne_ruchy_z_bitow(*pozycja):
+                nastepna, zeruje = _po_ruchu(*pozycja, ruch)
+                if zeruje:
+                    cele.append(0)
+                    stale.append(_wartosc_zerujacego(tablice, nastepna))
+                else:
+                    cele.append(przesuniecia[sklad(*nastepna)] + indeks(*nastepna))
+                    stale.append(0)
+                zerujace.append(zeruje)
+
+    numery = np.array(numery, dtype=np.int64)
+    poczatki = np.array(poczatki, dtype=np.int64)
+    cele = np.array(cele, dtype=np.int64)
+    zerujace = np.array(zerujace, dtype=bool)
+    stale = _wynik_poprzednika(np.array(stale, dtype=np.int64))
+    ma_ruchy = np.diff(np.append(poczatki, len(cele))) > 0
+
+    wartosci = np.zeros(razem, dtype=np.int64)
+    warstwy = []
+    for r in range(1, LIMIT_RUCHOW + 1):
+        # Przy r = 1 zwykły ruch kończy się remisem (20. ruch bez bicia/promocji)
+        zwykle = _wynik_poprzednika(wartosci[cele]) if r > 1 else np.zeros(len(cele), dtype=np.int64)
+        kandydaci = np.where(zerujace, stale, zwykle)
+        nowe = np.zeros(razem, dtype=np.int64)
+        nowe[numery] = -BAZA  # bez ruchów - przegrana
+        if len(cele):
+            nowe[numery[ma_ruchy]] = np.maximum.reduceat(kandydaci, poczatki[ma_ruchy])
+        wartosci = nowe
+        warstwy.append(nowe)
+
+    # Skład -> tablica (warstwa r - 1, indeks pozycji)
+    warstwy = np.stack(warstwy)
+    return {s: warstwy[:, przesuniecia[s]:przesuniecia[s] + rozmiar_skladu(s)] for s in grupa}
+
+
+def _kody(wartosci):
+    """Wyniki -> kody w pliku (0 remis, odległość + 1)."""
+    return np.where(wartosci == 0, 0, BAZA - np.abs(wartosci) + 1)
+
+
+def zbuduj(max_figur=3, sciezka=DOMYSLNY_PLIK, pokaz=False):
+    """
+    Liczy tablice dla wszystkich pozycji do max_figur figur i zapisuje je do pliku.
+
+    Czas rośnie szybko z liczbą figur: 3 figury to kilkanaście sekund, 4 - godziny.
+    Plik zawiera LIMIT_RUCHOW warstw, więc jest tyle razy większy niż sama V_20.
+    """
+    tablice = {}
+    for s in sklady(max_figur):
+        if s in tablice:
+            continue
+        start = time.perf_counter()
+        grupa = [s] if _lustro(s) == s else [s, _lustro(s)]
+        tablice.update(_policz_grupe(grupa, tablice))
+        if pokaz:
+            print(f"Skład {grupa}: {time.perf_counter() - start:.1f}s")
+
+    lista = sklady(max_figur)
+    katalog = []
+    przesuniecie = NAGLOWEK.size + WPIS_KATALOGU.size * len(lista)
+    dane = []
+    for s in lista:
+        kody = _kody(tablice[s]).ravel()
+        kody = kody.astype(np.uint8 if kody.max(initial=0) < 256 else np.uint16)
+        przesuniecie += -przesuniecie % WYROWNANIE
+        katalog.append((s, przesuniecie, rozmiar_skladu(s), kody.itemsize))
+        dane.append((przesuniecie, kody))
+        przesuniecie += kody.nbytes
+
+    tymczasowy = f"{sciezka}.{os.getpid()}.tmp"
+    with open(tymczasowy, "wb") as f:
+        f.write(NAGLOWEK.pack(MAGIA, WERSJA, max_figur, LIMIT_RUCHOW, len(katalog)))
+        for s, offset, liczba, bajty in katalog:
+            f.write(WPIS_KATALOGU.pack(*s, offset, liczba, bajty))
+        for offset, kody in dane:
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(kody.astype(kody.dtype.newbyteorder("<")).tobytes())
+    os.replace(tymczasowy, sciezka)
+    return sciezka
+
+
+class TablicaKoncowek:
+    """Odczyt tablic z pliku mapowanego w pamięć (strony wczytywane przy odczycie)."""
+
+    def __init__(self, sciezka=DOMYSLNY_PLIK):
+        self.sciezka = sciezka
+        self._plik = np.memmap(sciezka, dtype=np.uint8, mode="r")
+        magia, wersja, self.max_figur, warstwy, liczba = NAGLOWEK.unpack_from(self._plik)
+        if magia != MAGIA or wersja != WERSJA or warstwy != LIMIT_RUCHOW:
+            raise ValueError(f"{sciezka}: nieobsługiwany format tablic końcówek (zbuduj plik od nowa)")
+        self._tablice = {}  # skład -> tablica (warstwa r - 1, indeks pozycji)
+        for i in range(liczba):
+            *s, offset, n, bajty = WPIS_KATALOGU.unpack_from(self._plik, NAGLOWEK.size + i * WPIS_KATALOGU.size)
+            dtype = np.dtype("<u1" if bajty == 1 else "<u2")
+            dane = self._plik[offset:offset + warstwy * n * bajty].view(dtype)
+            self._tablice[tuple(s)] = dane.reshape(warstwy, n)
+
+    def _wynik_bitow(self, wlasne, przeciwne, krole, ruchy_bez_bicia=0):
+        """Wynik (jak w trakcie liczenia) przy danym liczniku albo None, jeśli składu nie ma w pliku."""
+        if not wlasne:
+            return -BAZA
+        tablica = self._tablice.get(sklad(wlasne, przeciwne, krole))
+        if tablica is None:
+            return None
+        if ruchy_bez_bicia >= LIMIT_RUCHOW:
+            return 0  # V_0 - remis
+        kod = int(tablica[LIMIT_RUCHOW - 1 - ruchy_bez_bicia, indeks(wlasne, przeciwne, krole)])
+        if kod == 0:
+            return 0
+        odleglosc = kod - 1
+        return BAZA - odleglosc if odleglosc % 2 else -(BAZA - odleglosc)
+
+    def sonduj(self, plansza, ruchy_bez_bicia=0):
+        """
+        Wynik pozycji dla gracza na ruchu.
+
+        Args:
+            plansza: plansza z perspektywy gracza na ruchu
+            ruchy_bez_bicia: ruchy bez bicia/promocji wykonane dotąd (jak GRA.ruchy_bez_bicia_promocji)
+
+        Returns:
+            (wynik, odleglosc) - wynik 1 (wygrana), 0 (remis) lub -1 (przegrana),
+            odleglosc w półruchach do końca gry (0 dla remisu); None poza tablicą
+        """
+        w = self._wynik_bitow(*plansza_na_bity(plansza), ruchy_bez_bicia)
+        if w is None:
+            return None
+        if w == 0:
+            return 0, 0
+        return (1 if w > 0 else -1), BAZA - abs(w)
+
+    def _wynik_ruchu(self, wlasne, przeciwne, krole, ruch, ruchy_bez_bicia=0):
+        """
+        Wynik dla gracza wykonującego ruch (skok), z najlepszą kontynuacją wielobicia.
+
+        Po zwykłym ruchu sondowana jest V_(r-1) przeciwnika, po biciu lub promocji V_20.
+        """
+        pionki_przed = (wlasne & ~krole).bit_count()
+        for i in range(len(ruch) - 1):
+            wlasne, przeciwne, krole = wykonaj_ruch_bity(wlasne, przeciwne, krole, ruch[i:i + 2])
+        bicie = abs(ruch[-1][0] - ruch[-2][0]) == 2
+        if bicie:
+            koniec = 1 << BIT_POLA[tuple(ruch[-1])]
+            kolejne = _bicia_z_bitow(koniec, przeciwne, PELNA & ~(wlasne | przeciwne))
+            if kolejne:
+                wyniki = [self._wynik_ruchu(wlasne, przeciwne, krole, k) for k in kolejne]
+                return None if None in wyniki else max(wyniki)
+        zeruje = bicie or (wlasne & ~krole).bit_count() < pionki_przed
+        w = self._wynik_bitow(obroc(przeciwne), obroc(wlasne), obroc(krole), 0 if zeruje else ruchy_bez_bicia + 1)
+        if w is None:
+            return None
+        return int(_wynik_poprzednika(w))
+
+    def najlepszy_ruch(self, plansza, ruchy, ruchy_bez_bicia=0):
+        """
+        Najlepszy ruch z ruchy według tablicy (najszybsza wygrana, najdłuższa obrona).
+
+        Działa także dla pojedynczych skoków wielobicia i dla ruchów z pelne_bicia.
+
+        Args:
+            plansza: plansza z perspektywy gracza na ruchu
+            ruchy: legalne ruchy
+            ruchy_bez_bicia: ruchy bez bicia/promocji wykonane dotąd (jak GRA.ruchy_bez_bicia_promocji);
+                z zerem wygrana w połowie licznika może skończyć się remisem po 20 ruchach
+
+        Returns:
+            ruch z listy ruchy albo None, jeśli któraś pozycja jest poza tablicą
+        """
+        pozycja = plansza_na_bity(plansza)
+        najlepszy, najlepszy_wynik = None, None
+        for ruch in ruchy:
+            w = self._wynik_ruchu(*pozycja, ruch, ruchy_bez_bicia)
+            if w is None:
+                return None
+            if najlepszy_wynik is None or w > najlepszy_wynik:
+                najlepszy, najlepszy_wynik = ruch, w
+        return najlepszy
+
+
+def sprawdz(tablica, gry, seed=0):
+    """
+    Self-play według tablicy z losowych pozycji i liczników ruchów bez bicia/promocji.
+
+    Obie strony grają najlepszy_ruch; gra kończy się brakiem ruchów (przegrana
+    gracza na ruchu) albo 20. ruchem bez bicia/promocji (remis, jak w GRA.start).
+
+    Returns:
+        (liczba gier wygranych według tablicy, lista niezgodności (pozycja, licznik, sonda, przebieg))
+    """
+    import random
+
+    los = random.Random(seed)
+    pozycje = {s: list(_pozycje(s)) for s in tablica._tablice}
+    sklady_pliku = sorted(pozycje)
+    wygrane, bledy = 0, []
+    for _ in range(gry):
+        poczatek = los.choice(pozycje[los.choice(sklady_pliku)])
+        licznik = los.randrange(LIMIT_RUCHOW)
+        w = tablica._wynik_bitow(*poczatek, licznik)
+        if not w:
+            continue
+        wygrane += 1
+        oczekiwane = (1 if w > 0 else -1, BAZA - abs(w))
+        pozycja, n, polruchy, wynik = poczatek, licznik, 0, None
+        while wynik is None:
+            ruchy = pelne_ruchy_z_bitow(*pozycja)
+            if not ruchy:
+                # Przegrywa gracz na ruchu - wygrana gracza z pozycji początkowej, jeśli ruch ma przeciwnik
+                wynik = (-1 if polruchy % 2 == 0 else 1, polruchy)
+                break
+            ruch = max(ruchy, key=lambda r: tablica._wynik_ruchu(*pozycja, r, n))
+            nastepna, zeruje = _po_ruchu(*pozycja, ruch)
+            pozycja, n, polruchy = nastepna, 0 if zeruje else n + 1, polruchy + 1
+            if n >= LIMIT_RUCHOW:
+                wynik = (0, polruchy)
+        if wynik != oczekiwane:
+            bledy.append((poczatek, licznik, oczekiwane, wynik))
+    return wygrane, bledy
+
+
+_otwarte = {}
+
+
+def otworz(sciezka=DOMYSLNY_PLIK):
+    """Tablica końcówek z pliku (jedna instancja na plik w procesie)."""
+    if sciezka not in _otwarte:
+        _otwarte[sciezka] = TablicaKoncowek(sciezka)
+    return _otwarte[sciezka]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Budowa tablic końcówek")
+    parser.add_argument("--figury", type=int, default=3, help="maksymalna liczba figur na planszy")
+    parser.add_argument("--plik", default=DOMYSLNY_PLIK)
+    parser.add_argument("--sprawdz", type=int, default=0, metavar="GRY",
+                        help="zamiast budowy: self-play z istniejącego pliku od losowych pozycji i liczników")
+    args = parser.parse_args()
+
+    if args.sprawdz:
+        wygrane, bledy = sprawdz(TablicaKoncowek(args.plik), args.sprawdz)
+        for poczatek, licznik, oczekiwane, wynik in bledy[:10]:
+            print(f"Pozycja {poczatek}, licznik {licznik}: tablica {oczekiwane}, gra {wynik}")
+        print(f"Gry wygrane według tablicy: {wygrane}, niezgodne z tablicą (wynik lub długość): {len(bledy)}")
+        raise SystemExit(1 if bledy else 0)
+
+    start = time.perf_counter()
+    zbuduj(args.figury, args.plik, pokaz=True)
+    tablica = TablicaKoncowek(args.plik)
+    pozycje = sum(t.shape[1] for t in tablica._tablice.values())
+    print(f"Zapisano {args.plik}: {len(tablica._tablice)} składów, {pozycje} indeksów, "
+          f"{os.path.getsize(args.plik) / 2**20:.1f} MiB, {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,279 @@
+"""
+Mecz dwóch botów z sekwencyjnym testem (SPRT) - szybkie porównanie wersji bota.
+
+Gry rozgrywane są parami, równolegle w puli procesów. Obie gry pary zaczynają
+się z tego samego losowego otwarcia (kilka losowych półruchów od pozycji
+początkowej, wyznaczonych przez ziarno pary), z tym samym ziarnem i zamienionymi
+kolorami - boty deterministyczne nie powtarzają w kółko tych samych dwóch gier.
+
+Gry pary nie są niezależne, więc statystyka liczona jest na parach (model
+pentanomialny: para daje bot_a 0, 0.5, 1, 1.5 albo 2 punkty). Po każdej
+zakończonej parze aktualizowana jest ocena różnicy Elo (z przedziałem ufności)
+i log-iloraz wiarygodności (LLR) dla hipotez:
+    H0: bot_a jest lepszy o elo0,   H1: bot_a jest lepszy o elo1
+Mecz kończy się, gdy LLR przekroczy granicę (alfa, beta) albo po max_gier.
+LLR liczony jest w przybliżeniu normalnym dla średniego wyniku pary, jak
+w testach silników szachowych.
+
+Użycie:
+    python mecz.py alfabeta_bot random_bot --elo0 0 --elo1 50
+    wynik = rozegraj_mecz("nowy_bot", "stary_bot", elo0=0, elo1=10)
+"""
+import math
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from statistics import NormalDist
+
+import kalibracja
+from silnik import GRA, rozgrzej_boty
+
+# Domyślna liczba losowych półruchów otwarcia (parzysta - zaczyna bot1 jak w pozycji początkowej)
+POLRUCHY_OTWARCIA = 8
+
+# Punkty bot_a w parze: 0, 0.5, 1, 1.5, 2 -> średni wynik gry w parze
+WYNIKI_PAR = (0.0, 0.25, 0.5, 0.75, 1.0)
+
+
+def wynik_z_elo(elo):
+    """Oczekiwany wynik (0..1) przy różnicy Elo."""
+    return 1.0 / (1.0 + 10.0 ** (-elo / 400.0))
+
+
+def elo_z_wyniku(wynik):
+    """Różnica Elo dla średniego wyniku (0..1); ±inf dla 0 i 1."""
+    if wynik <= 0.0:
+        return -math.inf
+    if wynik >= 1.0:
+        return math.inf
+    return -400.0 * math.log10(1.0 / wynik - 1.0)
+
+
+def _srednia_wariancja(pary):
+    """Średni wynik gry i wariancja średniego wyniku pary; pary - liczby par z 0, 0.5, ..., 2 punktami."""
+    liczba = sum(pary)
+    srednia = sum(n * w for n, w in zip(pary, WYNIKI_PAR)) / liczba
+    wariancja = sum(n * (w - srednia) ** 2 for n, w in zip(pary, WYNIKI_PAR)) / liczba
+    return srednia, wariancja
+
+
+def przedzial_elo(pary, ufnosc=0.95):
+    """
+    Ocena różnicy Elo z przedziałem ufności (model pentanomialny).
+
+    Args:
+        pary: liczby par, w których bot_a zdobył 0, 0.5, 1, 1.5 i 2 punkty
+
+    Returns:
+        (elo, dolne, gorne)
+    """
+    liczba = sum(pary)
+    if liczba == 0:
+        return 0.0, -math.inf, math.inf
+    srednia, wariancja = _srednia_wariancja(pary)
+    z = NormalDist().inv_cdf(0.5 + ufnosc / 2.0)
+    margines = z * math.sqrt(wariancja / liczba)
+    return elo_z_wyniku(srednia), elo_z_wyniku(srednia - margines), elo_z_wyniku(srednia + margines)
+
+
+def llr(pary, elo0, elo1):
+    """Log-iloraz wiarygodności H1 (elo1) względem H0 (elo0), przybliżenie normalne na parach gier."""
+    liczba = sum(pary)
+    if liczba == 0:
+        return 0.0
+    srednia, wariancja = _srednia_wariancja(pary)
+    if wariancja == 0.0:
+        # Wszystkie pary z tym samym wynikiem - wariancja z licznikami powiększonymi o 1/2
+        _, wariancja = _srednia_wariancja([n + 0.5 for n in pary])
+    s0, s1 = wynik_z_elo(elo0), wynik_z_elo(elo1)
+    return liczba * (s1 - s0) * (2.0 * srednia - s0 - s1) / (2.0 * wariancja)
+
+
+def granice_sprt(alfa, beta):
+    """(dolna, górna) granica LLR: poniżej - przyjmij H0, powyżej - przyjmij H1."""
+    return math.log(beta / (1.0 - alfa)), math.log((1.0 - beta) / alfa)
+
+
+def plansza_otwarcia(los, polruchy=POLRUCHY_OTWARCIA):
+    """
+    Pozycja po polruchy losowych półruchach od pozycji początkowej (wielobicie to jeden półruch).
+
+    Otwarcie, po którym gra się skończyła, jest losowane od nowa. polruchy jest parzyste,
+    więc plansza jest z perspektywy bota 1 i to on jest na ruchu (jak w GRA(plansza_startowa=...)).
+    """
+    if polruchy % 2:
+        raise ValueError("Liczba półruchów otwarcia musi być parzysta")
+    gra = GRA(None, None)
+    while True:
+        plansza = gra.plansza
+        for _ in range(polruchy):
+            ruchy = gra.znajdz_pelne_ruchy(plansza)
+            if not ruchy:
+                break
+            plansza, _, _ = gra.update(plansza, los.choice(ruchy))
+            plansza = gra.zamien_perspektywe(plansza)
+        else:
+            if gra.znajdz_pelne_ruchy(plansza):
+                return plansza
+
+
+def _rozegraj_gre(bot1, bot2, plansza_startowa, seed, benchmark_time, opcje_gry):
+    """Jedna gra w procesie roboczym. Zwraca 0 (remis), 1 lub 2 (zwycięzca)."""
+    gra = GRA(bot1, bot2, plansza_startowa=plansza_startowa, seed=seed, **opcje_gry)
+    return gra.start(benchmark_time=benchmark_time)
+
+
+def _punkty_a(wynik, a_pierwszy):
+    """Punkty bot_a w grze: 1 za wygraną, 0.5 za remis."""
+    if wynik == 0:
+        return 0.5
+    return 1.0 if (wynik == 1) == a_pierwszy else 0.0
+
+
+def rozegraj_mecz(bot_a, bot_b, elo0=0.0, elo1=10.0, alfa=0.05, beta=0.05, max_gier=20000,
+                  procesy=None, seed=0, opcje_gry=None, pokaz=False, polruchy_otwarcia=POLRUCHY_OTWARCIA):
+    """
+    Gra mecz bot_a - bot_b do rozstrzygnięcia SPRT (lub max_gier).
+
+    Args:
+        bot_a, bot_b: nazwy botów z folderu boty (bot_a to testowana wersja)
+        elo0, elo1: różnica Elo (bot_a względem bot_b) w hipotezie H0 i H1
+        alfa, beta: błąd pierwszego i drugiego rodzaju
+        max_gier: limit gier (mecz bez rozstrzygnięcia kończy się z decyzja None)
+        procesy: liczba procesów (domyślnie os.cpu_count())
+        seed: ziarno meczu - para i ma ziarno gier i otwarcia seed * 2**32 + i
+        opcje_gry: dodatkowe argumenty dla GRA (np. headless=True, backend="bity")
+        pokaz: wypisuj stan meczu po każdej parze
+        polruchy_otwarcia: liczba losowych półruchów otwarcia pary (parzysta; 0 - pozycja początkowa)
+
+    Limit czasu (kalibracja.benchmark_time) jest ustalany raz, przed startem puli.
+    Po decyzji niezaczęte pary są anulowane, a rozpoczęte - dokończone i wliczone.
+
+    Returns:
+        słownik: wygrane, remisy, przegrane (z perspektywy bot_a), gry, pary (liczby par
+        z 0, 0.5, 1, 1.5, 2 punktami bot_a), elo, elo_dolne, elo_gorne (95%), llr, granice,
+        decyzja ("H1" - bot_a lepszy o elo1, "H0", None), czas
+    """
+    opcje_gry = opcje_gry or {}
+    procesy = procesy or os.cpu_count()
+    benchmark_time = None if opcje_gry.get("headless") else \
+        kalibracja.benchmark_time(zegar=opcje_gry.get("zegar", "sciana"))
+    dolna, gorna = granice_sprt(alfa, beta)
+    start = time.perf_counter()
+    wyniki = [0, 0, 0]   # wygrane, remisy, przegrane bot_a
+    pary = [0] * len(WYNIKI_PAR)
+    decyzja = None
+    wartosc_llr = 0.0
+
+    with ProcessPoolExecutor(max_workers=procesy, initializer=rozgrzej_boty,
+                             initargs=([bot_a, bot_b],)) as pula:
+        w_toku = {}      # przyszłość -> (numer pary, czy bot_a jest bot1)
+        punkty_par = {}  # numer pary -> punkty bot_a w zakończonych grach pary
+        otwarcia = {}    # numer pary -> pozycja początkowa obu gier pary
+        numery = iter(range(max_gier // 2))
+
+        def zglos_gre(numer, a_pierwszy):
+            gracze = (bot_a, bot_b) if a_pierwszy else (bot_b, bot_a)
+            przyszlosc = pula.submit(_rozegraj_gre, *gracze, otwarcia[numer], seed * 2**32 + numer,
+                                     benchmark_time, opcje_gry)
+            w_toku[przyszlosc] = (numer, a_pierwszy)
+
+        def zglos():
+            numer = next(numery, None)
+            if numer is None:
+                return
+            # Para gier: to samo otwarcie i ziarno, zamienione kolory
+            otwarcia[numer] = plansza_otwarcia(random.Random(seed * 2**32 + numer), polruchy_otwarcia) \
+                if polruchy_otwarcia else None
+            punkty_par[numer] = []
+            zglos_gre(numer, True)
+            zglos_gre(numer, False)
+
+        def wlicz(przyszlosc):
+            """Wlicza grę; zwraca True, gdy zakończyła parę."""
+            numer, a_pierwszy = w_toku.pop(przyszlosc)
+            punkty = _punkty_a(przyszlosc.result(), a_pierwszy)
+            wyniki[0 if punkty == 1.0 else 1 if punkty == 0.5 else 2] += 1
+            punkty_par[numer].append(punkty)
+            if len(punkty_par[numer]) < 2:
+                return False
+            pary[int(2 * sum(punkty_par.pop(numer)))] += 1
+            del otwarcia[numer]
+            return True
+
+        for _ in range(procesy):
+            zglos()
+        while w_toku and decyzja is None:
+            gotowe, _ = wait(w_toku, return_when=FIRST_COMPLETED)
+            for przyszlosc in gotowe:
+                if not wlicz(przyszlosc):
+                    continue
+                # LLR zmienia się tylko po zakończeniu pary
+                wartosc_llr = llr(pary, elo0, elo1)
+                if wartosc_llr >= gorna:
+                    decyzja = "H1"
+                elif wartosc_llr <= dolna:
+                    decyzja = "H0"
+                if pokaz:
+                    elo, elo_dolne, elo_gorne = przedzial_elo(pary)
+                    print(f"\rGry: {sum(wyniki):>6}  W/R/P: {wyniki[0]}/{wyniki[1]}/{wyniki[2]}  "
+                          f"Elo: {elo:+7.1f} [{elo_dolne:+.1f}, {elo_gorne:+.1f}]  "
+                          f"LLR: {wartosc_llr:+.2f} ({dolna:+.2f}, {gorna:+.2f})", end="", flush=True)
+                if decyzja is None:
+                    zglos()
+
+        # Po decyzji anulowane są tylko pary, których żadna gra się nie zaczęła;
+        # pozostałe gry są dokończone, żeby każda wliczona gra należała do pełnej pary
+        numery_par = {}
+        for przyszlosc, (numer, _) in w_toku.items():
+            numery_par.setdefault(numer, []).append(przyszlosc)
+        for numer, przyszlosci in numery_par.items():
+            anulowane = [p for p in przyszlosci if p.cancel()]
+            if len(anulowane) == 2:
+                for p in anulowane:
+                    del w_toku[p]
+                continue
+            for p in anulowane:
+                # Druga gra pary już trwa lub się skończyła - anulowana jest zgłaszana od nowa
+                zglos_gre(*w_toku.pop(p))
+        for przyszlosc in list(w_toku):
+            wlicz(przyszlosc)
+        if sum(pary):
+            wartosc_llr = llr(pary, elo0, elo1)
+    if pokaz:
+        print()
+
+    elo, elo_dolne, elo_gorne = przedzial_elo(pary)
+    return {'wygrane': wyniki[0], 'remisy': wyniki[1], 'przegrane': wyniki[2], 'gry': sum(wyniki),
+            'pary': list(pary), 'elo': elo, 'elo_dolne': elo_dolne, 'elo_gorne': elo_gorne, 'llr': wartosc_llr,
+            'granice': (dolna, gorna), 'decyzja': decyzja, 'czas': time.perf_counter() - start}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Mecz dwóch botów z testem SPRT")
+    parser.add_argument("bot_a", help="testowany bot (nazwa pliku z folderu boty)")
+    parser.add_argument("bot_b", help="bot odniesienia")
+    parser.add_argument("--elo0", type=float, default=0.0, help="różnica Elo w H0")
+    parser.add_argument("--elo1", type=float, default=10.0, help="różnica Elo w H1")
+    parser.add_argument("--alfa", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument("--max-gier", type=int, default=20000)
+    parser.add_argument("--procesy", type=int, default=None, help="liczba procesów (domyślnie liczba rdzeni)")
+    parser.add_argument("--seed", type=int, default=None, help="ziarno meczu (domyślnie losowe)")
+    parser.add_argument("--backend", default="tablica", choices=["tablica", "bity"])
+    parser.add_argument("--headless", action="store_true", help="szybkie gry bez limitu czasu (boty zaufane)")
+    parser.add_argument("--otwarcie", type=int, default=POLRUCHY_OTWARCIA,
+                        help="losowe półruchy otwarcia każdej pary (parzyste; 0 - pozycja początkowa)")
+    args = parser.parse_args()
+
+    seed = random.getrandbits(31) if args.seed is None else args.seed
+    opcje_gry = {'backend': args.backend, 'headless': args.headless}
+    wynik = rozegraj_mecz(args.bot_a, args.bot_b, args.elo0, args.elo1, args.alfa, args.beta, args.max_gier,
+                          args.procesy, seed, opcje_gry, pokaz=True, polruchy_otwarcia=args.otwarcie)
+    opis = {"H1": f"{args.bot_a} lepszy o {args.elo1:g} Elo (H1)",
+            "H0": f"{args.bot_a} nie jest lepszy o {args.elo1:g} Elo (H0)",
+            None: "bez rozstrzygnięcia (limit gier)"}[wynik['decyzja']]
+    print(f"Wynik: {opis}; {wynik['gry']} gier w {wynik['czas']:.1f}s, seed {seed}")
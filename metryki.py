@@ -0,0 +1,196 @@
+"""
+Metryki gry: czas faz silnika, histogramy czasu ruchów botów i liczniki statusów.
+
+GRA(..., metryki=Metryki()) mierzy w pętli gry czas faz silnika (generowanie
+ruchów, widok planszy dla bota z zamianą perspektywy, wywołanie bota, wykonanie
+ruchu z kluczami Zobrista, binarny zapis, dziennik), a dla każdego bota czas
+ruchów (w sekundach i jako część benchmark_time) oraz liczbę ruchów według
+statusu (ok, flaga, losowy, timeout, auto), błędów i niepoprawnych ruchów.
+Bez metryk gra nie mierzy niczego - pomiar to opakowania metod włączane w start.
+
+Jeden obiekt Metryki może zbierać dane z wielu gier; metryki z procesów
+roboczych turnieju łączy się przez scal. Eksport: do_json / do_prometheus
+(format tekstowy Prometheusa) albo zapisz(plik) - format wg rozszerzenia.
+
+Użycie:
+    metryki = Metryki()
+    GRA("bot1", "bot2", metryki=metryki).start()
+    metryki.zapisz("gra.prom")
+"""
+import bisect
+import json
+
+# Fazy pętli gry
+FAZY = ("generowanie_ruchow", "widok", "wywolanie_bota", "wykonanie_ruchu", "zapis", "dziennik")
+
+# Granice kubełków histogramów (górne, włącznie; ostatni kubełek to +Inf)
+KUBELKI_SEKUNDY = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0)
+KUBELKI_WZGLEDNE = (0.1, 0.25, 0.5, 0.75, 0.9, 1.0, 1.5, 2.0)
+
+STATUSY = ("ok", "flaga", "losowy", "timeout", "auto", "blad", "niepoprawny")
+
+PREFIKS = "warcaby"
+
+
+class Histogram:
+    """Histogram z ustalonymi kubełkami (jak w Prometheusie), z sumą i maksimum."""
+
+    def __init__(self, kubelki):
+        self.kubelki = tuple(kubelki)
+        self.liczby = [0] * (len(self.kubelki) + 1)
+        self.suma = 0.0
+        self.maksimum = 0.0
+
+    def dodaj(self, wartosc):
+        self.liczby[bisect.bisect_left(self.kubelki, wartosc)] += 1
+        self.suma += wartosc
+        if wartosc > self.maksimum:
+            self.maksimum = wartosc
+
+    @property
+    def liczba(self):
+        return sum(self.liczby)
+
+    def scal(self, inny):
+        for i, n in enumerate(inny.liczby):
+            self.liczby[i] += n
+        self.suma += inny.suma
+        self.maksimum = max(self.maksimum, inny.maksimum)
+
+    def kwantyl(self, q):
+        """Przybliżony kwantyl - górna granica kubełka (inf dla ostatniego)."""
+        cel = q * self.liczba
+        narastajaco = 0
+        for granica, n in zip(self.kubelki + (float("inf"),), self.liczby):
+            narastajaco += n
+            if narastajaco >= cel and narastajaco > 0:
+                return granica
+        return 0.0
+
+    def slownik(self):
+        return {"kubelki": list(self.kubelki), "liczby": list(self.liczby), "suma": self.suma,
+                "liczba": self.liczba, "maksimum": self.maksimum, "p50": self.kwantyl(0.5),
+                "p99": self.kwantyl(0.99)}
+
+
+class _MetrykiBota:
+    def __init__(self):
+        self.czas = Histogram(KUBELKI_SEKUNDY)
+        self.wzgledny = Histogram(KUBELKI_WZGLEDNE)
+        self.statusy = dict.fromkeys(STATUSY, 0)
+
+    def scal(self, inne):
+        self.czas.scal(inne.czas)
+        self.wzgledny.scal(inne.wzgledny)
+        for status, n in inne.statusy.items():
+            self.statusy[status] += n
+
+
+class Metryki:
+    """Zbiera metryki jednej lub wielu gier."""
+
+    def __init__(self):
+        self.fazy = {faza: [0.0, 0] for faza in FAZY}   # faza -> [czas, liczba pomiarów]
+        self.boty = {}                                  # nazwa bota -> _MetrykiBota
+        self.gry = 0
+        self.wyniki = {"remis": 0, "bot1": 0, "bot2": 0}
+        self.czas_gier = 0.0
+
+    def faza(self, nazwa, czas):
+        wpis = self.fazy[nazwa]
+        wpis[0] += czas
+        wpis[1] += 1
+
+    def _bot(self, nazwa):
+        bot = self.boty.get(nazwa)
+        if bot is None:
+            bot = self.boty[nazwa] = _MetrykiBota()
+        return bot
+
+    def ruch_bota(self, nazwa, czas, benchmark_time, status):
+        """Ruch, o który pytany był bot: czas i status (ok, flaga, losowy, timeout)."""
+        bot = self._bot(nazwa)
+        bot.czas.dodaj(czas)
+        if 0 < benchmark_time < float("inf"):
+            bot.wzgledny.dodaj(czas / benchmark_time)
+        bot.statusy[status] += 1
+
+    def licz(self, nazwa, status):
+        """Zdarzenie bez pomiaru czasu: auto, blad, niepoprawny."""
+        self._bot(nazwa).statusy[status] += 1
+
+    def koniec_gry(self, wynik, czas):
+        self.gry += 1
+        self.wyniki[("remis", "bot1", "bot2")[wynik]] += 1
+        self.czas_gier += czas
+
+    def scal(self, inne):
+        """Dodaje metryki z innego obiektu (np. z procesu roboczego turnieju)."""
+        for faza, (czas, n) in inne.fazy.items():
+            wpis = self.fazy.setdefault(faza, [0.0, 0])
+            wpis[0] += czas
+            wpis[1] += n
+        for nazwa, bot in inne.boty.items():
+            self._bot(nazwa).scal(bot)
+        self.gry += inne.gry
+        for wynik, n in inne.wyniki.items():
+            self.wyniki[wynik] += n
+        self.czas_gier += inne.czas_gier
+        return self
+
+    def slownik(self):
+        czas_botow = sum(bot.czas.suma for bot in self.boty.values())
+        return {
+            "gry": self.gry,
+            "wyniki": dict(self.wyniki),
+            "czas_gier": self.czas_gier,
+            "czas_botow": czas_botow,
+            "czas_silnika": sum(czas for faza, (czas, _) in self.fazy.items() if faza != "wywolanie_bota"),
+            "fazy": {faza: {"czas": czas, "liczba": n} for faza, (czas, n) in self.fazy.items()},
+            "boty": {nazwa: {"czas_ruchu": bot.czas.slownik(), "czas_wzgledny": bot.wzgledny.slownik(),
+                             "statusy": dict(bot.statusy)}
+                     for nazwa, bot in self.boty.items()},
+        }
+
+    def do_json(self, wciecie=2):
+        return json.dumps(self.slownik(), indent=wciecie, ensure_ascii=False)
+
+    def do_prometheus(self):
+        """Metryki w formacie tekstowym Prometheusa."""
+        linie = []
+
+        def naglowek(nazwa, typ, opis):
+            linie.append(f"# HELP {PREFIKS}_{nazwa} {opis}")
+            linie.append(f"# TYPE {PREFIKS}_{nazwa} {typ}")
+
+        naglowek("gry_total", "counter", "Rozegrane gry wg wyniku")
+        for wynik, n in self.wyniki.items():
+            linie.append(f'{PREFIKS}_gry_total{{wynik="{wynik}"}} {n}')
+        naglowek("faza_sekundy_total", "counter", "Czas faz pętli gry w sekundach")
+        for faza, (czas, _) in self.fazy.items():
+            linie.append(f'{PREFIKS}_faza_sekundy_total{{faza="{faza}"}} {czas:.9f}')
+        naglowek("faza_pomiary_total", "counter", "Liczba pomiarów faz pętli gry")
+        for faza, (_, n) in self.fazy.items():
+            linie.append(f'{PREFIKS}_faza_pomiary_total{{faza="{faza}"}} {n}')
+        naglowek("ruchy_total", "counter", "Ruchy botów wg statusu")
+        for nazwa, bot in self.boty.items():
+            for status, n in bot.statusy.items():
+                linie.append(f'{PREFIKS}_ruchy_total{{bot="{nazwa}",status="{status}"}} {n}')
+        for metryka, opis, pole in (("czas_ruchu_sekundy", "Czas ruchu bota w sekundach", "czas"),
+                                    ("czas_ruchu_wzgledny", "Czas ruchu bota jako część benchmark_time", "wzgledny")):
+            naglowek(metryka, "histogram", opis)
+            for nazwa, bot in self.boty.items():
+                histogram = getattr(bot, pole)
+                narastajaco = 0
+                for granica, n in zip(histogram.kubelki + ("+Inf",), histogram.liczby):
+                    narastajaco += n
+                    linie.append(f'{PREFIKS}_{metryka}_bucket{{bot="{nazwa}",le="{granica}"}} {narastajaco}')
+                linie.append(f'{PREFIKS}_{metryka}_sum{{bot="{nazwa}"}} {histogram.suma:.9f}')
+                linie.append(f'{PREFIKS}_{metryka}_count{{bot="{nazwa}"}} {histogram.liczba}')
+        return "\n".join(linie) + "\n"
+
+    def zapisz(self, sciezka):
+        """Zapisuje metryki: .prom / .txt - format Prometheusa, w przeciwnym razie JSON."""
+        tekst = self.do_prometheus() if sciezka.endswith((".prom", ".txt")) else self.do_json()
+        with open(sciezka, "w", encoding="utf-8") as plik:
+            plik.write(tekst)
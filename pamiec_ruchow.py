@@ -0,0 +1,121 @@
+"""
+Ograniczona pamięć wyników generowania ruchów i update, z kluczem pozycji.
+
+GRA(..., pamiec_ruchow=PamiecRuchow()) zapamiętuje wyniki znajdz_legalne_ruchy,
+znajdz_pelne_ruchy i ruchów gracza na ruchu w pętli gry (z z_update=True także
+update). Ta sama pozycja (transpozycje, król krążący po tych samych polach,
+własne wywołanie silnika w każdej turze) nie jest wtedy skanowana od nowa.
+update jest tani (kopia planszy i kilka przypisań), więc wynik z pamięci, też
+kopiowany, zwykle nie jest szybszy - stąd z_update domyślnie wyłączone.
+
+Klucz to zawartość planszy (typ i bajty planszy int8 albo krotka pól planszy
+obiektowej), więc wynik z pamięci jest zawsze taki sam jak policzony od nowa.
+Wyniki są przechowywane jako krotki i plansze tylko do odczytu, a wywołujący
+dostaje kopię - zmiana zwróconej listy lub planszy nie psuje pamięci.
+
+Pamięć ma ograniczony rozmiar; po przepełnieniu usuwany jest wpis najdawniej
+używany ("lru") albo najdawniej dodany ("fifo"). Jedna pamięć może być wspólna
+dla wielu gier i botów w procesie.
+
+Użycie:
+    pamiec = PamiecRuchow(rozmiar=100_000)
+    gra = GRA(None, None, pamiec_ruchow=pamiec)
+    gra.znajdz_legalne_ruchy(plansza)
+    print(pamiec.statystyki())
+
+    python pamiec_ruchow.py --gry 200      # porównanie z grą bez pamięci
+"""
+from collections import OrderedDict
+
+WYMIANY = ("lru", "fifo")
+
+
+def klucz_planszy(plansza):
+    """Zwarty klucz zawartości planszy: typ i bajty planszy liczbowej albo krotka pól planszy obiektowej."""
+    if plansza.dtype == object:
+        return tuple(plansza.ravel().tolist())
+    return plansza.dtype.char, plansza.tobytes()
+
+
+class PamiecRuchow:
+    """Pamięć klucz -> wynik o ograniczonym rozmiarze, ze statystyką trafień."""
+
+    def __init__(self, rozmiar=65536, wymiana="lru", z_update=False):
+        """
+        Args:
+            rozmiar: maksymalna liczba wpisów
+            wymiana: "lru" - usuwany najdawniej używany wpis, "fifo" - najdawniej dodany
+            z_update: zapamiętuj też wyniki update (plansza po ruchu)
+        """
+        if wymiana not in WYMIANY:
+            raise ValueError(f"Nieznana wymiana: {wymiana}")
+        if rozmiar < 1:
+            raise ValueError("Rozmiar pamięci musi być dodatni")
+        self.rozmiar = rozmiar
+        self.wymiana = wymiana
+        self.z_update = z_update
+        self._wpisy = OrderedDict()
+        self.trafienia = 0
+        self.chybienia = 0
+        self.usuniete = 0
+
+    def __len__(self):
+        return len(self._wpisy)
+
+    def pobierz(self, klucz):
+        """Zapamiętany wynik albo None."""
+        wynik = self._wpisy.get(klucz)
+        if wynik is None:
+            self.chybienia += 1
+            return None
+        self.trafienia += 1
+        if self.wymiana == "lru":
+            self._wpisy.move_to_end(klucz)
+        return wynik
+
+    def dodaj(self, klucz, wynik):
+        """Zapamiętuje wynik (niezmienny - krotka, plansza tylko do odczytu)."""
+        self._wpisy[klucz] = wynik
+        if len(self._wpisy) > self.rozmiar:
+            self._wpisy.popitem(last=False)
+            self.usuniete += 1
+
+    def wyczysc(self):
+        """Usuwa wpisy i zeruje statystyki."""
+        self._wpisy.clear()
+        self.trafienia = self.chybienia = self.usuniete = 0
+
+    @property
+    def skutecznosc(self):
+        """Odsetek trafień (0..1)."""
+        zapytania = self.trafienia + self.chybienia
+        return self.trafienia / zapytania if zapytania else 0.0
+
+    def statystyki(self):
+        return {'wpisy': len(self._wpisy), 'rozmiar': self.rozmiar, 'wymiana': self.wymiana,
+                'trafienia': self.trafienia, 'chybienia': self.chybienia, 'usuniete': self.usuniete,
+                'skutecznosc': self.skutecznosc}
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from silnik import GRA
+
+    parser = argparse.ArgumentParser(description="Gry random_bot z pamięcią ruchów i bez niej")
+    parser.add_argument("--gry", type=int, default=200)
+    parser.add_argument("--rozmiar", type=int, default=65536)
+    parser.add_argument("--wymiana", default="lru", choices=WYMIANY)
+    parser.add_argument("--backend", default="tablica", choices=["tablica", "bity"])
+    parser.add_argument("--z-update", action="store_true", help="zapamiętuj też wyniki update")
+    args = parser.parse_args()
+
+    wyniki = {}
+    for nazwa, pamiec in (("bez pamięci", None), ("z pamięcią", PamiecRuchow(args.rozmiar, args.wymiana, args.z_update))):
+        start = time.perf_counter()
+        wyniki[nazwa] = [GRA("random_bot", "random_bot", headless=True, seed=i, backend=args.backend,
+                             pamiec_ruchow=pamiec).start() for i in range(args.gry)]
+        print(f"{nazwa:<12} {time.perf_counter() - start:.2f}s")
+    assert wyniki["bez pamięci"] == wyniki["z pamięcią"], "Różne wyniki gier"
+    print(pamiec.statystyki())
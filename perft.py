@@ -0,0 +1,249 @@
+"""
+Perft - liczba liści drzewa gry do zadanej głębokości.
+
+Test poprawności i szybkości generatora ruchów: znajdz_legalne_ruchy,
+_znajdz_bicia i update z GRA. Głębokość liczona jest w turach - wielobicie
+jest rozwijane skok po skoku tak jak w GRA.start, a każda różna droga bicia
+to osobna gałąź. Po każdej turze plansza jest obracana (zamien_perspektywe).
+
+Wyniki porównywane są z zapisanymi liczbami referencyjnymi (REFERENCJE),
+więc każdy backend (i każdy nowy, szybszy) jest sprawdzany automatycznie.
+
+Użycie:
+    python perft.py                              # wszystkie konfiguracje, porównanie z referencją
+    python perft.py --pozycja start --glebokosc 7 --backend bity
+    python perft.py --pozycja wielobicie --podzial 3
+"""
+import time
+
+import numpy as np
+
+from pozycja import Pozycja
+from silnik import GRA, plansza_kompaktowa
+from silnik_bity import POLA
+
+
+def plansza_z_napisu(napis):
+    """
+    Plansza z napisu: 32 cyfry (0-4) dla ciemnych pól, wierszami od góry.
+
+    Spacje są pomijane, więc napis można podzielić na wiersze po 4 pola.
+    """
+    pola = napis.replace(" ", "")
+    if len(pola) != 32:
+        raise ValueError("Napis planszy musi mieć 32 pola")
+    plansza = np.full((8, 8), None, dtype=object)
+    for (r, c), pole in zip(POLA, pola):
+        plansza[r, c] = int(pole)
+    return plansza
+
+
+# Pozycje z perspektywy gracza na ruchu (figury 1 i 3)
+POZYCJE = {
+    # Pozycja startowa
+    "start": "2222 2222 2222 0000 0000 1111 1111 1111",
+    # Pion z rozgałęzionym wielobiciem, także do tyłu
+    "wielobicie": "0000 0200 0000 0220 0010 0220 0000 0000",
+    # Bicie kończące się promocją i dalsze bicie już królem
+    "promocja": "0000 2022 0000 0200 1000 0010 0004 0003",
+    # Same króle - dużo zwykłych ruchów, bez promocji
+    "krole": "0004 0000 0400 0000 0000 0030 0000 3000",
+    # Środek gry z obowiązkowymi biciami po obu stronach
+    "srodek_gry": "2220 2202 0222 2000 0111 1010 1101 1111",
+}
+
+# Liczby liści dla głębokości 1, 2, ... (tablica i bity muszą je odtworzyć)
+REFERENCJE = {
+    "start": [7, 49, 302, 1469, 7482, 37986, 190146],
+    "wielobicie": [4, 12, 24, 84, 234, 861, 2150, 9764, 30824, 146494],
+    "promocja": [1, 2, 11, 37, 195, 556, 2634, 8726, 43266],
+    "krole": [5, 25, 128, 679, 3658, 19795, 108960],
+    "srodek_gry": [11, 56, 269, 1360, 6273, 31469, 152243],
+}
+
+# Głębokości sprawdzane domyślnie (kilka sekund na konfigurację)
+DOMYSLNE_GLEBOKOSCI = {"start": 6, "wielobicie": 9, "promocja": 8, "krole": 6, "srodek_gry": 6}
+
+
+def _po_turze(gra, plansza, ruch):
+    """
+    Plansze po turze zaczętej ruchem ruch (przed zamianą perspektywy).
+
+    Po biciu, jeśli figura może bić dalej, każde kolejne bicie to osobna
+    gałąź - jak w pętli wielobicia GRA.start.
+    """
+    nowa_plansza, bylo_bicie, (r, c) = gra.update(plansza, ruch)
+    if bylo_bicie and len(ruch) == 2:
+        kolejne = gra._znajdz_bicia(nowa_plansza, r, c, nowa_plansza[r, c])
+        if kolejne:
+            for kolejny in kolejne:
+                yield from _po_turze(gra, nowa_plansza, kolejny)
+            return
+    yield nowa_plansza
+
+
+def _ruchy(gra, plansza, pelne):
+    return gra.znajdz_pelne_ruchy(plansza) if pelne else gra.znajdz_legalne_ruchy(plansza)
+
+
+def perft(gra, plansza, glebokosc, pelne=False):
+    """
+    Liczba liści drzewa gry o głębokości glebokosc (w turach).
+
+    Args:
+        gra: GRA wyznaczająca backend i format planszy
+        plansza: pozycja z perspektywy gracza na ruchu
+        glebokosc: liczba tur
+        pelne: jeśli True, ruchy z znajdz_pelne_ruchy (wielobicie jako jeden ruch);
+            wynik musi być taki sam jak skok po skoku
+    """
+    if glebokosc == 0:
+        return 1
+    liscie = 0
+    for ruch in _ruchy(gra, plansza, pelne):
+        for po_turze in _po_turze(gra, plansza, ruch):
+            if glebokosc == 1:
+                liscie += 1
+            else:
+                liscie += perft(gra, gra.zamien_perspektywe(po_turze), glebokosc - 1, pelne)
+    return liscie
+
+
+def _tury_w_miejscu(pozycja, ruch):
+    """Jak _po_turze, ale w miejscu (Pozycja.wykonaj / cofnij); pozycja jest gotowa w chwili yield."""
+    cofniecie = pozycja.wykonaj(ruch, koniec_tury=False)
+    kolejne = []
+    if len(ruch) == 2 and abs(ruch[1][0] - ruch[0][0]) == 2:
+        kolejne = pozycja.bicia(*ruch[1])
+    if kolejne:
+        for kolejny in kolejne:
+            yield from _tury_w_miejscu(pozycja, kolejny)
+    else:
+        pozycja.strona = 3 - pozycja.strona
+        yield
+    pozycja.cofnij(cofniecie)
+
+
+def perft_w_miejscu(pozycja, glebokosc, pelne=False):
+    """Perft na Pozycja: ruchy wykonywane i cofane w miejscu, bez kopii i zamiany perspektywy."""
+    if glebokosc == 0:
+        return 1
+    ruchy = pozycja.pelne_ruchy() if pelne else pozycja.legalne_ruchy()
+    liscie = 0
+    for ruch in ruchy:
+        for _ in _tury_w_miejscu(pozycja, ruch):
+            liscie += 1 if glebokosc == 1 else perft_w_miejscu(pozycja, glebokosc - 1, pelne)
+    return liscie
+
+
+def podzial(gra, plansza, glebokosc, pelne=False):
+    """Perft rozbity na pierwsze ruchy: słownik ruch -> liczba liści (do szukania różnic)."""
+    wynik = {}
+    for ruch in _ruchy(gra, plansza, pelne):
+        wynik[ruch] = sum(
+            perft(gra, gra.zamien_perspektywe(po_turze), glebokosc - 1, pelne)
+            for po_turze in _po_turze(gra, plansza, ruch)
+        )
+    return wynik
+
+
+def zmierz(nazwa, glebokosc, backend="tablica", kompaktowa=False, pelne=False, w_miejscu=False):
+    """
+    Perft pozycji z POZYCJE (w_miejscu - przez Pozycja.wykonaj / cofnij zamiast GRA.update).
+
+    Returns:
+        (liscie, wezly_na_sekunde)
+    """
+    gra = GRA(None, None, backend=backend, kompaktowa=kompaktowa)
+    plansza = plansza_z_napisu(POZYCJE[nazwa])
+    if kompaktowa:
+        plansza = plansza_kompaktowa(plansza)
+    start = time.perf_counter()
+    if w_miejscu:
+        liscie = perft_w_miejscu(Pozycja(plansza), glebokosc, pelne)
+    else:
+        liscie = perft(gra, plansza, glebokosc, pelne)
+    czas = time.perf_counter() - start
+    return liscie, liscie / czas if czas > 0 else float("inf")
+
+
+def sprawdz(konfiguracje=None, glebokosci=None):
+    """
+    Porównuje perft wszystkich pozycji z REFERENCJE dla każdej konfiguracji.
+
+    Args:
+        konfiguracje: lista słowników z argumentami zmierz (backend, kompaktowa, pelne)
+        glebokosci: słownik pozycja -> głębokość (domyślnie DOMYSLNE_GLEBOKOSCI)
+
+    Returns:
+        lista (konfiguracja, pozycja, glebokosc, liscie, oczekiwane, wezly_na_sekunde)
+    """
+    if konfiguracje is None:
+        konfiguracje = KONFIGURACJE
+    if glebokosci is None:
+        glebokosci = DOMYSLNE_GLEBOKOSCI
+    wyniki = []
+    for konfiguracja in konfiguracje:
+        for nazwa, oczekiwane in REFERENCJE.items():
+            glebokosc = min(glebokosci.get(nazwa, 0), len(oczekiwane))
+            if glebokosc == 0:
+                continue
+            liscie, nps = zmierz(nazwa, glebokosc, **konfiguracja)
+            wyniki.append((konfiguracja, nazwa, glebokosc, liscie, oczekiwane[glebokosc - 1], nps))
+    return wyniki
+
+
+KONFIGURACJE = [
+    {"backend": "tablica"},
+    {"backend": "tablica", "kompaktowa": True},
+    {"backend": "bity"},
+    {"backend": "bity", "kompaktowa": True},
+    {"backend": "bity", "pelne": True},
+    {"w_miejscu": True},
+    {"w_miejscu": True, "kompaktowa": True},
+    {"w_miejscu": True, "pelne": True},
+]
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Perft generatora ruchów")
+    parser.add_argument("--pozycja", default=None, choices=sorted(POZYCJE))
+    parser.add_argument("--glebokosc", type=int, default=None, help="domyślnie DOMYSLNE_GLEBOKOSCI")
+    parser.add_argument("--backend", default=None, choices=["tablica", "bity"])
+    parser.add_argument("--kompaktowa", action="store_true")
+    parser.add_argument("--pelne", action="store_true", help="wielobicie jako jeden ruch (znajdz_pelne_ruchy)")
+    parser.add_argument("--w-miejscu", action="store_true", help="Pozycja.wykonaj / cofnij zamiast GRA.update")
+    parser.add_argument("--podzial", type=int, default=None, metavar="N", help="perft N rozbity na pierwsze ruchy")
+    args = parser.parse_args()
+
+    if args.podzial is not None:
+        gra = GRA(None, None, backend=args.backend or "tablica", kompaktowa=args.kompaktowa)
+        plansza = plansza_z_napisu(POZYCJE[args.pozycja or "start"])
+        if args.kompaktowa:
+            plansza = plansza_kompaktowa(plansza)
+        wynik = podzial(gra, plansza, args.podzial, args.pelne)
+        for ruch, liscie in wynik.items():
+            print(f"{ruch}: {liscie}")
+        print(f"Razem: {sum(wynik.values())}")
+        sys.exit(0)
+
+    konfiguracje = KONFIGURACJE
+    if args.backend is not None or args.w_miejscu:
+        konfiguracje = [{"backend": args.backend or "tablica", "kompaktowa": args.kompaktowa, "pelne": args.pelne,
+                         "w_miejscu": args.w_miejscu}]
+    glebokosci = None
+    if args.pozycja is not None or args.glebokosc is not None:
+        glebokosci = {nazwa: args.glebokosc or DOMYSLNE_GLEBOKOSCI[nazwa] for nazwa in POZYCJE
+                      if args.pozycja in (None, nazwa)}
+
+    bledy = 0
+    for konfiguracja, nazwa, glebokosc, liscie, oczekiwane, nps in sprawdz(konfiguracje, glebokosci):
+        opis = ", ".join(f"{k}={v}" for k, v in konfiguracja.items() if v)
+        zgodne = liscie == oczekiwane
+        bledy += not zgodne
+        print(f"{opis:<32} {nazwa:<12} głębokość {glebokosc}: {liscie:>9} "
+              f"{'OK' if zgodne else f'BŁĄD (oczekiwano {oczekiwane})':<10} {nps:>10,.0f} liści/s")
+    sys.exit(1 if bledy else 0)
@@ -0,0 +1,168 @@
+"""
+Pozycja w stałych współrzędnych (perspektywa gracza 1) ze stroną na ruchu.
+
+Ruchy wykonywane są w miejscu i cofane na podstawie małego rekordu
+(Cofniecie) - bez kopiowania planszy i bez zamiany perspektywy, więc
+nadaje się do drzewa przeszukiwania. Ruchy generowane są dla dowolnej strony:
+gracz 1 ma figury 1/3 i idzie w górę (promocja w rzędzie 0), gracz 2 figury
+2/4 i idzie w dół (promocja w rzędzie 7).
+
+Kolejność ruchów gracza 2 odpowiada kolejności GRA.znajdz_legalne_ruchy na
+planszy obróconej do jego perspektywy (zob. wzgledne).
+
+Użycie:
+    pozycja = Pozycja(plansza)               # plansza jest modyfikowana w miejscu
+    for ruch in pozycja.pelne_ruchy():
+        cofniecie = pozycja.wykonaj(ruch)
+        ...                                   # teraz na ruchu jest przeciwnik
+        pozycja.cofnij(cofniecie)
+"""
+from collections import namedtuple
+
+# Gracz -> (pion, król, pion przeciwnika, król przeciwnika)
+FIGURY = {1: (1, 3, 2, 4), 2: (2, 4, 1, 3)}
+RZAD_PROMOCJI = {1: 0, 2: 7}
+
+# Kolejność pól i kierunków dla gracza 2 to kolejność gracza 1 po obrocie planszy
+_POLA = {1: [(r, c) for r in range(8) for c in range(8) if (r + c) % 2 == 1]}
+_POLA[2] = _POLA[1][::-1]
+_KIERUNKI_BICIA = {1: ((-1, -1), (-1, 1), (1, -1), (1, 1)), 2: ((1, 1), (1, -1), (-1, 1), (-1, -1))}
+_KIERUNKI_PIONA = {1: ((-1, -1), (-1, 1)), 2: ((1, 1), (1, -1))}
+
+# ruch: ciąg pól; figura: figura na polu startowym; zbite: ((pole, figura), ...);
+# promocja: czy figura została królem; strona: strona na ruchu przed ruchem
+Cofniecie = namedtuple("Cofniecie", "ruch figura zbite promocja strona")
+
+
+def wzgledne(ruch):
+    """Ruch gracza 2 w stałych współrzędnych -> ruch z jego perspektywy (i odwrotnie)."""
+    return tuple((7 - r, 7 - c) for r, c in ruch)
+
+
+class Pozycja:
+    """Plansza w stałych współrzędnych i strona na ruchu (1 lub 2)."""
+
+    def __init__(self, plansza, strona=1):
+        """
+        Args:
+            plansza: plansza 8x8 (dtype=object lub int8) z perspektywy gracza 1 - nie jest kopiowana
+            strona: gracz na ruchu
+        """
+        self.plansza = plansza
+        self.strona = strona
+
+    def bicia(self, row, col, strona=None):
+        """Bicia figury z pola (row, col) dla strony (domyślnie strony na ruchu)."""
+        strona = strona or self.strona
+        _, _, pion_p, krol_p = FIGURY[strona]
+        plansza = self.plansza
+        bicia = []
+        for dr, dc in _KIERUNKI_BICIA[strona]:
+            cel_r, cel_c = row + 2 * dr, col + 2 * dc
+            if not (0 <= cel_r < 8 and 0 <= cel_c < 8):
+                continue
+            if plansza[row + dr, col + dc] in (pion_p, krol_p) and plansza[cel_r, cel_c] == 0:
+                bicia.append(((row, col), (cel_r, cel_c)))
+        return bicia
+
+    def _ruchy_figury(self, row, col, figura, strona):
+        kierunki = _KIERUNKI_PIONA[strona] if figura == FIGURY[strona][0] else _KIERUNKI_BICIA[strona]
+        plansza = self.plansza
+        ruchy = []
+        for dr, dc in kierunki:
+            cel_r, cel_c = row + dr, col + dc
+            if 0 <= cel_r < 8 and 0 <= cel_c < 8 and plansza[cel_r, cel_c] == 0:
+                ruchy.append(((row, col), (cel_r, cel_c)))
+        return ruchy
+
+    def legalne_ruchy(self, strona=None):
+        """Legalne ruchy (pojedyncze skoki, bicia obowiązkowe) jak GRA.znajdz_legalne_ruchy."""
+        strona = strona or self.strona
+        pion, krol, _, _ = FIGURY[strona]
+        plansza = self.plansza
+        wlasne = [(r, c, plansza[r, c]) for r, c in _POLA[strona] if plansza[r, c] in (pion, krol)]
+        bicia = []
+        for r, c, _ in wlasne:
+            bicia.extend(self.bicia(r, c, strona))
+        if bicia:
+            return bicia
+        ruchy = []
+        for r, c, figura in wlasne:
+            ruchy.extend(self._ruchy_figury(r, c, figura, strona))
+        return ruchy
+
+    def pelne_ruchy(self, strona=None):
+        """Legalne ruchy z wielobiciem jako jednym ruchem, jak GRA.znajdz_pelne_ruchy."""
+        strona = strona or self.strona
+        ruchy = self.legalne_ruchy(strona)
+        if not ruchy or abs(ruchy[0][1][0] - ruchy[0][0][0]) != 2:
+            return ruchy
+        pelne = []
+        for ruch in ruchy:
+            self._rozwin(ruch, strona, pelne)
+        return pelne
+
+    def _rozwin(self, droga, strona, wynik):
+        cofniecie = self._skok(droga[-2:], strona)
+        kolejne = self.bicia(*droga[-1], strona)
+        if not kolejne:
+            wynik.append(droga)
+        for _, cel in kolejne:
+            self._rozwin(droga + (cel,), strona, wynik)
+        self._cofnij_skok(cofniecie)
+
+    def _skok(self, skok, strona):
+        """Pojedynczy skok w miejscu; zwraca (start, koniec, figura, zbite, promocja)."""
+        (r0, c0), (r1, c1) = skok
+        plansza = self.plansza
+        figura = plansza[r0, c0]
+        zbite = None
+        if abs(r1 - r0) == 2:
+            pole = ((r0 + r1) // 2, (c0 + c1) // 2)
+            zbite = (pole, plansza[pole])
+            plansza[pole] = 0
+        plansza[r0, c0] = 0
+        promocja = r1 == RZAD_PROMOCJI[strona] and figura == FIGURY[strona][0]
+        plansza[r1, c1] = FIGURY[strona][1] if promocja else figura
+        return (r0, c0), (r1, c1), figura, zbite, promocja
+
+    def _cofnij_skok(self, skok):
+        start, koniec, figura, zbite, _ = skok
+        plansza = self.plansza
+        plansza[koniec] = 0
+        plansza[start] = figura
+        if zbite is not None:
+            plansza[zbite[0]] = zbite[1]
+
+    def wykonaj(self, ruch, koniec_tury=True):
+        """
+        Wykonuje ruch (pojedynczy skok lub ciąg pól) w miejscu.
+
+        Args:
+            ruch: ((r0, c0), (r1, c1), ...) w stałych współrzędnych
+            koniec_tury: czy po ruchu na ruchu jest przeciwnik (False w trakcie wielobicia skok po skoku)
+
+        Returns:
+            Cofniecie dla cofnij
+        """
+        strona = self.strona
+        figura = self.plansza[ruch[0]]
+        zbite = []
+        promocja = False
+        for i in range(len(ruch) - 1):
+            _, _, _, zbity, awans = self._skok(ruch[i:i + 2], strona)
+            if zbity is not None:
+                zbite.append(zbity)
+            promocja = promocja or awans
+        if koniec_tury:
+            self.strona = 3 - strona
+        return Cofniecie(ruch, figura, tuple(zbite), promocja, strona)
+
+    def cofnij(self, cofniecie):
+        """Przywraca pozycję sprzed wykonaj (figurę, zbite figury, promocję i stronę na ruchu)."""
+        plansza = self.plansza
+        plansza[cofniecie.ruch[-1]] = 0
+        plansza[cofniecie.ruch[0]] = cofniecie.figura
+        for pole, figura in cofniecie.zbite:
+            plansza[pole] = figura
+        self.strona = cofniecie.strona
@@ -0,0 +1,352 @@
+"""
+Bot uruchomiony w osobnym, stałym procesie roboczym.
+
+Plansza przekazywana jest przez pamięć współdzieloną (64 bajty int8),
+a lista ruchów i wybrany ruch przez potok. Bot, który przekroczy
+twardy limit czasu, jest zabijany (kill) i uruchamiany od nowa, więc
+nie zużywa dalej CPU i nie spowalnia przeciwnika.
+
+Użycie w grze:
+    gra = GRA("bot1", "bot2", izolacja=True)
+
+Pomiar narzutu jednego ruchu (round-trip minus czas bota):
+    python proces_bota.py --ruchy 2000
+
+Pamięć bota jest ograniczana (RLIMIT_AS w procesie) i mierzona po każdym
+ruchu (szczytowe RSS ponad bazowe RSS procesu przed załadowaniem bota - tak
+jak RLIMIT_AS nie liczy bazowej przestrzeni); ta wartość jest też raportowana
+jako pamięć bota, obok szczytowego RSS całego procesu. Przekroczenie limitu karane jest tak jak
+przekroczenie 2x benchmark_time: losowy ruch, a proces jest restartowany.
+"""
+import math
+import multiprocessing
+import random
+import time
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows - bez wymuszania limitu pamięci
+    resource = None
+
+import kalibracja
+from silnik import LIMIT_PAMIECI, plansza_kompaktowa, plansza_obiektowa, zaladuj_bota
+
+# Czas na uruchomienie procesu i inicjalizację bota (import, __init__)
+LIMIT_STARTU = 60.0
+
+
+def _status_procesu(pole):
+    """Wartość pola (np. VmSize, VmHWM) z /proc/self/status w bajtach; None poza Linuxem."""
+    try:
+        with open("/proc/self/status") as f:
+            for linia in f:
+                if linia.startswith(pole + ":"):
+                    return int(linia.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _resetuj_szczyt_pamieci():
+    """Zeruje licznik szczytowego RSS (Linux), żeby mierzyć szczyt pojedynczego ruchu."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _szczyt_pamieci():
+    """Szczytowe RSS procesu w bajtach (od ostatniego resetu, jeśli był możliwy)."""
+    szczyt = _status_procesu("VmHWM")
+    if szczyt is None and resource is not None:
+        szczyt = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return szczyt or 0
+
+
+def _ustaw_limit_pamieci(limit):
+    """
+    Ogranicza przestrzeń adresową procesu do obecnej + limit.
+
+    Bazowa przestrzeń (interpreter, numpy) nie liczy się do limitu bota.
+    """
+    if limit is None or resource is None:
+        return
+    bazowa = _status_procesu("VmSize") or 0
+    _, twardy = resource.getrlimit(resource.RLIMIT_AS)
+    nowy = bazowa + limit
+    if twardy != resource.RLIM_INFINITY:
+        nowy = min(nowy, twardy)
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (nowy, nowy))
+    except (ValueError, OSError):
+        pass
+
+
+def _ustaw_seed(seed):
+    """Ziarno random / np.random procesu bota (jak GRA.start w procesie gry)."""
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+
+
+def _petla_bota(zrodlo_bota, pamiec_planszy, polaczenie, kompaktowa, zegar, limit_pamieci):
+    """Pętla procesu roboczego: czeka na ruchy, czyta planszę z pamięci współdzielonej, odsyła ruch."""
+    # Bazowe RSS (interpreter, numpy) nie liczy się do limitu - jak bazowa przestrzeń w RLIMIT_AS
+    bazowe_rss = _status_procesu("VmRSS") or 0
+    _ustaw_limit_pamieci(limit_pamieci)
+    bot = zaladuj_bota(zrodlo_bota) if isinstance(zrodlo_bota, str) else zrodlo_bota
+    obiektowa = not kompaktowa or getattr(bot, "plansza_obiektowa", False)
+    plansza_wspolna = np.frombuffer(pamiec_planszy, dtype=np.int8).reshape(8, 8)
+    teraz = kalibracja.ZEGARY[zegar]
+    polaczenie.send("gotowy")
+
+    while True:
+        try:
+            ruchy = polaczenie.recv()
+        except EOFError:
+            break
+        if ruchy is None:
+            break
+        if isinstance(ruchy, tuple):
+            # Komunikat sterujący: ("seed", ziarno) na początku gry albo ("benchmark_time", wartość)
+            if ruchy[0] == "seed":
+                _ustaw_seed(ruchy[1])
+            elif hasattr(bot, ruchy[0]):
+                setattr(bot, ruchy[0], ruchy[1])
+            continue
+
+        plansza = plansza_wspolna.copy()
+        if obiektowa:
+            plansza = plansza_obiektowa(plansza)
+
+        blad = None
+        brak_pamieci = False
+        _resetuj_szczyt_pamieci()
+        start_sciany = time.perf_counter()
+        start_time = teraz()
+        try:
+            ruch = bot.move(plansza, ruchy)
+        except MemoryError:
+            ruch = None
+            blad = "MemoryError"
+            brak_pamieci = True
+        except Exception as e:
+            ruch = None
+            blad = str(e)
+        czas_bota = teraz() - start_time
+        czas_sciany = time.perf_counter() - start_sciany
+        szczyt = _szczyt_pamieci()
+        pamiec = max(szczyt - bazowe_rss, 0)
+        if limit_pamieci is not None and pamiec > limit_pamieci:
+            brak_pamieci = True
+
+        try:
+            polaczenie.send((ruch, czas_bota, czas_sciany, pamiec, szczyt, brak_pamieci, blad))
+        except Exception as e:
+            # Ruch, którego nie da się przesłać (np. nie da się go zserializować)
+            polaczenie.send((None, czas_bota, czas_sciany, pamiec, szczyt, brak_pamieci, f"niepoprawny ruch: {e}"))
+
+
+class ProcesBota:
+    """Bot działający w osobnym procesie, z twardym limitem czasu na ruch."""
+
+    def __init__(self, bot, kompaktowa=False, zegar="sciana", limit_pamieci=LIMIT_PAMIECI, seed=None):
+        """
+        Args:
+            bot: nazwa bota z folderu boty lub instancja bota
+            kompaktowa: czy bot dostaje planszę int8 (jak w GRA(kompaktowa=True))
+            zegar: zegar z kalibracja.ZEGARY, którym proces mierzy czas ruchu bota
+            limit_pamieci: limit pamięci bota w bajtach (None - bez limitu)
+            seed: ziarno random / np.random w procesie bota (None - bez ustawiania);
+                ustawiane od nowa przez ustaw_seed na początku każdej gry
+        """
+        self.bot = bot
+        self.kompaktowa = kompaktowa
+        self.zegar = zegar
+        self.limit_pamieci = limit_pamieci
+        self.pamiec_planszy = multiprocessing.RawArray('b', 64)
+        self.plansza = np.frombuffer(self.pamiec_planszy, dtype=np.int8).reshape(8, 8)
+        self.proces = None
+        self.polaczenie = None
+        self.gotowy = False
+        self.benchmark_time = None
+        self.seed = seed
+
+        # Statystyki
+        self.restarty = 0
+        self.narzuty = []  # round-trip minus czas bota, w sekundach
+        self.pamiec_ruchow = []  # szczytowe RSS ponad bazowe w każdym ruchu (to, co liczy się do limitu), w bajtach
+        self.pamiec_procesu = []  # szczytowe RSS całego procesu w każdym ruchu, w bajtach
+        self.przekroczenia_pamieci = 0
+        self.ostatni_blad = None
+        self.przekroczono_pamiec = False
+
+        self._uruchom()
+
+    def _uruchom(self):
+        polaczenie, polaczenie_procesu = multiprocessing.Pipe()
+        self.proces = multiprocessing.Process(
+            target=_petla_bota,
+            args=(self.bot, self.pamiec_planszy, polaczenie_procesu, self.kompaktowa, self.zegar,
+                  self.limit_pamieci),
+            daemon=True,
+        )
+        self.proces.start()
+        polaczenie_procesu.close()
+        self.polaczenie = polaczenie
+        self.gotowy = False
+        if self.seed is not None:
+            self.polaczenie.send(("seed", self.seed))
+        if self.benchmark_time is not None:
+            self.polaczenie.send(("benchmark_time", self.benchmark_time))
+
+    def _zabij(self):
+        self.proces.kill()
+        self.proces.join()
+        self.polaczenie.close()
+
+    def _restart(self):
+        self._zabij()
+        self.restarty += 1
+        self._uruchom()
+
+    def _czekaj_na_start(self):
+        """Czeka, aż bot w procesie się zainicjalizuje (nie liczy się do czasu ruchu)."""
+        if self.gotowy:
+            return True
+        if self.polaczenie.poll(LIMIT_STARTU):
+            try:
+                self.gotowy = self.polaczenie.recv() == "gotowy"
+            except EOFError:
+                self.gotowy = False
+        if not self.gotowy:
+            self.ostatni_blad = "bot nie uruchomił się"
+            self._restart()
+        return self.gotowy
+
+    def ustaw_benchmark_time(self, benchmark_time):
+        """Przekazuje limit czasu botowi w procesie (jeśli bot ma atrybut benchmark_time)."""
+        self.benchmark_time = benchmark_time
+        self.polaczenie.send(("benchmark_time", benchmark_time))
+
+    def ustaw_seed(self, seed):
+        """Ustawia ziarno random / np.random w procesie bota (na początku gry - gra jest powtarzalna)."""
+        self.seed = seed
+        self.polaczenie.send(("seed", seed))
+
+    def wywolaj(self, plansza, ruchy, timeout):
+        """
+        Wywołuje bota w procesie.
+
+        Args:
+            plansza: aktualna plansza (dtype=object lub int8)
+            ruchy: legalne ruchy
+            timeout: limit czasu w sekundach; przy zegarze ściany po nim proces jest zabijany,
+                przy zegarze CPU - po kalibracja.LIMIT_SCIANY_CPU x timeout
+
+        Returns:
+            (ruch, czas_bota, przekroczono_limit) - ruch None, jeśli bot nie odpowiedział
+            albo zgłosił wyjątek (opis w self.ostatni_blad); przekroczono_limit jest True
+            także po przekroczeniu limitu pamięci (wtedy self.przekroczono_pamiec = True)
+        """
+        self.ostatni_blad = None
+        self.przekroczono_pamiec = False
+        if not self._czekaj_na_start():
+            return None, 0.0, False
+
+        self.plansza[:] = plansza_kompaktowa(plansza)
+        start_time = time.perf_counter()
+        self.polaczenie.send(ruchy)
+
+        limit_sciany = timeout if self.zegar == "sciana" else timeout * kalibracja.LIMIT_SCIANY_CPU
+        if not self.polaczenie.poll(None if math.isinf(limit_sciany) else limit_sciany):
+            czas = time.perf_counter() - start_time
+            self._restart()
+            return None, czas, True
+
+        try:
+            (ruch, czas_bota, czas_sciany, pamiec, szczyt, brak_pamieci,
+             self.ostatni_blad) = self.polaczenie.recv()
+        except EOFError:
+            # Proces bota padł w trakcie ruchu
+            czas = time.perf_counter() - start_time
+            self.ostatni_blad = "proces bota zakończył się"
+            self._restart()
+            return None, czas, False
+
+        self.narzuty.append(time.perf_counter() - start_time - czas_sciany)
+        self.pamiec_ruchow.append(pamiec)
+        self.pamiec_procesu.append(szczyt)
+        if brak_pamieci:
+            # Kara jak za przekroczenie czasu; restart zwalnia pamięć bota
+            self.przekroczono_pamiec = True
+            self.przekroczenia_pamieci += 1
+            self._restart()
+            return None, czas_bota, True
+        if czas_bota > timeout:
+            return None, czas_bota, True
+        return ruch, czas_bota, False
+
+    def statystyki(self):
+        """
+        Narzut komunikacji na ruch (w sekundach), szczytowa pamięć (w bajtach) i liczba restartów.
+
+        pamiec_szczytowa to szczyt ponad bazowe RSS (porównywalny z limit_pamieci),
+        pamiec_procesu_szczytowa - szczytowe RSS całego procesu.
+        """
+        if not self.narzuty:
+            return {'ruchy': 0, 'restarty': self.restarty, 'przekroczenia_pamieci': self.przekroczenia_pamieci}
+        narzuty = np.array(self.narzuty)
+        return {
+            'ruchy': len(narzuty),
+            'restarty': self.restarty,
+            'narzut_sredni': float(narzuty.mean()),
+            'narzut_mediana': float(np.median(narzuty)),
+            'narzut_p99': float(np.percentile(narzuty, 99)),
+            'pamiec_szczytowa': max(self.pamiec_ruchow),
+            'pamiec_procesu_szczytowa': max(self.pamiec_procesu),
+            'przekroczenia_pamieci': self.przekroczenia_pamieci,
+        }
+
+    def zamknij(self):
+        """Kończy proces bota."""
+        if self.proces is None:
+            return
+        try:
+            self.polaczenie.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.proces.join(timeout=1.0)
+        if self.proces.is_alive():
+            self.proces.kill()
+            self.proces.join()
+        self.polaczenie.close()
+        self.proces = None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from silnik import GRA
+
+    parser = argparse.ArgumentParser(description="Narzut wywołania bota w osobnym procesie")
+    parser.add_argument("--ruchy", type=int, default=2000)
+    parser.add_argument("--bot", default="random_bot")
+    args = parser.parse_args()
+
+    gra = GRA(None, None)
+    ruchy = gra.znajdz_legalne_ruchy(gra.plansza)
+
+    proces = ProcesBota(args.bot)
+    for _ in range(args.ruchy):
+        proces.wywolaj(gra.plansza, ruchy, timeout=5.0)
+    s = proces.statystyki()
+    proces.zamknij()
+
+    print(f"Ruchy: {s['ruchy']}, restarty: {s['restarty']}, "
+          f"szczytowa pamięć bota: {s['pamiec_szczytowa'] / 2**20:.1f} MiB "
+          f"(proces: {s['pamiec_procesu_szczytowa'] / 2**20:.1f} MiB)")
+    print(f"Narzut na ruch: średni {s['narzut_sredni'] * 1e6:.1f} µs, "
+          f"mediana {s['narzut_mediana'] * 1e6:.1f} µs, p99 {s['narzut_p99'] * 1e6:.1f} µs")
@@ -0,0 +1,239 @@
+"""
+Przyrostowe utrzymywanie legalnych ruchów obu stron.
+
+Dla każdego pola z figurą pamiętane są jej zwykłe ruchy i bicia (pojedyncze
+skoki), a dla każdej strony zbiory pól, z których są bicia i zwykłe ruchy.
+Skok zmienia tylko pole startu, końca i zbitej figury, a od zawartości tych
+pól zależą wyłącznie ruchy figur w odległości do 2 pól po przekątnej - po
+skoku przeliczane jest tylko to otoczenie, a nie cała plansza.
+
+Stan jest w stałych współrzędnych (jak GRA.plansza i pozycja.Pozycja), więc
+zmiana strony na ruchu niczego nie przelicza. Kolejność ruchów jest taka sama
+jak w GRA.znajdz_legalne_ruchy (dla gracza 2 - jak w Pozycja.legalne_ruchy).
+
+GRA(..., ruchy_przyrostowe=True) używa tego w pętli gry zamiast generowania
+ruchów od nowa w każdej turze.
+
+Użycie:
+    ruchy = RuchyPrzyrostowe(plansza)
+    ruchy.legalne_ruchy(1)
+    ...                                  # plansza zmieniona skokiem start -> koniec
+    ruchy.po_skoku(start, koniec, plansza)
+
+    python ruchy_przyrostowe.py --polruchy 20000 --krole 4   # porównanie z pełnym generowaniem
+"""
+from pozycja import FIGURY
+
+POLA = [(r, c) for r in range(8) for c in range(8) if (r + c) % 2 == 1]
+
+# Kolejność kierunków jak w pozycja.Pozycja (dla gracza 2 - kolejność gracza 1 po obrocie planszy)
+KIERUNKI_BICIA = {1: ((-1, -1), (-1, 1), (1, -1), (1, 1)), 2: ((1, 1), (1, -1), (-1, 1), (-1, -1))}
+KIERUNKI_PIONA = {1: ((-1, -1), (-1, 1)), 2: ((1, 1), (1, -1))}
+
+
+def _na_planszy(r, c):
+    return 0 <= r < 8 and 0 <= c < 8
+
+
+def _cele(kierunki, odleglosc):
+    """Pole -> pola w danej odległości w kolejnych kierunkach (tylko na planszy)."""
+    return {(r, c): [(r + odleglosc * dr, c + odleglosc * dc) for dr, dc in kierunki
+                     if _na_planszy(r + odleglosc * dr, c + odleglosc * dc)]
+            for r, c in POLA}
+
+
+# Strona -> pole -> [(pole bitej figury, pole docelowe), ...]
+BICIA = {strona: {(r, c): [((r + dr, c + dc), (r + 2 * dr, c + 2 * dc)) for dr, dc in kierunki
+                           if _na_planszy(r + 2 * dr, c + 2 * dc)]
+                  for r, c in POLA}
+         for strona, kierunki in KIERUNKI_BICIA.items()}
+RUCHY_PIONA = {strona: _cele(kierunki, 1) for strona, kierunki in KIERUNKI_PIONA.items()}
+RUCHY_KROLA = {strona: _cele(kierunki, 1) for strona, kierunki in KIERUNKI_BICIA.items()}
+
+# Pole -> pola, których ruchy zależą od jego zawartości (ono samo i pola do 2 kroków po przekątnej)
+OTOCZENIE = {pole: {pole} | set(_cele(KIERUNKI_BICIA[1], 1)[pole]) | set(_cele(KIERUNKI_BICIA[1], 2)[pole])
+             for pole in POLA}
+
+
+class RuchyPrzyrostowe:
+    """Ruchy i bicia każdej figury, aktualizowane po skoku tylko w otoczeniu zmienionych pól."""
+
+    def __init__(self, plansza):
+        """
+        Args:
+            plansza: plansza 8x8 (dtype=object lub int8) w stałych współrzędnych - nie jest kopiowana
+        """
+        self.pola = {pole: int(plansza[pole]) for pole in POLA}
+        self.ruchy = {}                          # pole -> zwykłe ruchy figury
+        self.bicia = {}                          # pole -> bicia figury
+        self.z_ruchami = {1: set(), 2: set()}    # strona -> pola figur mających zwykłe ruchy
+        self.z_biciami = {1: set(), 2: set()}    # strona -> pola figur mających bicia
+        self.przeliczone = 0                     # liczba przeliczeń pól (statystyka)
+        for pole in POLA:
+            self._przelicz(pole)
+
+    def _usun(self, pole):
+        """Usuwa ruchy i bicia figury z pola (według figury zapamiętanej w self.pola)."""
+        figura = self.pola[pole]
+        if figura == 0:
+            return
+        strona = 1 if figura in FIGURY[1][:2] else 2
+        self.z_ruchami[strona].discard(pole)
+        self.z_biciami[strona].discard(pole)
+        self.ruchy.pop(pole, None)
+        self.bicia.pop(pole, None)
+
+    def _przelicz(self, pole):
+        """Ruchy i bicia figury z pola."""
+        self.przeliczone += 1
+        self._usun(pole)
+        figura = self.pola[pole]
+        if figura == 0:
+            return
+        strona = 1 if figura in FIGURY[1][:2] else 2
+        _, krol, pion_p, krol_p = FIGURY[strona]
+        pola = self.pola
+
+        bicia = [(pole, cel) for bita, cel in BICIA[strona][pole]
+                 if pola[bita] in (pion_p, krol_p) and pola[cel] == 0]
+        if bicia:
+            self.bicia[pole] = bicia
+            self.z_biciami[strona].add(pole)
+
+        cele = RUCHY_KROLA[strona][pole] if figura == krol else RUCHY_PIONA[strona][pole]
+        ruchy = [(pole, cel) for cel in cele if pola[cel] == 0]
+        if ruchy:
+            self.ruchy[pole] = ruchy
+            self.z_ruchami[strona].add(pole)
+
+    def po_skoku(self, start, koniec, plansza):
+        """
+        Aktualizacja po pojedynczym skoku (ruchu lub biciu) wykonanym już na planszy.
+
+        Args:
+            start, koniec: pola skoku w stałych współrzędnych
+            plansza: plansza po skoku (figura na polu końcowym może być już królem)
+        """
+        zmienione = [start, koniec]
+        if abs(koniec[0] - start[0]) == 2:
+            zmienione.append(((start[0] + koniec[0]) // 2, (start[1] + koniec[1]) // 2))
+        do_przeliczenia = set()
+        for pole in zmienione:
+            self._usun(pole)
+            self.pola[pole] = int(plansza[pole])
+            do_przeliczenia |= OTOCZENIE[pole]
+        pola = self.pola
+        # Puste pola otoczenia nie mają ruchów - przeliczane są tylko figury
+        for pole in do_przeliczenia:
+            if pola[pole]:
+                self._przelicz(pole)
+
+    def sa_bicia(self, strona):
+        return bool(self.z_biciami[strona])
+
+    def legalne_ruchy(self, strona):
+        """Legalne ruchy strony (bicia obowiązkowe) w stałych współrzędnych, w kolejności GRA."""
+        pola, lista = (self.z_biciami[strona], self.bicia) if self.z_biciami[strona] else \
+            (self.z_ruchami[strona], self.ruchy)
+        wynik = []
+        for pole in sorted(pola, reverse=strona == 2):
+            wynik.extend(lista[pole])
+        return wynik
+
+    def bicia_pola(self, pole):
+        """Bicia figury z pola (kontynuacja wielobicia)."""
+        return list(self.bicia.get(pole, ()))
+
+
+def plansza_krolow(krole, los):
+    """Losowa końcówka: po krole królów każdej strony (plansza obiektowa, perspektywa gracza 1)."""
+    from silnik import GRA
+    plansza = GRA(None, None).plansza
+    for pole in POLA:
+        plansza[pole] = 0
+    for i, pole in enumerate(los.sample(POLA, 2 * krole)):
+        plansza[pole] = 3 if i < krole else 4
+    return plansza
+
+
+def porownaj(polruchy, krole=4, backend="tablica", kompaktowa=False, seed=0, maks_dlugosc=1000):
+    """
+    Gra losowymi ruchami w końcówkach królów i porównuje ruchy przyrostowe z generowanymi od nowa.
+
+    Końcówki nie kończą się po 20 ruchach bez bicia - gra trwa do braku ruchów albo
+    maks_dlugosc półruchów, potem losowana jest nowa końcówka.
+
+    Returns:
+        (czas pełnego generowania, czas przyrostowy, liczba przeliczonych pól na półruch);
+        oba czasy obejmują wykonanie ruchów (_update), przyrostowy - z aktualizacją po skoku
+    """
+    import random
+    import time
+
+    from pozycja import wzgledne
+    from silnik import GRA
+
+    los = random.Random(seed)
+    czas_pelny = czas_przyrostowy = 0.0
+    przeliczone = 0
+    zegar = time.perf_counter
+    wykonane = 0
+    while wykonane < polruchy:
+        plansza = plansza_krolow(krole, los)
+        pelna = GRA(None, None, backend=backend, kompaktowa=kompaktowa, plansza_startowa=plansza)
+        przyrostowa = GRA(None, None, backend=backend, kompaktowa=kompaktowa, plansza_startowa=plansza,
+                          ruchy_przyrostowe=True)
+        przyrostowa._ruchy_przyrostowe.przeliczone = 0
+        wielobicie = None
+        for _ in range(maks_dlugosc):
+            start = zegar()
+            ruchy = pelna._legalne_ruchy_na_ruchu(wielobicie)
+            czas_pelny += zegar() - start
+            start = zegar()
+            ruchy_przyrostowe = przyrostowa._legalne_ruchy_na_ruchu(wielobicie)
+            czas_przyrostowy += zegar() - start
+            if ruchy != ruchy_przyrostowe:
+                raise AssertionError(f"Różne ruchy: {ruchy} != {ruchy_przyrostowe}")
+
+            if not ruchy:
+                if wielobicie is None:
+                    break   # koniec gry
+                wielobicie = None
+                pelna.strona = przyrostowa.strona = 3 - pelna.strona
+                continue
+
+            ruch = los.choice(ruchy)
+            ruch_na_planszy = ruch if pelna.strona == 1 else wzgledne(ruch)
+            start = zegar()
+            pelna._update(ruch_na_planszy)
+            czas_pelny += zegar() - start
+            start = zegar()
+            _, _, koniec = przyrostowa._update(ruch_na_planszy)
+            czas_przyrostowy += zegar() - start
+            wykonane += 1
+            # Po biciu sprawdzana jest kontynuacja wielobicia, po zwykłym ruchu zmiana strony
+            if abs(ruch[1][0] - ruch[0][0]) == 2 and not pelna.pelne_bicia:
+                wielobicie = koniec if pelna.strona == 1 else wzgledne((koniec,))[0]
+            else:
+                pelna.strona = przyrostowa.strona = 3 - pelna.strona
+        przeliczone += przyrostowa._ruchy_przyrostowe.przeliczone
+    return czas_pelny, czas_przyrostowy, przeliczone / max(wykonane, 1)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ruchy przyrostowe vs generowanie od nowa w końcówkach królów")
+    parser.add_argument("--polruchy", type=int, default=20000)
+    parser.add_argument("--krole", type=int, default=4, help="liczba królów każdej strony")
+    parser.add_argument("--backend", default="tablica", choices=["tablica", "bity"])
+    parser.add_argument("--kompaktowa", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    czas_pelny, czas_przyrostowy, przeliczone = porownaj(args.polruchy, args.krole, args.backend,
+                                                         args.kompaktowa, args.seed)
+    print(f"Pełne generowanie: {czas_pelny:.3f}s  ({czas_pelny / args.polruchy * 1e6:.1f} µs/półruch, z _update)")
+    print(f"Przyrostowo:       {czas_przyrostowy:.3f}s  ({czas_przyrostowy / args.polruchy * 1e6:.1f} µs/półruch, "
+          f"{przeliczone:.1f} pól przeliczonych na półruch)")
+    print(f"Przyspieszenie:    {czas_pelny / czas_przyrostowy:.2f}x  (ruchy zgodne w każdym półruchu)")
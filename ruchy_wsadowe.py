@@ -0,0 +1,128 @@
+"""
+Wsadowe generowanie ruchów dla wielu plansz naraz.
+
+Zamiast N wywołań GRA.znajdz_legalne_ruchy, cały stos plansz (N, 8, 8)
+przetwarzany jest operacjami numpy. Wynik to płaska tablica ruchów oraz
+offsety: ruchy planszy i to ruchy[offsety[i]:offsety[i + 1]].
+"""
+import numpy as np
+
+from silnik import BIALE_POLE
+
+# Kolejność kierunków taka sama jak w GRA: (-1,-1), (-1,1), (1,-1), (1,1)
+KIERUNKI = np.array([(-1, -1), (-1, 1), (1, -1), (1, 1)], dtype=np.int8)
+
+
+def plansze_kompaktowe(plansze):
+    """Zamienia stos plansz (N, 8, 8) dtype=object na int8 (None -> BIALE_POLE)."""
+    plansze = np.asarray(plansze)
+    if plansze.dtype == np.int8:
+        return plansze
+    if plansze.dtype == object:
+        return np.where(plansze == None, BIALE_POLE, plansze).astype(np.int8)  # noqa: E711
+    return plansze.astype(np.int8)
+
+
+def znajdz_legalne_ruchy_wsadowo(plansze):
+    """
+    Znajduje legalne ruchy dla każdej planszy ze stosu.
+
+    Bicie jest obowiązkowe osobno dla każdej planszy: jeśli na planszy jest
+    jakiekolwiek bicie, zwracane są tylko bicia. Kolejność ruchów w obrębie
+    planszy jest taka sama jak w GRA.znajdz_legalne_ruchy.
+
+    Args:
+        plansze: numpy array (N, 8, 8), int8 lub dtype=object
+
+    Returns:
+        (ruchy, offsety, bicia)
+        - ruchy: int8 array (M, 4) z wierszami [start_row, start_col, end_row, end_col]
+        - offsety: int64 array (N + 1,)
+        - bicia: bool array (N,) - czy ruchy danej planszy są biciami
+    """
+    plansze = plansze_kompaktowe(plansze)
+    n = plansze.shape[0]
+
+    # Ramka o szerokości 2 z BIALE_POLE, żeby przesunięcia nie wychodziły poza tablicę
+    ramka = np.full((n, 12, 12), BIALE_POLE, dtype=np.int8)
+    ramka[:, 2:10, 2:10] = plansze
+
+    wlasne = (plansze == 1) | (plansze == 3)
+    krole = plansze == 3
+    przeciwne = (ramka == 2) | (ramka == 4)
+    puste = ramka == 0
+
+    bicia = np.empty((n, 8, 8, 4), dtype=bool)
+    ruchy = np.empty((n, 8, 8, 4), dtype=bool)
+    for k, (dr, dc) in enumerate(KIERUNKI.tolist()):
+        sasiad = (slice(None), slice(2 + dr, 10 + dr), slice(2 + dc, 10 + dc))
+        za_sasiadem = (slice(None), slice(2 + 2 * dr, 10 + 2 * dr), slice(2 + 2 * dc, 10 + 2 * dc))
+        bicia[..., k] = wlasne & przeciwne[sasiad] & puste[za_sasiadem]
+        # Pionki ruszają się tylko do przodu (dr = -1), króle we wszystkich kierunkach
+        ruchy[..., k] = (wlasne if dr < 0 else krole) & puste[sasiad]
+
+    ma_bicie = bicia.any(axis=(1, 2, 3))
+    wybrane = np.where(ma_bicie[:, None, None, None], bicia, ruchy)
+
+    # nonzero zwraca indeksy w kolejności (plansza, wiersz, kolumna, kierunek)
+    nr, wiersze, kolumny, kierunki = np.nonzero(wybrane)
+    skok = np.where(ma_bicie[nr], 2, 1).astype(np.int8)
+
+    wynik = np.empty((len(nr), 4), dtype=np.int8)
+    wynik[:, 0] = wiersze
+    wynik[:, 1] = kolumny
+    wynik[:, 2] = wiersze + KIERUNKI[kierunki, 0] * skok
+    wynik[:, 3] = kolumny + KIERUNKI[kierunki, 1] * skok
+
+    offsety = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(nr, minlength=n), out=offsety[1:])
+
+    return wynik, offsety, ma_bicie
+
+
+def ruchy_planszy(ruchy, offsety, i):
+    """Ruchy i-tej planszy w formacie GRA: lista ((start_row, start_col), (end_row, end_col))."""
+    return [((r0, c0), (r1, c1)) for r0, c0, r1, c1 in ruchy[offsety[i]:offsety[i + 1]].tolist()]
+
+
+if __name__ == "__main__":
+    import argparse
+    import random
+    import time
+
+    from silnik import GRA
+
+    parser = argparse.ArgumentParser(description="Porównanie generowania wsadowego z GRA.znajdz_legalne_ruchy")
+    parser.add_argument("--plansze", type=int, default=5000, help="liczba plansz w stosie")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Stos pozycji z losowych gier
+    random.seed(args.seed)
+    gra = GRA(None, None, kompaktowa=True)
+    plansze = []
+    plansza = gra.plansza
+    while len(plansze) < args.plansze:
+        legalne_ruchy = gra.znajdz_legalne_ruchy(plansza)
+        if not legalne_ruchy:
+            plansza = GRA(None, None, kompaktowa=True).plansza
+            continue
+        plansze.append(plansza)
+        plansza, _, _ = gra.update(plansza, random.choice(legalne_ruchy))
+        plansza = gra.zamien_perspektywe(plansza)
+    stos = np.stack(plansze)
+
+    start = time.perf_counter()
+    oczekiwane = [gra.znajdz_legalne_ruchy(p) for p in plansze]
+    czas_pojedynczo = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ruchy, offsety, _ = znajdz_legalne_ruchy_wsadowo(stos)
+    czas_wsadowo = time.perf_counter() - start
+
+    for i in range(len(plansze)):
+        assert ruchy_planszy(ruchy, offsety, i) == oczekiwane[i], f"Niezgodność dla planszy {i}"
+
+    print(f"Plansze: {len(plansze)}, ruchy: {len(ruchy)}")
+    print(f"Pojedynczo: {czas_pojedynczo:.3f}s, wsadowo: {czas_wsadowo:.3f}s "
+          f"(x{czas_pojedynczo / czas_wsadowo:.1f})")
@@ -1,30 +1,130 @@
 import numpy as np
 import importlib.util
+import math
 import os
 import time
 import threading
 import random
 import time
 
-def time_benchmark(iterations = (64,3)):
-    # Inicjalizacja macierzy 8x8
-    matrix = np.random.randint(0, 5, size=(8, 8), dtype=np.int8)
+import dziennik
+import kalibracja
+from pamiec_ruchow import klucz_planszy
+import silnik_bity
+import wyswietlanie
+from pozycja import Pozycja, wzgledne
+from ruchy_przyrostowe import RuchyPrzyrostowe
+import zapis_gry
+import zobrist
 
-    itt = iterations[0] ** iterations[1]
+# Limit pamięci bota w trybie izolacja (Zasady: 1 GiB RAM)
+LIMIT_PAMIECI = 1024 ** 3
 
-    start = time.time()
-    for i in range(itt):
-        np.sum(matrix)
+# Kompaktowa plansza (int8): wartość białego pola (odpowiednik None)
+BIALE_POLE = -1
 
-    end = time.time()
-    elapsed = end - start
+# Tablica zamiany pionków 1<->2, 3<->4 indeksowana bajtem pola (BIALE_POLE = 255)
+ZAMIANA_PIONKOW = np.arange(256, dtype=np.uint8).view(np.int8)
+ZAMIANA_PIONKOW[[1, 2, 3, 4]] = [2, 1, 4, 3]
 
-    return elapsed
 
+def plansza_kompaktowa(plansza):
+    """Zamienia planszę dtype=object na planszę int8 (None -> BIALE_POLE)."""
+    if plansza.dtype == np.int8:
+        return plansza
+    return np.array([[BIALE_POLE if p is None else p for p in row] for row in plansza], dtype=np.int8)
+
+
+def plansza_obiektowa(plansza):
+    """Zamienia planszę int8 na klasyczną planszę dtype=object (BIALE_POLE -> None)."""
+    if plansza.dtype == object:
+        return plansza
+    obiektowa = plansza.astype(object)
+    obiektowa[plansza == BIALE_POLE] = None
+    return obiektowa
+
+
+# Moduły botów importowane raz na proces i ciepłe instancje gotowe do kolejnej gry
+_MODULY_BOTOW = {}        # nazwa -> moduł
+_PULA_BOTOW = {}          # nazwa -> lista instancji po grze (tylko boty z metodą nowa_gra)
+ROZMIAR_PULI = 4          # maksymalna liczba ciepłych instancji jednego bota
+STATYSTYKI_BOTOW = {}     # nazwa -> {'import': s, 'tworzenie': s, 'instancje': n, 'z_puli': n}
+
+
+def modul_bota(nazwa_bota):
+    """Moduł bota z pliku w folderze boty - importowany raz na proces (czas w STATYSTYKI_BOTOW)."""
+    modul = _MODULY_BOTOW.get(nazwa_bota)
+    if modul is None:
+        start = time.perf_counter()
+        sciezka_bota = os.path.join(os.path.dirname(__file__), 'boty', f'{nazwa_bota}.py')
+        spec = importlib.util.spec_from_file_location(nazwa_bota, sciezka_bota)
+        modul = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(modul)
+        _MODULY_BOTOW[nazwa_bota] = modul
+        STATYSTYKI_BOTOW[nazwa_bota] = {'import': time.perf_counter() - start, 'tworzenie': 0.0,
+                                        'instancje': 0, 'z_puli': 0}
+    return modul
+
+
+def _nowa_instancja(nazwa_bota):
+    modul = modul_bota(nazwa_bota)
+    start = time.perf_counter()
+    bot = modul.bot()
+    statystyki = STATYSTYKI_BOTOW[nazwa_bota]
+    statystyki['tworzenie'] += time.perf_counter() - start
+    statystyki['instancje'] += 1
+    return bot
+
+
+def zaladuj_bota(nazwa_bota):
+    """
+    Instancja bota z pliku w folderze boty.
+
+    Moduł jest importowany raz na proces. Jeśli w puli jest ciepła instancja
+    (bot z metodą nowa_gra, oddany po poprzedniej grze), jest używana ponownie
+    po wywołaniu nowa_gra(); w przeciwnym razie tworzona jest nowa.
+    """
+    pula = _PULA_BOTOW.get(nazwa_bota)
+    if pula:
+        bot = pula.pop()
+        bot.nowa_gra()
+        STATYSTYKI_BOTOW[nazwa_bota]['z_puli'] += 1
+        return bot
+    return _nowa_instancja(nazwa_bota)
+
+
+def oddaj_bota(nazwa_bota, bot):
+    """Zwraca instancję po grze do puli - tylko boty z metodą nowa_gra (reset przed kolejną grą)."""
+    if not callable(getattr(bot, "nowa_gra", None)):
+        return
+    pula = _PULA_BOTOW.setdefault(nazwa_bota, [])
+    if len(pula) < ROZMIAR_PULI and not any(b is bot for b in pula):
+        pula.append(bot)
+
+
+def rozgrzej_boty(nazwy_botow, instancje=2):
+    """
+    Importuje boty i przygotowuje ciepłe instancje (np. w procesie roboczym turnieju),
+    żeby koszt startu nie przypadał na pierwszą grę.
+
+    Args:
+        nazwy_botow: nazwy botów z folderu boty
+        instancje: liczba instancji na bota z metodą nowa_gra (gra bota z samym sobą potrzebuje 2)
+    """
+    for nazwa in nazwy_botow:
+        if not callable(getattr(modul_bota(nazwa).bot, "nowa_gra", None)):
+            continue
+        pula = _PULA_BOTOW.setdefault(nazwa, [])
+        while len(pula) < min(instancje, ROZMIAR_PULI):
+            pula.append(_nowa_instancja(nazwa))
 
 
 class GRA:
-    def __init__(self, bot1, bot2, debug=False, time_flags=3):
+    def __init__(self, bot1, bot2, debug=False, time_flags=3, backend="tablica", kompaktowa=False,
+                 pelne_bicia=False, plansza_startowa=None, headless=False, izolacja=False,
+                 zegar="sciana", limit_pamieci=LIMIT_PAMIECI, zapis=None, seed=None,
+                 debug_poziom=dziennik.SZCZEGOLY, debug_plik="debug_gra.txt", metryki=None,
+                 pamiec_ruchow=None, ruchy_przyrostowe=False):
         """
         Inicjalizacja gry w warcaby.
 
@@ -36,20 +136,67 @@ class GRA:
         - 3 = król gracza
         - 4 = król przeciwnika
 
+        Stan gry (self.plansza) jest w stałych współrzędnych - z perspektywy bota 1 -
+        a self.strona to gracz na ruchu. Bot dostaje planszę ze swojej perspektywy
+        (widok), tworzoną dopiero wtedy, gdy trzeba o ruch zapytać bota.
+
         Args:
             bot1: pierwszy bot (instance lub string)
             bot2: drugi bot (instance lub string)
-            debug: jeśli True, zapisuje każdą planszę do pliku debug_gra.txt
+            debug: jeśli True, zapisuje przebieg gry do pliku debug_plik (w tle, moduł dziennik)
+            debug_poziom: szczegółowość dziennika: dziennik.WYNIK, dziennik.RUCHY lub dziennik.SZCZEGOLY
+            debug_plik: plik dziennika
+            backend: "tablica" (skanowanie planszy) lub "bity" (maski bitowe, silnik_bity)
+            kompaktowa: jeśli True, plansza jest tablicą int8 (białe pola = BIALE_POLE);
+                boty z atrybutem plansza_obiektowa = True dostają klasyczną planszę
+            pelne_bicia: jeśli True, wielobicie jest jednym ruchem - krotką kolejnych pól
+                ((r0, c0), (r1, c1), (r2, c2), ...), a bot jest pytany raz na turę
+            plansza_startowa: pozycja początkowa z perspektywy bota 1 (domyślnie standardowa)
+            headless: tryb szybkich gier (self-play, testy) - bez wyświetlania i debug,
+                z kompaktową planszą; boty są zaufane i wywoływane bezpośrednio, bez wątku
+            izolacja: jeśli True, każdy bot działa w osobnym procesie (proces_bota) i jest
+                zabijany po przekroczeniu 2x benchmark_time
+            zegar: czym mierzony jest czas bota i benchmark: "sciana" (perf_counter),
+                "cpu_watku" lub "cpu_procesu" (czas CPU - obciążona maszyna nie daje kar);
+                przy zegarze CPU twardy limit ściany to kalibracja.LIMIT_SCIANY_CPU x 2x benchmark_time
+            limit_pamieci: limit pamięci bota w bajtach (tylko z izolacja, None - bez limitu);
+                przekroczenie jest karane jak przekroczenie 2x benchmark_time
+            zapis: plik lub folder na binarny zapis gry (zapis_gry); dla folderu nazwa
+                pliku jest unikalna, więc równoległe gry się nie nadpisują
+            seed: ziarno random / np.random ustawiane na początku start() (z izolacja także w procesach
+                botów) i zapisywane w zapisie gry
+            metryki: metryki.Metryki zbierające czas faz silnika i czas ruchów botów (może być
+                wspólny dla wielu gier); None - bez pomiarów
+            pamiec_ruchow: pamiec_ruchow.PamiecRuchow na wyniki generowania ruchów i update
+                (może być wspólna dla wielu gier); None - bez pamięci
+            ruchy_przyrostowe: jeśli True, pętla gry nie generuje ruchów od nowa w każdej turze,
+                tylko utrzymuje je przyrostowo (ruchy_przyrostowe) - po każdym skoku przeliczane
+                jest otoczenie zmienionych pól; self.plansza zmienia się wtedy tylko przez ruchy
         """
+        if backend not in ("tablica", "bity"):
+            raise ValueError(f"Nieznany backend: {backend}")
+        if headless and debug:
+            raise ValueError("Tryb headless nie obsługuje debug")
+        if headless and izolacja:
+            raise ValueError("Tryb headless wywołuje boty bezpośrednio - nie łączy się z izolacja")
+        if zegar not in kalibracja.ZEGARY:
+            raise ValueError(f"Nieznany zegar: {zegar}")
+        self.zegar = zegar
+        self._zegar = kalibracja.ZEGARY[zegar]
+        self.headless = headless
+        if self.headless:
+            kompaktowa = True
+        self.backend = backend
         self.debug = debug
-        self.debug_file = None
+        self.dziennik = None
         self.move_number = 0
+        self.metryki = metryki
+        # Nazwy botów w metrykach: nazwa z folderu boty albo bot1 / bot2 dla instancji
+        self.nazwy_botow = tuple(bot if type(bot) == str else f"bot{i}" for i, bot in ((1, bot1), (2, bot2)))
 
         if self.debug:
-            self.debug_file = open("debug_gra.txt", "w", encoding="utf-8")
-            self.debug_file.write("="*70 + "\n")
-            self.debug_file.write("DEBUG GRY W WARCABY\n")
-            self.debug_file.write("="*70 + "\n\n")
+            self.dziennik = dziennik.Dziennik(debug_plik, debug_poziom)
+            self.dziennik.zapisz(dziennik.WYNIK, "{0}\nDEBUG GRY W WARCABY\n{0}\n\n", "="*70)
 
         # Inicjalizacja planszy 8x8
         self.plansza = np.full((8, 8), None, dtype=object)
@@ -66,31 +213,226 @@ class GRA:
                     else:
                         self.plansza[row, col] = 0  # Puste
 
+        if plansza_startowa is not None:
+            self.plansza = plansza_obiektowa(np.asarray(plansza_startowa)).copy()
+
+        self.kompaktowa = kompaktowa
+        self.pelne_bicia = pelne_bicia
+        self.zapis_sciezka = zapis
+        self.zapis = None
+        self.seed = seed
+        if self.kompaktowa:
+            self.plansza = plansza_kompaktowa(self.plansza)
+
         # Załaduj botów
-        if type(bot1) == str:
+        self._boty_z_folderu = []
+        self._porzucone_boty = []
+        if izolacja:
+            pass  # boty ładowane są w swoich procesach
+        elif type(bot1) == str:
             self.bot1 = self._zaladuj_bota(bot1)
         else:
             self.bot1 = bot1
 
-        if type(bot2) == str:
+        if izolacja:
+            pass
+        elif type(bot2) == str:
             self.bot2 = self._zaladuj_bota(bot2)
         else:
             self.bot2 = bot2
 
+        # Boty w osobnych procesach
+        self.izolacja = izolacja
+        if self.izolacja:
+            from proces_bota import ProcesBota
+            self.bot1 = ProcesBota(bot1, kompaktowa=self.kompaktowa, zegar=self.zegar,
+                                   limit_pamieci=limit_pamieci, seed=seed)
+            self.bot2 = ProcesBota(bot2, kompaktowa=self.kompaktowa, zegar=self.zegar,
+                                   limit_pamieci=limit_pamieci, seed=seed)
+
         self.bot1_time_flags = time_flags
         self.bot2_time_flags = time_flags
 
+        # Gracz na ruchu i widoki planszy z perspektywy graczy (ważne do następnego ruchu)
+        self.strona = 1
+        self._widoki = {}
+
+        # Klucze Zobrista planszy (perspektywa gracza 1) i planszy po zamianie perspektywy
+        # (perspektywa gracza 2), aktualizowane przyrostowo
+        self.klucz = zobrist.klucz_planszy(self.plansza)
+        self.klucz_odwrocony = zobrist.klucz_odwrocony(self.plansza)
+
         # Śledzenie pozycji i ruchów dla remisu
-        self.pozycje_planszy = {}  # hash -> liczba wystąpień
+        self.pozycje_planszy = {}  # klucz Zobrista -> liczba wystąpień
         self.ruchy_bez_bicia_promocji = 0  # licznik ruchów bez bicia/promocji
 
+        self._ruchy_przyrostowe = None
+        if ruchy_przyrostowe:
+            self._wlacz_ruchy_przyrostowe()
+
+        self.pamiec_ruchow = pamiec_ruchow
+        if pamiec_ruchow is not None:
+            self._wlacz_pamiec_ruchow()
+
+    def _wlacz_ruchy_przyrostowe(self):
+        """
+        Ruchy gracza na ruchu z RuchyPrzyrostowe (opakowania metod, jak przy metrykach):
+        _wykonaj_skok aktualizuje je po każdym skoku, a _legalne_ruchy_na_ruchu tylko je zbiera.
+        """
+        ruchy = self._ruchy_przyrostowe = RuchyPrzyrostowe(self.plansza)
+        wykonaj_skok = self._wykonaj_skok
+
+        def wykonaj_skok_przyrostowo(ruch):
+            wynik = wykonaj_skok(ruch)
+            ruchy.po_skoku(ruch[0], ruch[1], self.plansza)
+            return wynik
+
+        def legalne_ruchy_na_ruchu(pozycja_dla_wielobicia=None):
+            strona = self.strona
+            if pozycja_dla_wielobicia is not None:
+                pole = pozycja_dla_wielobicia if strona == 1 else wzgledne((pozycja_dla_wielobicia,))[0]
+                wynik = ruchy.bicia_pola(pole)
+            elif self.pelne_bicia and ruchy.sa_bicia(strona):
+                # Wielobicia rozwijane od nowa - bicia są rzadkie, a drzewo zależy od całej planszy
+                wynik = Pozycja(self.plansza, strona).pelne_ruchy()
+            else:
+                wynik = ruchy.legalne_ruchy(strona)
+            return wynik if strona == 1 else [wzgledne(ruch) for ruch in wynik]
+
+        self._wykonaj_skok = wykonaj_skok_przyrostowo
+        self._legalne_ruchy_na_ruchu = legalne_ruchy_na_ruchu
+
+    def _wlacz_pamiec_ruchow(self):
+        """
+        Generowanie ruchów (i update przy z_update) tej gry przez pamięć ruchów (opakowania
+        metod, jak przy metrykach - gra bez pamięci nie płaci za nią niczym).
+
+        Wyniki są w pamięci niezmienne (krotki, plansze tylko do odczytu), a wywołujący
+        dostaje kopie.
+        """
+        pamiec = self.pamiec_ruchow
+
+        def ruchy_z_pamieci(klucz, licz):
+            wynik = pamiec.pobierz(klucz)
+            if wynik is None:
+                wynik = tuple(licz())
+                pamiec.dodaj(klucz, wynik)
+            return list(wynik)
+
+        znajdz_legalne_ruchy = self.znajdz_legalne_ruchy
+        znajdz_pelne_ruchy = self.znajdz_pelne_ruchy
+        self.znajdz_legalne_ruchy = lambda plansza, tylko_dla_pozycji=None: ruchy_z_pamieci(
+            ("legalne", klucz_planszy(plansza), None if tylko_dla_pozycji is None else tuple(tylko_dla_pozycji)),
+            lambda: znajdz_legalne_ruchy(plansza, tylko_dla_pozycji))
+        self.znajdz_pelne_ruchy = lambda plansza: ruchy_z_pamieci(
+            ("pelne", klucz_planszy(plansza)), lambda: znajdz_pelne_ruchy(plansza))
+
+        if pamiec.z_update:
+            self.update = self._update_z_pamiecia(self.update)
+
+        # Ruchy gracza 2 w pętli gry liczone są bez znajdz_legalne_ruchy - osobne wpisy
+        legalne_na_ruchu = self._legalne_ruchy_na_ruchu
+
+        def legalne_na_ruchu_z_pamiecia(pozycja_dla_wielobicia=None):
+            if self.strona == 1:
+                return legalne_na_ruchu(pozycja_dla_wielobicia)
+            return ruchy_z_pamieci(
+                ("gracz2", self.pelne_bicia, klucz_planszy(self.plansza), pozycja_dla_wielobicia),
+                lambda: legalne_na_ruchu(pozycja_dla_wielobicia))
+
+        self._legalne_ruchy_na_ruchu = legalne_na_ruchu_z_pamiecia
+
+    def _update_z_pamiecia(self, update):
+        """update przez pamięć ruchów; zapamiętana plansza jest tylko do odczytu, wywołujący dostaje kopię."""
+        pamiec = self.pamiec_ruchow
+
+        def update_z_pamiecia(plansza, ruch):
+            klucz = ("update", klucz_planszy(plansza), tuple(map(tuple, ruch)))
+            wynik = pamiec.pobierz(klucz)
+            if wynik is None:
+                nowa_plansza, bylo_bicie, pozycja_koncowa = update(plansza, ruch)
+                zapamietana = nowa_plansza.copy()
+                zapamietana.flags.writeable = False
+                pamiec.dodaj(klucz, (zapamietana, bylo_bicie, pozycja_koncowa))
+                return nowa_plansza, bylo_bicie, pozycja_koncowa
+            return wynik[0].copy(), wynik[1], wynik[2]
+        return update_z_pamiecia
+
+    def widok(self, gracz):
+        """
+        Plansza z perspektywy gracza, tylko do odczytu.
+
+        Dla gracza 1 to widok self.plansza, dla gracza 2 plansza po zamianie perspektywy;
+        oba są tworzone przy pierwszym użyciu i pamiętane aż do kolejnego ruchu.
+        """
+        widok = self._widoki.get(gracz)
+        if widok is None:
+            widok = self.plansza.view() if gracz == 1 else self.zamien_perspektywe(self.plansza)
+            widok.flags.writeable = False
+            self._widoki[gracz] = widok
+        return widok
+
+    def _legalne_ruchy_na_ruchu(self, pozycja_dla_wielobicia=None):
+        """
+        Legalne ruchy gracza na ruchu, z jego perspektywy, bez zamiany perspektywy planszy.
+
+        Args:
+            pozycja_dla_wielobicia: pole (z perspektywy gracza) pionka w trakcie wielobicia -
+                wtedy tylko jego bicia
+        """
+        if self.strona == 1:
+            if pozycja_dla_wielobicia is not None:
+                row, col = pozycja_dla_wielobicia
+                piece = self.plansza[row, col]
+                if piece not in [1, 3]:
+                    return []
+                return self._znajdz_bicia(self.plansza, row, col, piece)
+            if self.pelne_bicia:
+                return self.znajdz_pelne_ruchy(self.plansza)
+            return self.znajdz_legalne_ruchy(self.plansza)
+
+        # Gracz 2: maski obrócone do jego perspektywy albo generator w stałych współrzędnych
+        if self.backend == "bity":
+            maski = silnik_bity.maski_strony(self.plansza, 2)
+            if pozycja_dla_wielobicia is not None:
+                return silnik_bity.bicia_pola_z_bitow(maski[0], maski[1], pozycja_dla_wielobicia)
+            if self.pelne_bicia:
+                return silnik_bity.pelne_ruchy_z_bitow(*maski)
+            return silnik_bity.legalne_ruchy_z_bitow(*maski)
+
+        pozycja = Pozycja(self.plansza, 2)
+        if pozycja_dla_wielobicia is not None:
+            row, col = wzgledne((pozycja_dla_wielobicia,))[0]
+            ruchy = pozycja.bicia(row, col) if self.plansza[row, col] in [2, 4] else []
+        elif self.pelne_bicia:
+            ruchy = pozycja.pelne_ruchy()
+        else:
+            ruchy = pozycja.legalne_ruchy()
+        return [wzgledne(ruch) for ruch in ruchy]
+
     def _zaladuj_bota(self, nazwa_bota):
-        """Ładuje klasę bota z pliku w folderze boty."""
-        sciezka_bota = os.path.join(os.path.dirname(__file__), 'boty', f'{nazwa_bota}.py')
-        spec = importlib.util.spec_from_file_location(nazwa_bota, sciezka_bota)
-        modul = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(modul)
-        return modul.bot()
+        """Ładuje bota z folderu boty (moduł raz na proces, ciepła instancja z puli, jeśli jest)."""
+        bot = zaladuj_bota(nazwa_bota)
+        self._boty_z_folderu.append((nazwa_bota, bot))
+        return bot
+
+    def _oddaj_boty(self):
+        """Po grze zwraca boty załadowane z folderu do puli ciepłych instancji."""
+        for nazwa_bota, bot in self._boty_z_folderu:
+            # Bot porzucony po timeoucie może wciąż liczyć w swoim wątku - nie wraca do puli
+            if not any(b is bot for b in self._porzucone_boty):
+                oddaj_bota(nazwa_bota, bot)
+        self._boty_z_folderu = []
+
+    def _plansza_dla_bota(self, bot, plansza):
+        """Plansza w formacie, którego oczekuje bot."""
+        if self.kompaktowa and getattr(bot, "plansza_obiektowa", False):
+            return plansza_obiektowa(plansza)
+        return plansza
+
+    def _widok_dla_bota(self, bot):
+        """Plansza dla bota na ruchu: widok z jego perspektywy w formacie, którego oczekuje."""
+        return self._plansza_dla_bota(bot, self.widok(self.strona))
 
     def _wywolaj_bota_z_timeoutem(self, bot, plansza, ruchy, timeout, bot_number):
         """
@@ -106,38 +448,198 @@ class GRA:
         Returns:
             (wybrany_ruch, czas_wykonania, przekroczono_limit)
         """
-        result = [None]
+        result = [None, 0.0, None]  # ruch, czas bota, wyjątek
+        zegar = self._zegar
 
         def bot_wrapper():
+            # W mierzonym oknie tylko ruch bota; wyjątek trafia do dziennika po pomiarze.
+            # Bot dostaje własną kopię ruchów - lista silnika służy do sprawdzenia ruchu i w dzienniku
+            start_bota = zegar()
             try:
-                result[0] = bot.move(plansza, ruchy)
+                result[0] = bot.move(plansza, list(ruchy))
             except Exception as e:
-                if self.debug:
-                    self.debug_file.write(f"\n!!! BŁĄD w bocie: {e}\n")
                 result[0] = None
+                result[2] = e
+            result[1] = zegar() - start_bota
+
+        # Przy zegarze CPU wątek jest porzucany dopiero po dłuższym limicie ściany
+        limit_sciany = timeout if self.zegar == "sciana" else timeout * kalibracja.LIMIT_SCIANY_CPU
 
-        start_time = time.time()
+        start_time = time.perf_counter()
         thread = threading.Thread(target=bot_wrapper)
         thread.daemon = True
         thread.start()
-        thread.join(timeout=timeout)
-        elapsed_time = time.time() - start_time
+        thread.join(timeout=None if math.isinf(limit_sciany) else limit_sciany)
+        elapsed_time = time.perf_counter() - start_time
+        if self.zegar != "sciana" and not thread.is_alive():
+            elapsed_time = result[1]
+
+        if result[2] is not None and not thread.is_alive():
+            self._licz_zdarzenie(bot_number, "blad")
+            if self.debug:
+                self.dziennik.zapisz(dziennik.RUCHY, "\n!!! BŁĄD w bocie: {}\n", result[2])
 
-        if thread.is_alive():
+        if thread.is_alive() or elapsed_time > timeout:
             # Bot nie skończył w czasie - zwróć losowy ruch
+            if thread.is_alive():
+                self._porzucone_boty.append(bot)
             if self.debug:
-                self.debug_file.write(f"\n!!! TIMEOUT! Bot{bot_number} przekroczył limit {timeout:.6f}s\n")
+                self.dziennik.zapisz(dziennik.RUCHY, "\n!!! TIMEOUT! Bot{} przekroczył limit {:.6f}s\n",
+                                     bot_number, timeout)
             return random.choice(ruchy), elapsed_time, True
 
         # Bot skończył w czasie
         if result[0] is None or result[0] not in ruchy:
             # Bot zwrócił niepoprawny ruch
+            if result[2] is None:
+                self._licz_zdarzenie(bot_number, "niepoprawny")
             if self.debug:
-                self.debug_file.write(f"\n!!! NIEPOPRAWNY RUCH od Bot{bot_number}: {result[0]}\n")
+                self.dziennik.zapisz(dziennik.RUCHY, "\n!!! NIEPOPRAWNY RUCH od Bot{}: {}\n", bot_number, result[0])
             return random.choice(ruchy), elapsed_time, False
 
         return result[0], elapsed_time, False
 
+    def _wywolaj_bota_w_procesie(self, bot, plansza, ruchy, timeout, bot_number):
+        """
+        Wywołuje bota działającego w osobnym procesie (tryb izolacja).
+
+        Po przekroczeniu timeoutu lub limitu pamięci proces bota jest zabijany
+        i uruchamiany od nowa, a zamiast ruchu bota wybierany jest losowy.
+
+        Returns:
+            (wybrany_ruch, czas_wykonania, przekroczono_limit)
+        """
+        wybrany_ruch, elapsed_time, przekroczono = bot.wywolaj(plansza, ruchy, timeout)
+
+        if self.debug and bot.pamiec_ruchow:
+            self.dziennik.zapisz(dziennik.SZCZEGOLY, "Pamięć bota (szczyt ponad bazową): {:.1f} MiB "
+                                 "(proces: {:.1f} MiB)\n", bot.pamiec_ruchow[-1] / 2**20,
+                                 bot.pamiec_procesu[-1] / 2**20)
+
+        if bot.przekroczono_pamiec:
+            if self.debug:
+                self.dziennik.zapisz(dziennik.RUCHY, "\n!!! PRZEKROCZONO LIMIT PAMIĘCI! Bot{} - proces zrestartowany\n",
+                                     bot_number)
+            return random.choice(ruchy), elapsed_time, True
+
+        if przekroczono:
+            if self.debug:
+                self.dziennik.zapisz(dziennik.RUCHY, "\n!!! TIMEOUT! Bot{} przekroczył limit {:.6f}s - proces zrestartowany\n",
+                                     bot_number, timeout)
+            return random.choice(ruchy), elapsed_time, True
+
+        if bot.ostatni_blad is not None:
+            self._licz_zdarzenie(bot_number, "blad")
+            if self.debug:
+                self.dziennik.zapisz(dziennik.RUCHY, "\n!!! BŁĄD w bocie: {}\n", bot.ostatni_blad)
+
+        if wybrany_ruch is None or wybrany_ruch not in ruchy:
+            if bot.ostatni_blad is None:
+                self._licz_zdarzenie(bot_number, "niepoprawny")
+            if self.debug:
+                self.dziennik.zapisz(dziennik.RUCHY, "\n!!! NIEPOPRAWNY RUCH od Bot{}: {}\n", bot_number, wybrany_ruch)
+            return random.choice(ruchy), elapsed_time, False
+
+        return wybrany_ruch, elapsed_time, False
+
+    def zamknij_procesy(self):
+        """Kończy procesy botów (tryb izolacja); w trybie debug zapisuje narzut i pamięć botów."""
+        if not self.izolacja:
+            return
+        for bot_number, bot in ((1, self.bot1), (2, self.bot2)):
+            if self.debug and not self.dziennik.zamkniety:
+                s = bot.statystyki()
+                if s['ruchy']:
+                    self.dziennik.zapisz(
+                        dziennik.WYNIK,
+                        "Bot{} proces: ruchy {}, restarty {}, narzut średni {:.1f}µs, p99 {:.1f}µs, "
+                        "pamięć szczytowa {:.1f} MiB (proces: {:.1f} MiB), przekroczenia pamięci {}\n",
+                        bot_number, s['ruchy'], s['restarty'], s['narzut_sredni'] * 1e6, s['narzut_p99'] * 1e6,
+                        s['pamiec_szczytowa'] / 2**20, s['pamiec_procesu_szczytowa'] / 2**20,
+                        s['przekroczenia_pamieci'],
+                    )
+            bot.zamknij()
+
+    def _przekaz_limit_czasu(self, benchmark_time):
+        """Ustawia benchmark_time botom, które mają taki atrybut (np. do zarządzania czasem w przeszukiwaniu)."""
+        for bot in (self.bot1, self.bot2):
+            if self.izolacja:
+                bot.ustaw_benchmark_time(benchmark_time)
+            elif hasattr(bot, "benchmark_time"):
+                bot.benchmark_time = benchmark_time
+
+    def _zakoncz_zapis(self, wynik, powod):
+        """Zapisuje wynik do binarnego zapisu gry i zamyka plik."""
+        if self.zapis is not None:
+            self.zapis.koniec(wynik, powod)
+        if self.metryki is not None:
+            self.metryki.koniec_gry(wynik, time.perf_counter() - self._start_pomiaru)
+
+    def _mierzona(self, faza, funkcja):
+        """Funkcja opakowana pomiarem czasu fazy (dla metryk)."""
+        metryki = self.metryki
+        zegar = time.perf_counter
+
+        def mierzona(*args, **kwargs):
+            start = zegar()
+            wynik = funkcja(*args, **kwargs)
+            metryki.faza(faza, zegar() - start)
+            return wynik
+        return mierzona
+
+    def _wlacz_pomiar(self, wywolaj_bota):
+        """
+        Włącza pomiar faz gry: metody silnika tej gry są zastępowane opakowaniami z pomiarem,
+        więc gra bez metryk nie płaci za pomiar niczym.
+
+        Returns:
+            wywolaj_bota z pomiarem
+        """
+        self._start_pomiaru = time.perf_counter()
+        self._legalne_ruchy_na_ruchu = self._mierzona("generowanie_ruchow", self._legalne_ruchy_na_ruchu)
+        # Jeden pomiar na ruch: widok i konwersja formatu razem (osobno liczyłyby się podwójnie)
+        self._widok_dla_bota = self._mierzona("widok", self._widok_dla_bota)
+        self._update = self._mierzona("wykonanie_ruchu", self._update)
+        if self.zapis is not None:
+            self.zapis.ruch = self._mierzona("zapis", self.zapis.ruch)
+        if self.dziennik is not None:
+            self.dziennik.zapisz = self._mierzona("dziennik", self.dziennik.zapisz)
+        return self._mierzona("wywolanie_bota", wywolaj_bota)
+
+    def _licz_zdarzenie(self, bot_number, zdarzenie):
+        """Błąd lub niepoprawny ruch bota w metrykach."""
+        if self.metryki is not None:
+            self.metryki.licz(self.nazwy_botow[bot_number - 1], zdarzenie)
+
+    def _wywolaj_bota_bezposrednio(self, bot, plansza, ruchy, timeout, bot_number):
+        """
+        Wywołuje zaufanego bota bezpośrednio (tryb headless).
+
+        Bota nie da się przerwać, więc przekroczenie timeoutu jest sprawdzane
+        po fakcie - ruch bota jest wtedy odrzucany tak jak w _wywolaj_bota_z_timeoutem.
+
+        Returns:
+            (wybrany_ruch, czas_wykonania, przekroczono_limit)
+        """
+        start_time = self._zegar()
+        blad = False
+        try:
+            wybrany_ruch = bot.move(plansza, list(ruchy))
+        except Exception:
+            wybrany_ruch = None
+            blad = True
+        elapsed_time = self._zegar() - start_time
+
+        if blad:
+            self._licz_zdarzenie(bot_number, "blad")
+        if elapsed_time > timeout:
+            return random.choice(ruchy), elapsed_time, True
+        if wybrany_ruch is None or wybrany_ruch not in ruchy:
+            if not blad:
+                self._licz_zdarzenie(bot_number, "niepoprawny")
+            return random.choice(ruchy), elapsed_time, False
+        return wybrany_ruch, elapsed_time, False
+
     def _jest_ciemne_pole(self, row, col):
         """Sprawdza czy pole jest ciemne (dostępne do gry)."""
         return (row + col) % 2 == 1
@@ -153,6 +655,9 @@ class GRA:
         Returns:
             lista krotek ((start_row, start_col), (end_row, end_col))
         """
+        if self.backend == "bity":
+            return silnik_bity.znajdz_legalne_ruchy(plansza, tylko_dla_pozycji)
+
         bicia = []
         ruchy = []
 
@@ -185,6 +690,9 @@ class GRA:
         Znajduje bicia dla pionka.
         Bicia: przeskok o ±2, ±2 jeśli na ±1, ±1 jest przeciwnik.
         """
+        if self.backend == "bity":
+            return silnik_bity.znajdz_bicia(plansza, row, col, piece)
+
         bicia = []
 
         kierunki = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
@@ -221,6 +729,9 @@ class GRA:
         Znajduje zwykłe ruchy dla pionka.
         Ruchy: przesunięcie o ±1, ±1 na puste pole.
         """
+        if self.backend == "bity":
+            return silnik_bity.znajdz_ruchy(plansza, row, col, piece)
+
         ruchy = []
 
         # Określ kierunki na podstawie typu pionka
@@ -244,6 +755,38 @@ class GRA:
 
         return ruchy
 
+    def znajdz_pelne_ruchy(self, plansza):
+        """
+        Znajduje legalne ruchy, w których całe wielobicie jest jednym ruchem.
+
+        Args:
+            plansza: numpy array 8x8
+
+        Returns:
+            lista krotek pól: ((start_row, start_col), (end_row, end_col)) dla zwykłych ruchów,
+            ((r0, c0), (r1, c1), ..., (rn, cn)) dla bić (zawsze do końca wielobicia)
+        """
+        if self.backend == "bity":
+            return silnik_bity.znajdz_pelne_ruchy(plansza)
+
+        ruchy = self.znajdz_legalne_ruchy(plansza)
+        if not ruchy or abs(ruchy[0][1][0] - ruchy[0][0][0]) != 2:
+            return ruchy
+
+        # Rozwiń każde bicie tak samo, jak robi to pętla wielobicia w start()
+        pelne = []
+        do_rozwiniecia = [(plansza, ruch) for ruch in reversed(ruchy)]
+        while do_rozwiniecia:
+            plansza_przed, droga = do_rozwiniecia.pop()
+            nowa_plansza, _, koniec = self.update(plansza_przed, droga[-2:])
+            piece = nowa_plansza[koniec[0], koniec[1]]
+            kolejne = self._znajdz_bicia(nowa_plansza, koniec[0], koniec[1], piece)
+            if not kolejne:
+                pelne.append(droga)
+            for _, cel in reversed(kolejne):
+                do_rozwiniecia.append((nowa_plansza, droga + (cel,)))
+        return pelne
+
     def update(self, plansza, ruch):
         """
         Zwraca nową planszę po wykonaniu ruchu (nie modyfikuje wejściowej planszy).
@@ -255,6 +798,12 @@ class GRA:
         Returns:
             (nowa_plansza: numpy array, bylo_bicie: bool, pozycja_koncowa: tuple)
         """
+        if len(ruch) > 2:
+            # Pełne wielobicie - wykonaj kolejne skoki
+            for i in range(len(ruch) - 1):
+                plansza, bylo_bicie, pozycja_koncowa = self.update(plansza, ruch[i:i + 2])
+            return plansza, bylo_bicie, pozycja_koncowa
+
         # Stwórz kopię planszy
         nowa_plansza = plansza.copy()
 
@@ -290,17 +839,32 @@ class GRA:
         Aktualizuje planszę na podstawie ruchu.
 
         Args:
-            ruch: ((start_row, start_col), (end_row, end_col))
+            ruch: ((start_row, start_col), (end_row, end_col)) w stałych współrzędnych;
+                pion gracza 1 (1) awansuje w rzędzie 0, pion gracza 2 (2) w rzędzie 7
 
         Returns:
             (bylo_bicie: bool, byla_promocja: bool, pozycja_koncowa: tuple)
         """
+        if len(ruch) > 2:
+            # Pełne wielobicie - wykonaj kolejne skoki
+            byla_promocja = False
+            for i in range(len(ruch) - 1):
+                bylo_bicie, promocja, pozycja_koncowa = self._wykonaj_skok(ruch[i:i + 2])
+                byla_promocja = byla_promocja or promocja
+            return bylo_bicie, byla_promocja, pozycja_koncowa
+        return self._wykonaj_skok(ruch)
+
+    def _wykonaj_skok(self, ruch):
+        """Pojedynczy skok lub ruch z _update (z kluczami Zobrista)."""
         start, end = ruch
         start_row, start_col = start
         end_row, end_col = end
 
         # Pobierz pionek
         piece = self.plansza[start_row, start_col]
+        self._widoki = {}
+        start_idx = start_row * 8 + start_col
+        end_idx = end_row * 8 + end_col
 
         # Sprawdź czy to bicie
         row_diff = abs(end_row - start_row)
@@ -310,6 +874,10 @@ class GRA:
             # Usuń pionek przeciwnika (w środku między startem a końcem)
             captured_row = (start_row + end_row) // 2
             captured_col = (start_col + end_col) // 2
+            captured_idx = captured_row * 8 + captured_col
+            captured = self.plansza[captured_row, captured_col]
+            self.klucz ^= zobrist.KLUCZE[captured_idx][captured]
+            self.klucz_odwrocony ^= zobrist.KLUCZE_ODWROCONE[captured_idx][captured]
             self.plansza[captured_row, captured_col] = 0
 
         # Przenieś pionek
@@ -318,16 +886,26 @@ class GRA:
 
         # Sprawdź promocję do króla
         byla_promocja = False
-        if end_row == 0 and piece == 1:
-            self.plansza[end_row, end_col] = 3
+        nowy_piece = piece
+        if (end_row == 0 and piece == 1) or (end_row == 7 and piece == 2):
+            nowy_piece = piece + 2
+            self.plansza[end_row, end_col] = nowy_piece
             byla_promocja = True
 
+        self.klucz ^= zobrist.KLUCZE[start_idx][piece] ^ zobrist.KLUCZE[end_idx][nowy_piece]
+        self.klucz_odwrocony ^= (zobrist.KLUCZE_ODWROCONE[start_idx][piece]
+                                 ^ zobrist.KLUCZE_ODWROCONE[end_idx][nowy_piece])
+
         return bylo_bicie, byla_promocja, (end_row, end_col)
 
     def zamien_perspektywe(self, plansza):
         """
         Zamienia perspektywę - odwraca planszę i zamienia pionki.
         """
+        if plansza.dtype == np.int8:
+            # Widok obróconej planszy + tablica zamiany pionków
+            return ZAMIANA_PIONKOW[plansza[::-1, ::-1].view(np.uint8)]
+
         # Mapowanie: 0->0, 1->2, 2->1, 3->4, 4->3, None->None
         def zamien_pionek(p):
             if p is None:
@@ -350,62 +928,76 @@ class GRA:
 
         return zamieniona
 
-    def _hash_planszy(self, plansza):
+    def start(self, show=False, notebook=False, show_time=1.0, benchmark_time=None, wyswietlacz=None):
         """
-        Zwraca hash planszy do wykrywania powtórzeń.
-        Konwertuje numpy array na krotkę i liczy hash.
-        """
-        # Konwertuj None na -1 dla spójności hashowania
-        plansza_do_hasha = tuple(
-            tuple(-1 if cell is None else cell for cell in row)
-            for row in plansza
-        )
-        return hash(plansza_do_hasha)
+        Rozpoczyna grę między dwoma botami.
 
-    def start(self, show=False, notebook=False, show_time=1.0):
-        """Rozpoczyna grę między dwoma botami."""
+        Args:
+            show: wyświetlanie gry w osobnym wątku (wyswietlanie.Wyswietlacz) - gra nie czeka
+                na terminal; start kończy się po wyświetleniu ostatniej klatki
+            show_time: czas wyświetlania klatki w sekundach (tempo widza, nie gry)
+            benchmark_time: limit czasu na ruch w sekundach; None - skalibrowany limit z
+                kalibracja.benchmark_time (w trybie headless: bez limitu), math.inf - bez limitu
+            wyswietlacz: gotowy Wyswietlacz (np. wspólny dla wielu gier turnieju); start
+                go nie zamyka i nie czeka na wyświetlenie klatek
+        """
+        show = show or wyswietlacz is not None
+        if show and self.headless:
+            raise ValueError("Tryb headless nie obsługuje show")
+        wlasny_wyswietlacz = show and wyswietlacz is None
+        if wlasny_wyswietlacz:
+            wyswietlacz = wyswietlanie.Wyswietlacz(odstep=show_time, notebook=notebook)
+        if self.seed is not None:
+            random.seed(self.seed)
+            np.random.seed(self.seed % 2**32)
+            if self.izolacja:
+                # Boty w osobnych procesach mają własne random / np.random
+                self.bot1.ustaw_seed(self.seed)
+                self.bot2.ustaw_seed(self.seed)
         runda = 0
-        pierwsza_runda = True
+        if self.headless:
+            wywolaj_bota = self._wywolaj_bota_bezposrednio
+        elif self.izolacja:
+            wywolaj_bota = self._wywolaj_bota_w_procesie
+        else:
+            wywolaj_bota = self._wywolaj_bota_z_timeoutem
 
-        # Wykonaj benchmark czasowy na początku gry
-        benchmark_time = time_benchmark()
+        # Wykonaj benchmark czasowy na początku gry (lub użyj podanego limitu)
+        if benchmark_time is None:
+            benchmark_time = math.inf if self.headless else kalibracja.benchmark_time(zegar=self.zegar)
         if self.debug:
-            self.debug_file.write(f"TIME BENCHMARK: {benchmark_time:.6f} sekund na ruch\n")
-            self.debug_file.write(f"Limit czasowy: {benchmark_time:.6f}s (normalny), {2*benchmark_time:.6f}s (maksymalny)\n")
-            self.debug_file.write(f"Bot1 time_flags: {self.bot1_time_flags}\n")
-            self.debug_file.write(f"Bot2 time_flags: {self.bot2_time_flags}\n")
-            self.debug_file.write("="*70 + "\n")
+            self.dziennik.zapisz(
+                dziennik.WYNIK,
+                "TIME BENCHMARK: {0:.6f} sekund na ruch\n"
+                "Limit czasowy: {0:.6f}s (normalny), {1:.6f}s (maksymalny)\n"
+                "Bot1 time_flags: {2}\nBot2 time_flags: {3}\n{4}\n",
+                benchmark_time, 2 * benchmark_time, self.bot1_time_flags, self.bot2_time_flags, "="*70,
+            )
+
+        self._przekaz_limit_czasu(benchmark_time)
+
+        # Binarny zapis gry
+        if self.zapis_sciezka is not None:
+            self.zapis = zapis_gry.ZapisGry(self.zapis_sciezka, self.plansza, benchmark_time,
+                                            min(self.bot1_time_flags, 255), self.seed, self.pelne_bicia)
+
+        # Pomiar faz gry i czasu botów (tylko z metrykami)
+        metryki = self.metryki
+        if metryki is not None:
+            wywolaj_bota = self._wlacz_pomiar(wywolaj_bota)
 
         # Wyświetl początkową planszę
         if show:
-            if not notebook:
-                print(f"\033[KRunda: {runda}")
-            else:
-                print(f"Runda: {runda}")
-                from IPython.display import clear_output, display, HTML
-                display(HTML("<style>pre, code {font-family: 'Courier New', monospace !important;}</style>"))
-            self.wyswietl_plansze(self.plansza, pokaz_legende=True, notebook=notebook)
-            time.sleep(show_time * 2)
-            pierwsza_runda = False
+            wyswietlacz.pokaz(self.plansza, f"Runda: {runda}", pokaz_legende=True, czas=show_time * 2)
 
         while True:
             # Pętla wielobicia tym samym pionkiem
             pozycja_dla_wielobicia = None
 
             while True:
-                # Znajdź legalne ruchy
-                if pozycja_dla_wielobicia is not None:
-                    # Podczas wielobicia: sprawdź TYLKO bicia dla tego pionka
-                    legalne_ruchy = []
-                    piece = self.plansza[pozycja_dla_wielobicia[0], pozycja_dla_wielobicia[1]]
-                    if piece in [1, 3]:
-                        legalne_ruchy = self._znajdz_bicia(self.plansza,
-                                                           pozycja_dla_wielobicia[0],
-                                                           pozycja_dla_wielobicia[1],
-                                                           piece)
-                else:
-                    # Normalny ruch: wszystkie legalne ruchy
-                    legalne_ruchy = self.znajdz_legalne_ruchy(self.plansza)
+                # Znajdź legalne ruchy (z perspektywy gracza na ruchu; podczas wielobicia
+                # TYLKO bicia dla tego pionka, w trybie pelne_bicia wielobicia jako pojedyncze ruchy)
+                legalne_ruchy = self._legalne_ruchy_na_ruchu(pozycja_dla_wielobicia)
 
                 # Sprawdź koniec gry lub wielobicia
                 if len(legalne_ruchy) == 0:
@@ -417,33 +1009,19 @@ class GRA:
                         poprzedni_gracz = 2 if runda % 2 == 0 else 1
 
                         if show:
-                            if notebook:
-                                clear_output(wait=True)
-                            else:
-                                print("\033[21A", end="")
-
-                            if runda % 2 == 1:
-                                plansza_do_wyswietlenia = self.zamien_perspektywe(self.plansza)
-                            else:
-                                plansza_do_wyswietlenia = self.plansza
-
-                            if notebook:
-                                print(f"Runda: {runda} - KONIEC GRY!")
-                                display(HTML("<style>pre, code {font-family: 'Courier New', monospace !important;}</style>"))
-                                self.wyswietl_plansze(plansza_do_wyswietlenia, pokaz_legende=False, notebook=True)
-                                print(f"\n🎉 Gratulacje! Wygrywa Bot {poprzedni_gracz}! 🎉\n")
-                            else:
-                                print(f"\033[KRunda: {runda} - KONIEC GRY!")
-                                self.wyswietl_plansze(plansza_do_wyswietlenia, pokaz_legende=False, notebook=notebook)
-                                print(f"\033[K\n🎉 Gratulacje! Wygrywa Bot {poprzedni_gracz}! 🎉\n")
-
-                        # Zamknij plik debug
-                        if self.debug and self.debug_file:
-                            self.debug_file.write(f"\n\n{'='*70}\n")
-                            self.debug_file.write(f"KONIEC GRY - Wygrywa Bot {poprzedni_gracz}\n")
-                            self.debug_file.write(f"{'='*70}\n")
-                            self.debug_file.close()
-                            print(f"\n[DEBUG] Zapisano historię gry do pliku: debug_gra.txt\n")
+                            wyswietlacz.pokaz(self.plansza, f"Runda: {runda} - KONIEC GRY!",
+                                              komunikat=f"🎉 Gratulacje! Wygrywa Bot {poprzedni_gracz}! 🎉")
+                            if wlasny_wyswietlacz:
+                                wyswietlacz.zamknij()
+
+                        # Zamknij procesy botów, zapis gry i plik debug
+                        self.zamknij_procesy()
+                        self._oddaj_boty()
+                        self._zakoncz_zapis(poprzedni_gracz, zapis_gry.BRAK_RUCHOW)
+                        if self.debug:
+                            self.dziennik.zapisz(dziennik.WYNIK, "\n\n{0}\nKONIEC GRY - Wygrywa Bot {1}\n{0}\n", "="*70, poprzedni_gracz)
+                            self.dziennik.zamknij()
+                            print(f"\n[DEBUG] Zapisano historię gry do pliku: {self.dziennik.sciezka}\n")
 
                         return poprzedni_gracz
 
@@ -451,14 +1029,15 @@ class GRA:
                 if len(legalne_ruchy) == 1:
                     # Ruch automatyczny
                     wybrany_ruch = legalne_ruchy[0]
+                    status_ruchu, elapsed_time = zapis_gry.AUTO, 0.0
+                    if metryki is not None:
+                        metryki.licz(self.nazwy_botow[self.strona - 1], "auto")
                     if self.debug:
                         self.move_number += 1
-                        self.debug_file.write(f"\n{'='*70}\n")
-                        self.debug_file.write(f"RUCH #{self.move_number}\n")
-                        self.debug_file.write(f"{'='*70}\n")
-                        self.debug_file.write(f"Ruch automatyczny (tylko 1 możliwy)\n")
-                        self.debug_file.write(f"Dostępne ruchy: {legalne_ruchy}\n")
-                        self.debug_file.write(f"Wybrany ruch: {wybrany_ruch}\n")
+                        self.dziennik.zapisz(dziennik.RUCHY, "\n{0}\nRUCH #{1}\n{0}\nRuch automatyczny (tylko 1 możliwy)\n",
+                                             "="*70, self.move_number)
+                        self.dziennik.zapisz(dziennik.SZCZEGOLY, "Dostępne ruchy: {}\n", legalne_ruchy)
+                        self.dziennik.zapisz(dziennik.RUCHY, "Wybrany ruch: {}\n", wybrany_ruch)
                 else:
                     # Zapytaj bota z timeoutem
                     aktualny_bot = self.bot1 if runda % 2 == 0 else self.bot2
@@ -467,63 +1046,81 @@ class GRA:
 
                     if self.debug:
                         self.move_number += 1
-                        self.debug_file.write(f"\n{'='*70}\n")
-                        self.debug_file.write(f"RUCH #{self.move_number}\n")
-                        self.debug_file.write(f"{'='*70}\n")
-                        self.debug_file.write(f"Bot{bot_number}\n")
-                        self.debug_file.write(f"Dostępne ruchy ({len(legalne_ruchy)}): {legalne_ruchy}\n")
+                        self.dziennik.zapisz(dziennik.RUCHY, "\n{0}\nRUCH #{1}\n{0}\nBot{2}\n",
+                                             "="*70, self.move_number, bot_number)
+                        self.dziennik.zapisz(dziennik.SZCZEGOLY, "Dostępne ruchy ({}): {}\n",
+                                             len(legalne_ruchy), legalne_ruchy)
 
                     # Wywołaj bota z timeoutem 2x benchmark_time
-                    wybrany_ruch, elapsed_time, timeout_exceeded = self._wywolaj_bota_z_timeoutem(
-                        aktualny_bot, self.plansza, legalne_ruchy, 2 * benchmark_time, bot_number
+                    wybrany_ruch, elapsed_time, timeout_exceeded = wywolaj_bota(
+                        aktualny_bot, self._widok_dla_bota(aktualny_bot),
+                        legalne_ruchy, 2 * benchmark_time, bot_number
                     )
 
                     # Sprawdź czy przekroczono normalny limit benchmark_time
                     przekroczono_benchmark = elapsed_time > benchmark_time
 
                     if self.debug:
-                        self.debug_file.write(f"Czas wykonania: {elapsed_time:.6f}s (limit: {benchmark_time:.6f}s, max: {2*benchmark_time:.6f}s)\n")
+                        self.dziennik.zapisz(dziennik.RUCHY, "Czas wykonania: {:.6f}s (limit: {:.6f}s, max: {:.6f}s)\n",
+                                             elapsed_time, benchmark_time, 2 * benchmark_time)
 
+                    status_ruchu = zapis_gry.OK
                     if timeout_exceeded:
                         # Przekroczono 2x benchmark - losowy ruch
+                        status_ruchu = zapis_gry.TIMEOUT
                         if self.debug:
-                            self.debug_file.write(f"Status: PRZEKROCZONO 2x LIMIT! Użyto losowego ruchu.\n")
+                            self.dziennik.zapisz(dziennik.RUCHY, "Status: PRZEKROCZONO 2x LIMIT! Użyto losowego ruchu.\n")
                     elif przekroczono_benchmark:
                         # Przekroczono benchmark ale nie 2x
                         if aktualne_time_flags > 0:
                             # Ma flagi - akceptuj ruch, pomniejsz flagę
+                            status_ruchu = zapis_gry.FLAGA
                             if runda % 2 == 0:
                                 self.bot1_time_flags -= 1
                             else:
                                 self.bot2_time_flags -= 1
                             if self.debug:
-                                self.debug_file.write(f"Status: PRZEKROCZONO BENCHMARK! Użyto time_flag (pozostało: {aktualne_time_flags - 1})\n")
+                                self.dziennik.zapisz(dziennik.RUCHY, "Status: PRZEKROCZONO BENCHMARK! Użyto time_flag (pozostało: {})\n",
+                                                     aktualne_time_flags - 1)
                         else:
                             # Brak flag - użyj losowego ruchu
                             wybrany_ruch = random.choice(legalne_ruchy)
+                            status_ruchu = zapis_gry.LOSOWY
                             if self.debug:
-                                self.debug_file.write(f"Status: PRZEKROCZONO BENCHMARK bez flag! Użyto losowego ruchu.\n")
+                                self.dziennik.zapisz(dziennik.RUCHY, "Status: PRZEKROCZONO BENCHMARK bez flag! Użyto losowego ruchu.\n")
                     else:
                         # W limicie
                         if self.debug:
-                            self.debug_file.write(f"Status: W limicie czasu\n")
+                            self.dziennik.zapisz(dziennik.RUCHY, "Status: W limicie czasu\n")
 
+                    if metryki is not None:
+                        metryki.ruch_bota(self.nazwy_botow[bot_number - 1], elapsed_time, benchmark_time,
+                                          zapis_gry.NAZWY_STATUSOW[status_ruchu])
                     if self.debug:
-                        self.debug_file.write(f"Wybrany ruch: {wybrany_ruch}\n")
+                        self.dziennik.zapisz(dziennik.RUCHY, "Wybrany ruch: {}\n", wybrany_ruch)
 
-                # Wykonaj ruch
-                bylo_bicie, byla_promocja, pozycja_koncowa = self._update(wybrany_ruch)
+                # Wykonaj ruch (ruch bota jest z jego perspektywy, plansza w stałych współrzędnych)
+                ruch_na_planszy = wybrany_ruch if self.strona == 1 else wzgledne(wybrany_ruch)
+                bylo_bicie, byla_promocja, pozycja_koncowa = self._update(ruch_na_planszy)
+                if self.strona == 2:
+                    pozycja_koncowa = wzgledne((pozycja_koncowa,))[0]
 
-                # Sprawdź czy można kontynuować wielobicie
-                if bylo_bicie:
+                # Sprawdź czy można kontynuować wielobicie (w trybie pelne_bicia ruch był już całym ciągiem)
+                kontynuacja = False
+                if bylo_bicie and not self.pelne_bicia:
                     # Podczas wielobicia sprawdzaj TYLKO bicia, nie zwykłe ruchy
-                    piece = self.plansza[pozycja_koncowa[0], pozycja_koncowa[1]]
-                    kolejne_bicia = self._znajdz_bicia(self.plansza, pozycja_koncowa[0], pozycja_koncowa[1], piece)
+                    kolejne_bicia = self._legalne_ruchy_na_ruchu(pozycja_koncowa)
                     if len(kolejne_bicia) > 0:
                         if self.debug:
-                            self.debug_file.write(f">>> Wielobicie - kontynuacja dla pionka na {pozycja_koncowa}\n")
-                        pozycja_dla_wielobicia = pozycja_koncowa
-                        continue
+                            self.dziennik.zapisz(dziennik.RUCHY, ">>> Wielobicie - kontynuacja dla pionka na {}\n", pozycja_koncowa)
+                        kontynuacja = True
+
+                if self.zapis is not None:
+                    self.zapis.ruch(wybrany_ruch, status_ruchu, elapsed_time, koniec_tury=not kontynuacja)
+
+                if kontynuacja:
+                    pozycja_dla_wielobicia = pozycja_koncowa
+                    continue
 
                 # Koniec tury
                 break
@@ -532,174 +1129,70 @@ class GRA:
             if bylo_bicie or byla_promocja:
                 self.ruchy_bez_bicia_promocji = 0
                 if self.debug:
-                    self.debug_file.write(f">>> Reset licznika (bicie={bylo_bicie}, promocja={byla_promocja})\n")
+                    self.dziennik.zapisz(dziennik.SZCZEGOLY, ">>> Reset licznika (bicie={}, promocja={})\n",
+                                         bylo_bicie, byla_promocja)
             else:
                 self.ruchy_bez_bicia_promocji += 1
                 if self.debug:
-                    self.debug_file.write(f">>> Licznik ruchów bez bicia/promocji: {self.ruchy_bez_bicia_promocji}\n")
+                    self.dziennik.zapisz(dziennik.SZCZEGOLY, ">>> Licznik ruchów bez bicia/promocji: {}\n",
+                                         self.ruchy_bez_bicia_promocji)
 
             # Sprawdź remis przez 20 ruchów bez bicia/promocji
             if self.ruchy_bez_bicia_promocji >= 20:
                 if show:
-                    if notebook:
-                        clear_output(wait=True)
-                    else:
-                        print("\033[21A", end="")
-
-                    if runda % 2 == 1:
-                        plansza_do_wyswietlenia = self.zamien_perspektywe(self.plansza)
-                    else:
-                        plansza_do_wyswietlenia = self.plansza
-
-                    if notebook:
-                        print(f"Runda: {runda} - REMIS!")
-                        display(HTML("<style>pre, code {font-family: 'Courier New', monospace !important;}</style>"))
-                        self.wyswietl_plansze(plansza_do_wyswietlenia, pokaz_legende=False, notebook=True)
-                        print(f"\n🤝 Remis! 20 ruchów bez bicia lub promocji 🤝\n")
-                    else:
-                        print(f"\033[KRunda: {runda} - REMIS!")
-                        self.wyswietl_plansze(plansza_do_wyswietlenia, pokaz_legende=False, notebook=notebook)
-                        print(f"\033[K\n🤝 Remis! 20 ruchów bez bicia lub promocji 🤝\n")
-
-                if self.debug and self.debug_file:
-                    self.debug_file.write(f"\n\n{'='*70}\n")
-                    self.debug_file.write(f"REMIS - 20 ruchów bez bicia lub promocji\n")
-                    self.debug_file.write(f"{'='*70}\n")
-                    self.debug_file.close()
-                    print(f"\n[DEBUG] Zapisano historię gry do pliku: debug_gra.txt\n")
+                    wyswietlacz.pokaz(self.plansza, f"Runda: {runda} - REMIS!",
+                                      komunikat="🤝 Remis! 20 ruchów bez bicia lub promocji 🤝")
+                    if wlasny_wyswietlacz:
+                        wyswietlacz.zamknij()
+
+                self.zamknij_procesy()
+                self._oddaj_boty()
+                self._zakoncz_zapis(0, zapis_gry.BEZ_BICIA)
+                if self.debug:
+                    self.dziennik.zapisz(dziennik.WYNIK, "\n\n{0}\nREMIS - 20 ruchów bez bicia lub promocji\n{0}\n", "="*70)
+                    self.dziennik.zamknij()
+                    print(f"\n[DEBUG] Zapisano historię gry do pliku: {self.dziennik.sciezka}\n")
 
                 return 0  # Remis
 
-            # Zamień perspektywę
+            # Zamień perspektywę (tylko strona na ruchu - plansza zostaje w stałych współrzędnych)
             if self.debug:
-                self.debug_file.write(f"\n{'='*70}\n>>> Zamiana perspektywy\n{'='*70}\n")
-            self.plansza = self.zamien_perspektywe(self.plansza)
+                self.dziennik.zapisz(dziennik.SZCZEGOLY, "\n{0}\n>>> Zamiana perspektywy\n{0}\n", "="*70)
+            self.strona = 3 - self.strona
             runda += 1
 
-            # Sprawdź remis przez 3-krotne powtórzenie pozycji
-            hash_planszy = self._hash_planszy(self.plansza)
-            if hash_planszy in self.pozycje_planszy:
-                self.pozycje_planszy[hash_planszy] += 1
+            # Sprawdź remis przez 3-krotne powtórzenie pozycji (klucz z perspektywy gracza na ruchu)
+            klucz = self.klucz if self.strona == 1 else self.klucz_odwrocony
+            if self.debug:
+                self.dziennik.zapisz(dziennik.SZCZEGOLY, "Klucz pozycji: {:016x}\n", klucz)
+            if klucz in self.pozycje_planszy:
+                self.pozycje_planszy[klucz] += 1
             else:
-                self.pozycje_planszy[hash_planszy] = 1
+                self.pozycje_planszy[klucz] = 1
 
-            if self.pozycje_planszy[hash_planszy] >= 3:
+            if self.pozycje_planszy[klucz] >= 3:
                 if show:
-                    if notebook:
-                        clear_output(wait=True)
-                    else:
-                        print("\033[21A", end="")
-
-                    if runda % 2 == 1:
-                        plansza_do_wyswietlenia = self.zamien_perspektywe(self.plansza)
-                    else:
-                        plansza_do_wyswietlenia = self.plansza
-
-                    if notebook:
-                        print(f"Runda: {runda} - REMIS!")
-                        display(HTML("<style>pre, code {font-family: 'Courier New', monospace !important;}</style>"))
-                        self.wyswietl_plansze(plansza_do_wyswietlenia, pokaz_legende=False, notebook=True)
-                        print(f"\n🤝 Remis! 3-krotne powtórzenie pozycji 🤝\n")
-                    else:
-                        print(f"\033[KRunda: {runda} - REMIS!")
-                        self.wyswietl_plansze(plansza_do_wyswietlenia, pokaz_legende=False, notebook=notebook)
-                        print(f"\033[K\n🤝 Remis! 3-krotne powtórzenie pozycji 🤝\n")
-
-                if self.debug and self.debug_file:
-                    self.debug_file.write(f"\n\n{'='*70}\n")
-                    self.debug_file.write(f"REMIS - 3-krotne powtórzenie pozycji\n")
-                    self.debug_file.write(f"{'='*70}\n")
-                    self.debug_file.close()
-                    print(f"\n[DEBUG] Zapisano historię gry do pliku: debug_gra.txt\n")
+                    wyswietlacz.pokaz(self.plansza, f"Runda: {runda} - REMIS!",
+                                      komunikat="🤝 Remis! 3-krotne powtórzenie pozycji 🤝")
+                    if wlasny_wyswietlacz:
+                        wyswietlacz.zamknij()
+
+                self.zamknij_procesy()
+                self._oddaj_boty()
+                self._zakoncz_zapis(0, zapis_gry.POWTORZENIE)
+                if self.debug:
+                    self.dziennik.zapisz(dziennik.WYNIK, "\n\n{0}\nREMIS - 3-krotne powtórzenie pozycji\n{0}\n", "="*70)
+                    self.dziennik.zamknij()
+                    print(f"\n[DEBUG] Zapisano historię gry do pliku: {self.dziennik.sciezka}\n")
 
                 return 0  # Remis
 
             # Wyświetl planszę
             if show:
-                if notebook:
-                    clear_output(wait=True)
-                else:
-                    if not pierwsza_runda:
-                        print("\033[21A", end="")
-
-                if runda % 2 == 1:
-                    plansza_do_wyswietlenia = self.zamien_perspektywe(self.plansza)
-                else:
-                    plansza_do_wyswietlenia = self.plansza
-
-                if notebook:
-                    print(f"Runda: {runda}")
-                    display(HTML("<style>pre, code {font-family: 'Courier New', monospace !important;}</style>"))
-                    self.wyswietl_plansze(plansza_do_wyswietlenia, pokaz_legende=pierwsza_runda, notebook=True)
-                else:
-                    print(f"\033[KRunda: {runda}")
-                    self.wyswietl_plansze(plansza_do_wyswietlenia, pokaz_legende=pierwsza_runda, notebook=notebook)
-
-                if pierwsza_runda:
-                    pierwsza_runda = False
-
-                time.sleep(show_time)
+                wyswietlacz.pokaz(self.plansza, f"Runda: {runda}")
 
     def wyswietl_plansze(self, plansza=None, pokaz_legende=True, notebook=False):
-        """Wyświetla planszę 8x8."""
+        """Wyświetla planszę 8x8 (jednym zapisem, zob. wyswietlanie.klatka_planszy)."""
         if plansza is None:
             plansza = self.plansza
-
-        # Kolory ANSI
-        RESET = '\033[0m'
-        RED = '\033[91m'
-        BLUE = '\033[94m'
-        GRAY = '\033[90m'
-
-        # Symbole
-        EMPTY_DARK = '·'
-        PIECE = '●'
-        KING = '▣'
-
-        clear_line = "" if notebook else "\033[K"
-
-        print(f"\n{clear_line}╔═══╤═══╤═══╤═══╤═══╤═══╤═══╤═══╗")
-
-        for row in range(8):
-            print(f"{clear_line}║", end="")
-            for col in range(8):
-                val = plansza[row, col]
-
-                if val is None:
-                    # Białe pole (niedostępne)
-                    print("   ", end="")
-                elif val == 0:
-                    # Puste ciemne pole
-                    print(f" {EMPTY_DARK} ", end="")
-                elif val == 1:
-                    # Pion gracza (niebieski)
-                    print(f" {BLUE}{PIECE}{RESET} ", end="")
-                elif val == 2:
-                    # Pion przeciwnika (czerwony)
-                    print(f" {RED}{PIECE}{RESET} ", end="")
-                elif val == 3:
-                    # Król gracza
-                    print(f" {BLUE}{KING}{RESET} ", end="")
-                elif val == 4:
-                    # Król przeciwnika
-                    print(f" {RED}{KING}{RESET} ", end="")
-
-                if col < 7:
-                    print("│", end="")
-
-            print(f"║ {row}{clear_line}")
-
-            if row < 7:
-                print(f"{clear_line}╟───┼───┼───┼───┼───┼───┼───┼───╢")
-
-        print(f"{clear_line}╚═══╧═══╧═══╧═══╧═══╧═══╧═══╧═══╝")
-        print(f"{clear_line}  0   1   2   3   4   5   6   7")
-
-        if pokaz_legende:
-            print(f"{clear_line}\nLegenda:")
-            print(f"{clear_line}  {BLUE}{PIECE}{RESET} Twój pion  {RED}{PIECE}{RESET} Pion przeciwnika  "
-                  f"{BLUE}{KING}{RESET} Twój król  {RED}{KING}{RESET} Król przeciwnika")
-            print(f"{clear_line}  {EMPTY_DARK} Puste pole  (spacja) Białe pole (niedostępne)")
-        else:
-            if not notebook:
-                print(clear_line)
+        print(wyswietlanie.klatka_planszy(plansza, pokaz_legende, notebook), end="")
@@ -0,0 +1,355 @@
+"""
+Backend silnika oparty na maskach bitowych.
+
+32 ciemne pola planszy są numerowane wierszami: pole (row, col) ma indeks
+row*4 + col//2, więc kolejność bitów to kolejność skanowania planszy w
+GRA.znajdz_legalne_ruchy. Pozycja to trzy liczby całkowite:
+- wlasne: pionki i króle gracza (1, 3)
+- przeciwne: pionki i króle przeciwnika (2, 4)
+- krole: wszystkie króle (3, 4)
+
+Ruchy i bicia liczone są przesunięciami i maskami, a zwracane listy są
+identyczne (łącznie z kolejnością) z listami z GRA.
+"""
+import random
+
+import numpy as np
+
+PELNA = (1 << 32) - 1
+
+# Współrzędne pola o danym indeksie bitu
+POLA = tuple((s // 4, 2 * (s % 4) + (1 if (s // 4) % 2 == 0 else 0)) for s in range(32))
+# Indeks pola w spłaszczonej planszy 8x8
+INDEKSY_CIEMNYCH = tuple(r * 8 + c for r, c in POLA)
+# (row, col) -> indeks bitu
+BIT_POLA = {pole: s for s, pole in enumerate(POLA)}
+
+PARZYSTE = sum(1 << s for s in range(32) if (s // 4) % 2 == 0)
+NIEPARZYSTE = PELNA ^ PARZYSTE
+LEWA = sum(1 << s for s in range(32) if s % 4 == 0)
+PRAWA = sum(1 << s for s in range(32) if s % 4 == 3)
+
+# Kolejność kierunków taka sama jak w GRA: (-1,-1), (-1,1), (1,-1), (1,1)
+KIERUNKI = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+ODWROTNY = (3, 2, 1, 0)
+
+
+def przesun(maska, kierunek):
+    """Przesuwa wszystkie bity maski o jedno pole w danym kierunku (0-3)."""
+    if kierunek == 0:
+        return ((maska & PARZYSTE) >> 4) | ((maska & NIEPARZYSTE & ~LEWA) >> 5)
+    if kierunek == 1:
+        return ((maska & PARZYSTE & ~PRAWA) >> 3) | ((maska & NIEPARZYSTE) >> 4)
+    if kierunek == 2:
+        return (((maska & PARZYSTE) << 4) | ((maska & NIEPARZYSTE & ~LEWA) << 3)) & PELNA
+    return (((maska & PARZYSTE & ~PRAWA) << 5) | ((maska & NIEPARZYSTE) << 4)) & PELNA
+
+
+def _zbuduj_tablice():
+    """Gotowe krotki ruchów i bić dla każdego pola i kierunku (None = poza planszą)."""
+    ruchy = [[None] * 32 for _ in range(4)]
+    bicia = [[None] * 32 for _ in range(4)]
+    for s, (r, c) in enumerate(POLA):
+        for k, (dr, dc) in enumerate(KIERUNKI):
+            if 0 <= r + dr < 8 and 0 <= c + dc < 8:
+                ruchy[k][s] = ((r, c), (r + dr, c + dc))
+            if 0 <= r + 2 * dr < 8 and 0 <= c + 2 * dc < 8:
+                bicia[k][s] = ((r, c), (r + 2 * dr, c + 2 * dc))
+    return tuple(map(tuple, ruchy)), tuple(map(tuple, bicia))
+
+
+RUCHY, BICIA = _zbuduj_tablice()
+
+
+def plansza_na_bity(plansza):
+    """
+    Zamienia planszę 8x8 na maski bitowe.
+
+    Returns:
+        (wlasne, przeciwne, krole)
+    """
+    pola = plansza.ravel().tolist()
+    wlasne = przeciwne = krole = 0
+    bit = 1
+    for i in INDEKSY_CIEMNYCH:
+        v = pola[i]
+        if v == 1:
+            wlasne |= bit
+        elif v == 2:
+            przeciwne |= bit
+        elif v == 3:
+            wlasne |= bit
+            krole |= bit
+        elif v == 4:
+            przeciwne |= bit
+            krole |= bit
+        bit <<= 1
+    return wlasne, przeciwne, krole
+
+
+def bity_na_plansze(wlasne, przeciwne, krole):
+    """Zamienia maski bitowe z powrotem na planszę 8x8 (dtype=object)."""
+    plansza = np.full((8, 8), None, dtype=object)
+    for s, (r, c) in enumerate(POLA):
+        bit = 1 << s
+        if wlasne & bit:
+            plansza[r, c] = 3 if krole & bit else 1
+        elif przeciwne & bit:
+            plansza[r, c] = 4 if krole & bit else 2
+        else:
+            plansza[r, c] = 0
+    return plansza
+
+
+_ODWROCONY_BAJT = [int(f"{b:08b}"[::-1], 2) for b in range(256)]
+
+
+def obroc(maska):
+    """Obrót planszy o 180 stopni (zamiana perspektywy) na masce: pole s -> 31 - s."""
+    return ((_ODWROCONY_BAJT[maska & 0xFF] << 24) | (_ODWROCONY_BAJT[(maska >> 8) & 0xFF] << 16)
+            | (_ODWROCONY_BAJT[(maska >> 16) & 0xFF] << 8) | _ODWROCONY_BAJT[maska >> 24])
+
+
+def maski_strony(plansza, strona):
+    """
+    Maski z perspektywy strony dla planszy w stałych współrzędnych (perspektywa gracza 1).
+
+    Dla gracza 2 maski są obracane (obroc), więc plansza nie musi być odwracana.
+
+    Returns:
+        (wlasne, przeciwne, krole)
+    """
+    wlasne, przeciwne, krole = plansza_na_bity(plansza)
+    if strona == 1:
+        return wlasne, przeciwne, krole
+    return obroc(przeciwne), obroc(wlasne), obroc(krole)
+
+
+def bicia_pola_z_bitow(wlasne, przeciwne, pole):
+    """Bicia figury stojącej na polu (row, col) - kontynuacja wielobicia."""
+    bit = BIT_POLA.get(tuple(pole))
+    if bit is None or not wlasne >> bit & 1:
+        return []
+    return _bicia_z_bitow(1 << bit, przeciwne, PELNA & ~(wlasne | przeciwne))
+
+
+def _bicia_z_bitow(wlasne, przeciwne, puste):
+    """Bicia dla figur z maski wlasne (pionki biją też do tyłu)."""
+    zrodla = [wlasne & przesun(przesun(puste, ODWROTNY[k]) & przeciwne, ODWROTNY[k])
+              for k in range(4)]
+    wszystkie = zrodla[0] | zrodla[1] | zrodla[2] | zrodla[3]
+    bicia = []
+    while wszystkie:
+        najnizszy = wszystkie & -wszystkie
+        s = najnizszy.bit_length() - 1
+        wszystkie ^= najnizszy
+        for k in range(4):
+            if zrodla[k] & najnizszy:
+                bicia.append(BICIA[k][s])
+    return bicia
+
+
+def _ruchy_z_bitow(wlasne, krole, puste):
+    """Zwykłe ruchy: pionki tylko do przodu, króle we wszystkich kierunkach."""
+    wlasne_krole = wlasne & krole
+    zrodla = [wlasne & przesun(puste, 3),
+              wlasne & przesun(puste, 2),
+              wlasne_krole & przesun(puste, 1),
+              wlasne_krole & przesun(puste, 0)]
+    wszystkie = zrodla[0] | zrodla[1] | zrodla[2] | zrodla[3]
+    ruchy = []
+    while wszystkie:
+        najnizszy = wszystkie & -wszystkie
+        s = najnizszy.bit_length() - 1
+        wszystkie ^= najnizszy
+        for k in range(4):
+            if zrodla[k] & najnizszy:
+                ruchy.append(RUCHY[k][s])
+    return ruchy
+
+
+def legalne_ruchy_z_bitow(wlasne, przeciwne, krole):
+    """Legalne ruchy dla pozycji w postaci masek (bicia są obowiązkowe)."""
+    puste = PELNA & ~(wlasne | przeciwne)
+    bicia = _bicia_z_bitow(wlasne, przeciwne, puste)
+    if bicia:
+        return bicia
+    return _ruchy_z_bitow(wlasne, krole, puste)
+
+
+def wykonaj_ruch_bity(wlasne, przeciwne, krole, ruch):
+    """
+    Odpowiednik GRA.update na maskach (pojedynczy ruch lub skok).
+
+    Returns:
+        (wlasne, przeciwne, krole) po ruchu, wciąż z perspektywy gracza
+    """
+    (start_row, start_col), (end_row, end_col) = ruch[0], ruch[1]
+    start = 1 << BIT_POLA[(start_row, start_col)]
+    end = 1 << BIT_POLA[(end_row, end_col)]
+    wlasne ^= start | end
+    if krole & start:
+        krole ^= start | end
+    elif end_row == 0:
+        # Promocja do króla
+        krole |= end
+    if abs(end_row - start_row) == 2:
+        zbity = ~(1 << BIT_POLA[((start_row + end_row) // 2, (start_col + end_col) // 2)])
+        przeciwne &= zbity
+        krole &= zbity
+    return wlasne, przeciwne, krole
+
+
+def _rozwin_bicie(wlasne, przeciwne, krole, droga, wynik):
+    """Dokłada do wynik wszystkie maksymalne ciągi bić zaczynające się od droga."""
+    wlasne, przeciwne, krole = wykonaj_ruch_bity(wlasne, przeciwne, krole, droga[-2:])
+    koniec = 1 << BIT_POLA[droga[-1]]
+    kolejne = _bicia_z_bitow(koniec, przeciwne, PELNA & ~(wlasne | przeciwne))
+    if not kolejne:
+        wynik.append(droga)
+        return
+    for _, cel in kolejne:
+        _rozwin_bicie(wlasne, przeciwne, krole, droga + (cel,), wynik)
+
+
+def pelne_ruchy_z_bitow(wlasne, przeciwne, krole):
+    """
+    Legalne ruchy, w których wielobicie jest jednym ruchem.
+
+    Bicie to krotka kolejnych pól ((r0, c0), (r1, c1), (r2, c2), ...) -
+    zawsze cały ciąg, aż do miejsca, w którym nie ma już kolejnego bicia.
+    """
+    ruchy = legalne_ruchy_z_bitow(wlasne, przeciwne, krole)
+    if not ruchy or abs(ruchy[0][1][0] - ruchy[0][0][0]) != 2:
+        return ruchy
+    wynik = []
+    for ruch in ruchy:
+        _rozwin_bicie(wlasne, przeciwne, krole, ruch, wynik)
+    return wynik
+
+
+def znajdz_pelne_ruchy(plansza):
+    """Odpowiednik GRA.znajdz_pelne_ruchy."""
+    return pelne_ruchy_z_bitow(*plansza_na_bity(plansza))
+
+
+def znajdz_legalne_ruchy(plansza, tylko_dla_pozycji=None):
+    """
+    Odpowiednik GRA.znajdz_legalne_ruchy.
+
+    Args:
+        plansza: numpy array 8x8
+        tylko_dla_pozycji: tuple (row, col) - jeśli podane, zwraca ruchy tylko dla tego pionka
+
+    Returns:
+        lista krotek ((start_row, start_col), (end_row, end_col))
+    """
+    wlasne, przeciwne, krole = plansza_na_bity(plansza)
+    puste = PELNA & ~(wlasne | przeciwne)
+    if tylko_dla_pozycji is not None:
+        bit = BIT_POLA.get(tuple(tylko_dla_pozycji))
+        if bit is None:
+            return []
+        wlasne &= 1 << bit
+    bicia = _bicia_z_bitow(wlasne, przeciwne, puste)
+    if bicia:
+        return bicia
+    return _ruchy_z_bitow(wlasne, krole, puste)
+
+
+def znajdz_bicia(plansza, row, col, piece=None):
+    """Odpowiednik GRA._znajdz_bicia - bicia dla figury stojącej na (row, col)."""
+    bit = BIT_POLA.get((row, col))
+    if bit is None:
+        return []
+    wlasne, przeciwne, _ = plansza_na_bity(plansza)
+    puste = PELNA & ~(wlasne | przeciwne)
+    return _bicia_z_bitow(1 << bit, przeciwne, puste)
+
+
+def znajdz_ruchy(plansza, row, col, piece):
+    """Odpowiednik GRA._znajdz_ruchy - zwykłe ruchy figury piece z pola (row, col)."""
+    bit = BIT_POLA.get((row, col))
+    if bit is None or piece not in [1, 3]:
+        return []
+    wlasne, przeciwne, _ = plansza_na_bity(plansza)
+    puste = PELNA & ~(wlasne | przeciwne)
+    maska = 1 << bit
+    return _ruchy_z_bitow(maska, maska if piece == 3 else 0, puste)
+
+
+def sprawdz_zgodnosc(liczba_gier=200, seed=0, max_ruchow=400):
+    """
+    Tryb testu krzyżowego: rozgrywa losowe gry i w każdej pozycji porównuje
+    listy ruchów z backendu tablicowego i bitowego.
+
+    Wielobicia są rozgrywane tak samo jak w GRA.start.
+
+    Returns:
+        liczba sprawdzonych pozycji
+
+    Raises:
+        AssertionError: przy pierwszej niezgodności
+    """
+    from silnik import GRA
+
+    wzorzec = GRA(None, None, backend="tablica")
+    los = random.Random(seed)
+    sprawdzone = 0
+
+    def porownaj(oczekiwane, otrzymane, plansza, opis):
+        if oczekiwane != otrzymane:
+            raise AssertionError(
+                f"Niezgodność ({opis}):\n{plansza}\n"
+                f"tablica: {oczekiwane}\nbity:    {otrzymane}"
+            )
+
+    for _ in range(liczba_gier):
+        plansza = GRA(None, None).plansza
+        for _ in range(max_ruchow):
+            legalne_ruchy = wzorzec.znajdz_legalne_ruchy(plansza)
+            porownaj(legalne_ruchy, znajdz_legalne_ruchy(plansza), plansza, "legalne ruchy")
+            sprawdzone += 1
+
+            # Ruchy ograniczone do jednej, losowej figury gracza
+            pozycja = los.choice(POLA)
+            porownaj(wzorzec.znajdz_legalne_ruchy(plansza, tylko_dla_pozycji=pozycja),
+                     znajdz_legalne_ruchy(plansza, tylko_dla_pozycji=pozycja),
+                     plansza, f"tylko_dla_pozycji={pozycja}")
+
+            porownaj(wzorzec.znajdz_pelne_ruchy(plansza), znajdz_pelne_ruchy(plansza),
+                     plansza, "pełne wielobicia")
+
+            if not legalne_ruchy:
+                break
+
+            ruch = los.choice(legalne_ruchy)
+            while True:
+                plansza, bylo_bicie, koniec = wzorzec.update(plansza, ruch)
+                if not bylo_bicie:
+                    break
+                piece = plansza[koniec[0], koniec[1]]
+                kolejne = wzorzec._znajdz_bicia(plansza, koniec[0], koniec[1], piece)
+                porownaj(kolejne, znajdz_bicia(plansza, koniec[0], koniec[1], piece),
+                         plansza, f"wielobicie z {koniec}")
+                if not kolejne:
+                    break
+                ruch = los.choice(kolejne)
+
+            plansza = wzorzec.zamien_perspektywe(plansza)
+
+    return sprawdzone
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Test krzyżowy backendów: tablica vs bity")
+    parser.add_argument("--gry", type=int, default=200, help="liczba losowych gier")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    liczba = sprawdz_zgodnosc(args.gry, args.seed)
+    print(f"OK: {liczba} pozycji zgodnych ({time.perf_counter() - start:.2f}s)")
@@ -0,0 +1,197 @@
+"""
+Turniej każdy z każdym dla wszystkich botów z folderu boty.
+
+Format (README):
+- każda para botów gra 2 mecze, raz pierwszy ruch ma jeden bot, raz drugi
+- przy remisie w parze (np. 1-1) jest dogrywka: każda strona traci losową
+  figurę i rozgrywane są 2 kolejne mecze z tej samej pozycji
+
+Gry rozgrywane są równolegle w puli procesów (domyślnie tyle procesów, ile rdzeni).
+
+Użycie:
+    python turniej.py
+    python turniej.py --pomin slow_bot --procesy 4
+    python turniej.py --metryki turniej.prom
+"""
+import itertools
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+import kalibracja
+from metryki import Metryki
+from silnik import GRA, rozgrzej_boty
+
+FOLDER_BOTOW = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'boty')
+
+
+def znajdz_boty(folder=FOLDER_BOTOW):
+    """Nazwy wszystkich botów (plików .py) w folderze boty."""
+    return sorted(
+        nazwa[:-3] for nazwa in os.listdir(folder)
+        if nazwa.endswith('.py') and not nazwa.startswith('_')
+    )
+
+
+def plansza_dogrywki(los):
+    """Pozycja początkowa, w której każda strona straciła jedną losową figurę."""
+    plansza = GRA(None, None).plansza
+    for figura in (1, 2):
+        pola = [(r, c) for r in range(8) for c in range(8) if plansza[r, c] == figura]
+        r, c = los.choice(pola)
+        plansza[r, c] = 0
+    return plansza
+
+
+def _rozegraj_gre(bot1, bot2, plansza_startowa, seed, benchmark_time, opcje_gry, zbieraj_metryki=False):
+    """
+    Jedna gra w procesie roboczym.
+
+    Returns:
+        (wynik, metryki): wynik 0 (remis), 1 lub 2 (zwycięzca); metryki gry albo None
+    """
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+    metryki = Metryki() if zbieraj_metryki else None
+    gra = GRA(bot1, bot2, plansza_startowa=plansza_startowa, metryki=metryki, **opcje_gry)
+    return gra.start(benchmark_time=benchmark_time), metryki
+
+
+def _punkty(wynik, pierwszy):
+    """Punkty bota w grze: 1 za wygraną, 0.5 za remis. pierwszy - czy bot grał jako bot1."""
+    if wynik == 0:
+        return 0.5
+    return 1.0 if (wynik == 1) == pierwszy else 0.0
+
+
+def rozegraj_turniej(boty=None, procesy=None, seed=0, opcje_gry=None, metryki=None):
+    """
+    Rozgrywa pełny turniej każdy z każdym.
+
+    Args:
+        boty: lista nazw botów z folderu boty (domyślnie wszystkie)
+        procesy: liczba procesów (domyślnie os.cpu_count())
+        seed: ziarno losowania (dogrywki i ziarna gier)
+        opcje_gry: dodatkowe argumenty dla GRA (np. backend="bity")
+        metryki: metryki.Metryki, do których dodawane są metryki wszystkich gier
+            (z procesów roboczych); None - bez pomiarów
+
+    Limit czasu (kalibracja.benchmark_time) jest ustalany raz, przed startem
+    puli procesów, i taki sam we wszystkich grach.
+
+    Returns:
+        (tabela, mecze)
+        - tabela: lista słowników posortowana od pierwszego miejsca
+        - mecze: słownik (bot_a, bot_b) -> lista gier (bot1, bot2, dogrywka, wynik)
+    """
+    if boty is None:
+        boty = znajdz_boty()
+    opcje_gry = opcje_gry or {}
+    los = random.Random(seed)
+    benchmark_time = kalibracja.benchmark_time(zegar=opcje_gry.get('zegar', 'sciana'))
+
+    mecze = {para: [] for para in itertools.combinations(boty, 2)}
+
+    # Każdy proces roboczy importuje boty raz i trzyma ciepłe instancje między grami
+    with ProcessPoolExecutor(max_workers=procesy or os.cpu_count(), initializer=rozgrzej_boty,
+                             initargs=(boty,)) as pula:
+        w_toku = {}
+
+        def zglos(para, bot1, bot2, plansza_startowa=None):
+            przyszlosc = pula.submit(_rozegraj_gre, bot1, bot2, plansza_startowa,
+                                     los.getrandbits(63), benchmark_time, opcje_gry, metryki is not None)
+            w_toku[przyszlosc] = (para, bot1, bot2, plansza_startowa is not None)
+
+        # 2 mecze na parę, ze zmianą koloru
+        for a, b in mecze:
+            zglos((a, b), a, b)
+            zglos((a, b), b, a)
+
+        while w_toku:
+            gotowe, _ = wait(w_toku, return_when=FIRST_COMPLETED)
+            for przyszlosc in gotowe:
+                para, bot1, bot2, dogrywka = w_toku.pop(przyszlosc)
+                gry = mecze[para]
+                wynik, metryki_gry = przyszlosc.result()
+                gry.append((bot1, bot2, dogrywka, wynik))
+                if metryki is not None:
+                    metryki.scal(metryki_gry)
+
+                # Po 2 meczach remis w parze -> dogrywka
+                if len(gry) == 2 and _wynik_pary(para, gry)[0] == 0.5:
+                    plansza = plansza_dogrywki(los)
+                    zglos(para, para[0], para[1], plansza)
+                    zglos(para, para[1], para[0], plansza)
+
+    return _tabela(boty, mecze), mecze
+
+
+def _wynik_pary(para, gry):
+    """(wynik meczu dla para[0]: 1 / 0.5 / 0, punkty para[0], punkty para[1])."""
+    punkty_a = sum(_punkty(wynik, bot1 == para[0]) for bot1, _, _, wynik in gry)
+    punkty_b = len(gry) - punkty_a
+    if punkty_a == punkty_b:
+        return 0.5, punkty_a, punkty_b
+    return (1.0 if punkty_a > punkty_b else 0.0), punkty_a, punkty_b
+
+
+def _tabela(boty, mecze):
+    tabela = {bot: {'bot': bot, 'punkty': 0.0, 'wygrane': 0, 'remisy': 0, 'przegrane': 0,
+                    'punkty_gier': 0.0, 'gry': 0} for bot in boty}
+    for para, gry in mecze.items():
+        wynik, punkty_a, punkty_b = _wynik_pary(para, gry)
+        for bot, wynik_bota, punkty_gier in ((para[0], wynik, punkty_a), (para[1], 1 - wynik, punkty_b)):
+            wiersz = tabela[bot]
+            wiersz['punkty'] += wynik_bota
+            wiersz['punkty_gier'] += punkty_gier
+            wiersz['gry'] += len(gry)
+            if wynik_bota == 1:
+                wiersz['wygrane'] += 1
+            elif wynik_bota == 0.5:
+                wiersz['remisy'] += 1
+            else:
+                wiersz['przegrane'] += 1
+    return sorted(tabela.values(), key=lambda w: (-w['punkty'], -w['punkty_gier'], w['bot']))
+
+
+def wyswietl_tabele(tabela):
+    """Wypisuje tabelę turnieju."""
+    print(f"{'#':>3}  {'Bot':<20} {'Pkt':>5} {'W':>3} {'R':>3} {'P':>3} {'Pkt gier':>9} {'Gry':>4}")
+    for miejsce, w in enumerate(tabela, 1):
+        print(f"{miejsce:>3}. {w['bot']:<20} {w['punkty']:>5.1f} {w['wygrane']:>3} {w['remisy']:>3} "
+              f"{w['przegrane']:>3} {w['punkty_gier']:>9.1f} {w['gry']:>4}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Turniej każdy z każdym botów z folderu boty")
+    parser.add_argument("--procesy", type=int, default=None, help="liczba procesów (domyślnie liczba rdzeni)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pomin", nargs="*", default=[], help="boty pominięte w turnieju")
+    parser.add_argument("--backend", default="tablica", choices=["tablica", "bity"])
+    parser.add_argument("--izolacja", action="store_true", help="każdy bot w osobnym procesie (proces_bota)")
+    parser.add_argument("--zapis", default=None, help="folder na binarne zapisy gier (zapis_gry)")
+    parser.add_argument("--zegar", default="sciana", choices=sorted(kalibracja.ZEGARY),
+                        help="czym mierzony jest czas ruchu")
+    parser.add_argument("--metryki", default=None,
+                        help="plik na metryki turnieju (.prom - format Prometheusa, inaczej JSON)")
+    args = parser.parse_args()
+
+    boty = [bot for bot in znajdz_boty() if bot not in args.pomin]
+    start = time.perf_counter()
+    opcje_gry = {'backend': args.backend, 'izolacja': args.izolacja, 'zegar': args.zegar, 'zapis': args.zapis}
+    if args.zapis:
+        os.makedirs(args.zapis, exist_ok=True)
+    metryki = Metryki() if args.metryki else None
+    tabela, mecze = rozegraj_turniej(boty, args.procesy, args.seed, opcje_gry, metryki)
+    liczba_gier = sum(len(gry) for gry in mecze.values())
+
+    wyswietl_tabele(tabela)
+    print(f"\nGier: {liczba_gier}, czas: {time.perf_counter() - start:.1f}s")
+    if metryki is not None:
+        metryki.zapisz(args.metryki)
+        print(f"Metryki: {args.metryki}")
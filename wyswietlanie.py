@@ -0,0 +1,192 @@
+"""
+Wyświetlanie gry niezależne od pętli gry.
+
+Klatka (nagłówek, plansza, legenda, komunikat) budowana jest jako jeden napis
+i wypisywana jednym zapisem. W terminalu kolejne klatki przepisują tylko
+zmienione pola planszy i nagłówek (sekwencje ANSI), a nie całą planszę.
+
+Wyswietlacz rysuje klatki w osobnym wątku z kolejki stanów: gra wstawia do
+kolejki kopię planszy i od razu gra dalej, a widz ogląda klatki we własnym
+tempie (odstep). Z tylko_najnowsze=True wyświetlacz pomija zaległe stany
+i pokazuje zawsze najnowszy - np. przy transmisji turnieju na żywo.
+
+Użycie:
+    wyswietlacz = Wyswietlacz(odstep=0.2)
+    gra.start(wyswietlacz=wyswietlacz)          # gra nie czeka na wyświetlanie
+    wyswietlacz.zamknij()                       # dorysowuje zaległe klatki
+"""
+import queue
+import sys
+import threading
+import time
+
+from silnik_bity import POLA
+
+# Kolory ANSI
+RESET = '\033[0m'
+RED = '\033[91m'
+BLUE = '\033[94m'
+
+# Symbole
+EMPTY_DARK = '·'
+PIECE = '●'
+KING = '▣'
+
+POLE = {
+    0: f" {EMPTY_DARK} ",
+    1: f" {BLUE}{PIECE}{RESET} ",   # Pion gracza (niebieski)
+    2: f" {RED}{PIECE}{RESET} ",    # Pion przeciwnika (czerwony)
+    3: f" {BLUE}{KING}{RESET} ",    # Król gracza
+    4: f" {RED}{KING}{RESET} ",     # Król przeciwnika
+}
+BIALE = "   "
+
+# Położenie pól w klatce: nagłówek, pusta linia, górna ramka, potem wiersz planszy co dwie linie
+PIERWSZA_LINIA_PLANSZY = 3
+
+
+def _pole(val):
+    if val is None or val < 0:
+        return BIALE
+    return POLE.get(int(val), "")
+
+
+def klatka_planszy(plansza, pokaz_legende=True, notebook=False):
+    """Plansza 8x8 (z ramką, numeracją i opcjonalnie legendą) jako jeden napis."""
+    clear_line = "" if notebook else "\033[K"
+    linie = [f"\n{clear_line}╔═══╤═══╤═══╤═══╤═══╤═══╤═══╤═══╗"]
+    for row in range(8):
+        komorki = "│".join(_pole(plansza[row, col]) for col in range(8))
+        linie.append(f"{clear_line}║{komorki}║ {row}{clear_line}")
+        if row < 7:
+            linie.append(f"{clear_line}╟───┼───┼───┼───┼───┼───┼───┼───╢")
+    linie.append(f"{clear_line}╚═══╧═══╧═══╧═══╧═══╧═══╧═══╧═══╝")
+    linie.append(f"{clear_line}  0   1   2   3   4   5   6   7")
+
+    if pokaz_legende:
+        linie.append(f"{clear_line}\nLegenda:")
+        linie.append(f"{clear_line}  {BLUE}{PIECE}{RESET} Twój pion  {RED}{PIECE}{RESET} Pion przeciwnika  "
+                     f"{BLUE}{KING}{RESET} Twój król  {RED}{KING}{RESET} Król przeciwnika")
+        linie.append(f"{clear_line}  {EMPTY_DARK} Puste pole  (spacja) Białe pole (niedostępne)")
+    elif not notebook:
+        linie.append(clear_line)
+    return "\n".join(linie) + "\n"
+
+
+def klatka(plansza, naglowek, pokaz_legende=False, komunikat=None, notebook=False):
+    """Pełna klatka: nagłówek, plansza i komunikat (np. o końcu gry)."""
+    clear_line = "" if notebook else "\033[K"
+    tekst = f"{clear_line}{naglowek}\n" + klatka_planszy(plansza, pokaz_legende, notebook)
+    if komunikat:
+        tekst += f"{clear_line}\n{komunikat}\n\n"
+    return tekst
+
+
+def roznica(poprzednia, plansza, naglowek, linie):
+    """
+    Sekwencja ANSI przepisująca tylko zmienione pola i nagłówek.
+
+    Kursor jest pod klatką (linie - liczba jej linii) i tam wraca.
+    """
+    tekst = [f"\033[{linie}A\r\033[K{naglowek}\033[{linie}B\r"]
+    for r, c in POLA:
+        val = plansza[r, c]
+        if val != poprzednia[r, c]:
+            w_gore = linie - (PIERWSZA_LINIA_PLANSZY + 2 * r)
+            tekst.append(f"\033[{w_gore}A\033[{2 + 4 * c}G{_pole(val)}\033[{w_gore}B\r")
+    return "".join(tekst)
+
+
+class Wyswietlacz:
+    """Rysuje stany gry w osobnym wątku, we własnym tempie."""
+
+    def __init__(self, odstep=1.0, notebook=False, tylko_najnowsze=False, roznicowo=True, strumien=None):
+        """
+        Args:
+            odstep: czas wyświetlania klatki w sekundach
+            notebook: wyświetlanie w Jupyter (clear_output zamiast sekwencji ANSI)
+            tylko_najnowsze: pomijaj zaległe stany - pokazuj zawsze najnowszy
+            roznicowo: w terminalu przepisuj tylko zmienione pola (False - zawsze cała klatka)
+            strumien: gdzie pisać (domyślnie sys.stdout)
+        """
+        self.odstep = odstep
+        self.notebook = notebook
+        self.tylko_najnowsze = tylko_najnowsze
+        self.roznicowo = roznicowo and not notebook
+        self.strumien = strumien
+        self.klatki = 0
+        self.pominiete = 0
+        self._kolejka = queue.Queue()
+        self._porzuc = False
+        self._poprzednia = None   # (plansza, legenda, komunikat, liczba linii) ostatniej klatki
+        self._watek = threading.Thread(target=self._petla, daemon=True)
+        self._watek.start()
+
+    def pokaz(self, plansza, naglowek, pokaz_legende=False, komunikat=None, czas=None):
+        """
+        Dodaje stan do kolejki i od razu wraca (plansza jest kopiowana).
+
+        Args:
+            czas: jak długo wyświetlać klatkę (domyślnie odstep)
+        """
+        self._kolejka.put((plansza.copy(), naglowek, pokaz_legende, komunikat,
+                           self.odstep if czas is None else czas))
+
+    def zamknij(self, czekaj=True):
+        """Kończy wątek; z czekaj=True najpierw dorysowuje zaległe klatki."""
+        if not self._watek.is_alive():
+            return
+        self._porzuc = not czekaj
+        self._kolejka.put(None)
+        self._watek.join()
+
+    def _petla(self):
+        while True:
+            stan = self._kolejka.get()
+            if stan is not None and self.tylko_najnowsze:
+                stan = self._najnowszy(stan)
+            if stan is None:
+                break
+            if self._porzuc:
+                continue
+            self._rysuj(*stan[:4])
+            self.klatki += 1
+            time.sleep(stan[4])
+
+    def _najnowszy(self, stan):
+        """Najnowszy stan z kolejki; koniec (None) jest odkładany z powrotem."""
+        while True:
+            try:
+                kolejny = self._kolejka.get_nowait()
+            except queue.Empty:
+                return stan
+            if kolejny is None:
+                self._kolejka.put(None)
+                return stan
+            self.pominiete += 1
+            stan = kolejny
+
+    def _rysuj(self, plansza, naglowek, pokaz_legende, komunikat):
+        strumien = self.strumien or sys.stdout
+        if self.notebook:
+            from IPython.display import clear_output, display, HTML
+            clear_output(wait=True)
+            display(HTML("<style>pre, code {font-family: 'Courier New', monospace !important;}</style>"))
+            strumien.write(klatka(plansza, naglowek, pokaz_legende, komunikat, notebook=True))
+            strumien.flush()
+            return
+
+        poprzednia = self._poprzednia
+        if (self.roznicowo and poprzednia is not None and not pokaz_legende and not komunikat
+                and not poprzednia[1] and not poprzednia[2]):
+            tekst = roznica(poprzednia[0], plansza, naglowek, poprzednia[3])
+            linie = poprzednia[3]
+        else:
+            tekst = klatka(plansza, naglowek, pokaz_legende, komunikat)
+            linie = tekst.count("\n")
+            if poprzednia is not None:
+                # Cała klatka od miejsca poprzedniej (dłuższa poprzednia klatka jest czyszczona)
+                tekst = f"\033[{poprzednia[3]}A" + tekst + "\033[J"
+        strumien.write(tekst)
+        strumien.flush()
+        self._poprzednia = (plansza, pokaz_legende, komunikat, linie)
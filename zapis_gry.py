@@ -0,0 +1,232 @@
+"""
+Kompaktowy, binarny zapis gry.
+
+Plik (little-endian):
+- nagłówek (39 bajtów): b"WGRA", wersja, seed (u64, BRAK_SEEDA gdy nie podano),
+  benchmark_time (f64), time_flags (u8), opcje (u8, bit 0 = pelne_bicia),
+  pozycja startowa z perspektywy bota 1 (32 ciemne pola po 4 bity)
+- ruchy (6 bajtów na skok):
+  bajt 0: pole startowe (bity 0-4) | status (bity 5-7)
+  bajt 1: pole końcowe (bity 0-4) | koniec tury (bit 7)
+  u32: czas ruchu bota w mikrosekundach
+- koniec (3 bajty): 0xFF, wynik (0 remis, 1, 2), powód
+
+Pola numerowane są jak w silnik_bity (row*4 + col//2), a ruchy zapisane są
+z perspektywy gracza, który je wykonał - tak jak widzi je bot. Wielobicie
+to kilka rekordów; w trybie pelne_bicia kolejne skoki mają status LANCUCH.
+
+Użycie:
+    gra = GRA("bot1", "bot2", zapis="gry/")      # plik o unikalnej nazwie w folderze gry/
+    zapis = wczytaj("gry/gra_....wgr")
+    plansza, gracz = zapis.pozycja(10)            # pozycja po 10 rekordach
+"""
+import itertools
+import os
+import struct
+import time
+
+import numpy as np
+
+from silnik_bity import BIT_POLA, POLA
+
+MAGIA = b"WGRA"
+WERSJA = 1
+BRAK_SEEDA = 2**64 - 1
+ROZSZERZENIE = ".wgr"
+
+NAGLOWEK = struct.Struct("<4sBQdBB16s")
+RUCH = struct.Struct("<BBI")
+KONIEC = struct.Struct("<BBB")
+ZNACZNIK_KONCA = 0xFF
+
+# Status ruchu (3 bity; 7 jest zajęte przez znacznik końca)
+OK = 0          # bot w limicie czasu
+FLAGA = 1       # przekroczony benchmark, użyto time_flag
+LOSOWY = 2      # przekroczony benchmark bez flag - losowy ruch
+TIMEOUT = 3     # przekroczony limit maksymalny (lub pamięci) - losowy ruch
+AUTO = 4        # jedyny możliwy ruch, bot nie był pytany
+LANCUCH = 5     # kolejny skok wielobicia wybranego jednym ruchem (pelne_bicia)
+
+NAZWY_STATUSOW = {OK: "ok", FLAGA: "flaga", LOSOWY: "losowy", TIMEOUT: "timeout", AUTO: "auto",
+                  LANCUCH: "lancuch"}
+
+# Powód końca gry
+BRAK_RUCHOW = 0
+BEZ_BICIA = 1       # 20 ruchów bez bicia lub promocji
+POWTORZENIE = 2     # 3-krotne powtórzenie pozycji
+
+NAZWY_POWODOW = {BRAK_RUCHOW: "brak ruchów", BEZ_BICIA: "20 ruchów bez bicia lub promocji",
+                 POWTORZENIE: "3-krotne powtórzenie pozycji"}
+
+_licznik = itertools.count()
+
+
+def spakuj_plansze(plansza):
+    """32 ciemne pola po 4 bity -> 16 bajtów (białe pola pomijane)."""
+    pola = [0 if plansza[r, c] is None else int(plansza[r, c]) for r, c in POLA]
+    return bytes(pola[i] | (pola[i + 1] << 4) for i in range(0, 32, 2))
+
+
+def rozpakuj_plansze(dane):
+    """Odwrotność spakuj_plansze - plansza 8x8 dtype=object."""
+    plansza = np.full((8, 8), None, dtype=object)
+    for i, bajt in enumerate(dane):
+        for s, figura in ((2 * i, bajt & 0x0F), (2 * i + 1, bajt >> 4)):
+            plansza[POLA[s]] = figura
+    return plansza
+
+
+def unikalna_sciezka(folder):
+    """Nazwa pliku, która nie koliduje z innymi grami (także z innych procesów)."""
+    nazwa = f"gra_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{next(_licznik)}{ROZSZERZENIE}"
+    return os.path.join(folder, nazwa)
+
+
+class ZapisGry:
+    """Strumieniowy zapis gry do pliku, z buforowaniem."""
+
+    def __init__(self, sciezka, plansza_startowa, benchmark_time, time_flags, seed=None,
+                 pelne_bicia=False, bufor=64 * 1024):
+        """
+        Args:
+            sciezka: plik lub istniejący folder (wtedy nazwa z unikalna_sciezka)
+            plansza_startowa: pozycja początkowa z perspektywy bota 1
+            benchmark_time: limit czasu na ruch w sekundach
+            time_flags: początkowa liczba flag
+            seed: ziarno gry (None - nieznane)
+            pelne_bicia: czy gra była w trybie pelne_bicia
+            bufor: rozmiar bufora zapisu w bajtach
+        """
+        if os.path.isdir(sciezka):
+            sciezka = unikalna_sciezka(sciezka)
+        self.sciezka = sciezka
+        self.plik = open(sciezka, "wb", buffering=bufor)
+        self.plik.write(NAGLOWEK.pack(
+            MAGIA, WERSJA, BRAK_SEEDA if seed is None else seed, benchmark_time, time_flags,
+            1 if pelne_bicia else 0, spakuj_plansze(plansza_startowa),
+        ))
+
+    def ruch(self, ruch, status, czas=0.0, koniec_tury=True):
+        """
+        Zapisuje ruch. Ciąg pól (pelne_bicia) zapisywany jest jako kolejne skoki.
+
+        Args:
+            ruch: ((r, c), (r, c)) lub ciąg pól z perspektywy gracza na ruchu
+            status: OK, FLAGA, LOSOWY, TIMEOUT lub AUTO
+            czas: czas ruchu bota w sekundach
+            koniec_tury: czy po tym ruchu tura przechodzi na przeciwnika
+        """
+        mikrosekundy = min(int(czas * 1e6), 2**32 - 1)
+        ostatni = len(ruch) - 2
+        for i in range(len(ruch) - 1):
+            koniec = koniec_tury and i == ostatni
+            self.plik.write(RUCH.pack(
+                BIT_POLA[tuple(ruch[i])] | ((status if i == 0 else LANCUCH) << 5),
+                BIT_POLA[tuple(ruch[i + 1])] | (0x80 if koniec else 0),
+                mikrosekundy if i == 0 else 0,
+            ))
+
+    def koniec(self, wynik, powod):
+        """Zapisuje wynik gry (0 remis, 1, 2) i zamyka plik."""
+        self.plik.write(KONIEC.pack(ZNACZNIK_KONCA, wynik, powod))
+        self.zamknij()
+
+    def zamknij(self):
+        if not self.plik.closed:
+            self.plik.close()
+
+
+class ZapisanaGra:
+    """Gra wczytana z pliku, z odtwarzaniem pozycji przez GRA.update."""
+
+    def __init__(self, seed, benchmark_time, time_flags, pelne_bicia, plansza_startowa,
+                 ruchy, wynik, powod):
+        self.seed = seed
+        self.benchmark_time = benchmark_time
+        self.time_flags = time_flags
+        self.pelne_bicia = pelne_bicia
+        self.plansza_startowa = plansza_startowa
+        self.ruchy = ruchy      # lista (ruch, status, czas, koniec_tury)
+        self.wynik = wynik      # None, jeśli plik nie ma zapisanego końca
+        self.powod = powod
+
+    def odtworz(self):
+        """
+        Odtwarza grę rekord po rekordzie.
+
+        Yields:
+            (numer_rekordu, plansza, gracz) - pozycja po numer_rekordu rekordach,
+            z perspektywy gracza (1 lub 2), który jest na ruchu
+        """
+        from silnik import GRA
+
+        silnik = GRA(None, None)
+        plansza = self.plansza_startowa.copy()
+        gracz = 1
+        yield 0, plansza, gracz
+        for numer, (ruch, _, _, koniec_tury) in enumerate(self.ruchy, 1):
+            plansza, _, _ = silnik.update(plansza, ruch)
+            if koniec_tury:
+                plansza = silnik.zamien_perspektywe(plansza)
+                gracz = 3 - gracz
+            yield numer, plansza, gracz
+
+    def pozycja(self, numer):
+        """Pozycja po numer rekordach: (plansza z perspektywy gracza na ruchu, gracz)."""
+        if not 0 <= numer <= len(self.ruchy):
+            raise IndexError(f"Gra ma {len(self.ruchy)} rekordów")
+        for n, plansza, gracz in self.odtworz():
+            if n == numer:
+                return plansza, gracz
+
+
+def wczytaj(sciezka):
+    """Wczytuje grę z pliku .wgr."""
+    with open(sciezka, "rb") as f:
+        dane = f.read()
+
+    magia, wersja, seed, benchmark_time, time_flags, opcje, plansza = NAGLOWEK.unpack_from(dane)
+    if magia != MAGIA or wersja != WERSJA:
+        raise ValueError(f"{sciezka}: nieobsługiwany format zapisu gry")
+
+    ruchy = []
+    wynik = powod = None
+    pozycja = NAGLOWEK.size
+    while pozycja < len(dane):
+        if dane[pozycja] == ZNACZNIK_KONCA:
+            _, wynik, powod = KONIEC.unpack_from(dane, pozycja)
+            break
+        if pozycja + RUCH.size > len(dane):
+            break  # urwany zapis (np. przerwana gra)
+        b0, b1, mikrosekundy = RUCH.unpack_from(dane, pozycja)
+        ruch = (POLA[b0 & 0x1F], POLA[b1 & 0x1F])
+        ruchy.append((ruch, b0 >> 5, mikrosekundy / 1e6, bool(b1 & 0x80)))
+        pozycja += RUCH.size
+
+    return ZapisanaGra(
+        None if seed == BRAK_SEEDA else seed, benchmark_time, time_flags, bool(opcje & 1),
+        rozpakuj_plansze(plansza), ruchy, wynik, powod,
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from silnik import GRA
+
+    parser = argparse.ArgumentParser(description="Podgląd zapisu gry (.wgr)")
+    parser.add_argument("plik")
+    parser.add_argument("--pozycja", type=int, default=None, help="wyświetl pozycję po N rekordach")
+    args = parser.parse_args()
+
+    zapis = wczytaj(args.plik)
+    print(f"Seed: {zapis.seed}, benchmark_time: {zapis.benchmark_time:.6f}s, time_flags: {zapis.time_flags}, "
+          f"pelne_bicia: {zapis.pelne_bicia}")
+    print(f"Rekordy: {len(zapis.ruchy)}, rozmiar: {os.path.getsize(args.plik)} B")
+    if zapis.wynik is not None:
+        print(f"Wynik: {zapis.wynik} ({NAZWY_POWODOW[zapis.powod]})")
+
+    numer = len(zapis.ruchy) if args.pozycja is None else args.pozycja
+    plansza, gracz = zapis.pozycja(numer)
+    print(f"\nPozycja po {numer} rekordach, na ruchu gracz {gracz}:")
+    GRA(None, None).wyswietl_plansze(plansza, pokaz_legende=False, notebook=True)
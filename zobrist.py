@@ -0,0 +1,80 @@
+"""
+Klucze Zobrista dla pozycji na planszy.
+
+Klucz pozycji to XOR 64-bitowych liczb przypisanych parom (pole, figura).
+Liczby generowane są deterministycznie (splitmix64 ze stałym ziarnem),
+więc ten sam klucz wychodzi w każdym procesie i na każdej maszynie -
+można go używać w botach, tablicach transpozycji i logach.
+
+Klucz liczony jest z planszy widzianej z perspektywy gracza (tak jak
+dostaje ją bot). KLUCZE_ODWROCONE dają od razu klucz planszy po
+GRA.zamien_perspektywe, co pozwala aktualizować oba klucze przyrostowo.
+"""
+from silnik_bity import INDEKSY_CIEMNYCH
+
+MASKA_64 = (1 << 64) - 1
+ZIARNO = 0x5EED_C0DE_CAFE_F00D
+
+
+def _splitmix64(stan):
+    stan = (stan + 0x9E3779B97F4A7C15) & MASKA_64
+    z = stan
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASKA_64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASKA_64
+    return stan, z ^ (z >> 31)
+
+
+def _generuj_klucze():
+    """KLUCZE[r*8 + c][figura] dla figur 1-4; pole puste i białe mają klucz 0."""
+    klucze = [[0] * 5 for _ in range(64)]
+    stan = ZIARNO
+    for indeks in INDEKSY_CIEMNYCH:
+        for figura in range(1, 5):
+            stan, klucze[indeks][figura] = _splitmix64(stan)
+    return tuple(map(tuple, klucze))
+
+
+KLUCZE = _generuj_klucze()
+
+# Zamiana figur przy zmianie perspektywy: 1<->2, 3<->4
+_ZAMIANA = (0, 2, 1, 4, 3)
+
+# Klucz figury po obrocie o 180 stopni i zamianie stron
+KLUCZE_ODWROCONE = tuple(
+    tuple(KLUCZE[63 - indeks][_ZAMIANA[figura]] for figura in range(5))
+    for indeks in range(64)
+)
+
+# Klucze w układzie masek z silnik_bity (bit s = pole INDEKSY_CIEMNYCH[s])
+KLUCZE_BITY = tuple(KLUCZE[indeks] for indeks in INDEKSY_CIEMNYCH)
+
+
+def _klucz(plansza, klucze):
+    klucz = 0
+    for indeks, figura in enumerate(plansza.ravel().tolist()):
+        if figura is not None and figura > 0:
+            klucz ^= klucze[indeks][figura]
+    return klucz
+
+
+def klucz_planszy(plansza):
+    """Klucz Zobrista planszy (dtype=object lub int8)."""
+    return _klucz(plansza, KLUCZE)
+
+
+def klucz_odwrocony(plansza):
+    """Klucz planszy po zamianie perspektywy, bez jej odwracania."""
+    return _klucz(plansza, KLUCZE_ODWROCONE)
+
+
+def klucz_bitow(wlasne, przeciwne, krole):
+    """Klucz pozycji zapisanej maskami z silnik_bity (ten sam co klucz_planszy)."""
+    klucz = 0
+    zajete = wlasne | przeciwne
+    while zajete:
+        najnizszy = zajete & -zajete
+        s = najnizszy.bit_length() - 1
+        zajete ^= najnizszy
+        figura = (1 if wlasne & najnizszy else 2) + (2 if krole & najnizszy else 0)
+        klucz ^= KLUCZE_BITY[s][figura]
+    return klucz